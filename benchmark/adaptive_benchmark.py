@@ -0,0 +1,71 @@
+import sys
+import os
+import io
+import random
+import time
+from typing import Callable, Dict
+sys.path.append(os.path.abspath('src'))
+from huffman.adaptive import AdaptiveHuffmanStream
+from huffman.stream import HuffmanStream
+
+CORPUS_SIZE: int = 1 << 20
+
+
+def skewed_text(size: int, seed: int = 0) -> bytes:
+    """
+    Generates text with a skewed letter distribution.
+    """
+    generator: random.Random = random.Random(seed)
+    letters: bytes = b'eeeeeeetttttaaaaoooiiinnnsshhrdlcumwfgypbvk     \n'
+    return bytes(generator.choices(letters, k=size))
+
+
+def shifting_text(size: int, seed: int = 0) -> bytes:
+    """
+    Generates text whose letters change every 64K bytes, where a single static code fits badly.
+    """
+    generator: random.Random = random.Random(seed)
+    parts = []
+    for start in range(0, size, 1 << 16):
+        letters: bytes = bytes(generator.sample(range(32, 127), 8))
+        parts.append(bytes(generator.choices(letters, k=min(1 << 16, size - start))))
+    return b''.join(parts)
+
+
+CORPORA: Dict[str, Callable[[int], bytes]] = {
+    'skewed text': skewed_text,
+    'shifting text': shifting_text,
+    'random': lambda size: random.Random(0).getrandbits(8 * size).to_bytes(size, 'big'),
+}
+
+
+def measure(stream, data: bytes):
+    """
+    Compresses and decompresses the data, returning the ratio and both times.
+    """
+    compressed: io.BytesIO = io.BytesIO()
+    start: float = time.perf_counter()
+    stream.compress(io.BytesIO(data), compressed)
+    compress_time: float = time.perf_counter() - start
+
+    result: io.BytesIO = io.BytesIO()
+    start = time.perf_counter()
+    stream.decompress(io.BytesIO(compressed.getvalue()), result)
+    decompress_time: float = time.perf_counter() - start
+    assert result.getvalue() == data
+    return len(compressed.getvalue()) / len(data), compress_time, decompress_time
+
+
+def main():
+    megabytes: float = CORPUS_SIZE / (1 << 20)
+    print(f'{"corpus":>14} {"mode":>9} {"ratio":>7} {"compress":>12} {"decompress":>12}')
+    for name, generate in CORPORA.items():
+        data: bytes = generate(CORPUS_SIZE)
+        for mode, stream in [('static', HuffmanStream()), ('adaptive', AdaptiveHuffmanStream())]:
+            ratio, compress_time, decompress_time = measure(stream, data)
+            print(f'{name:>14} {mode:>9} {ratio:7.3f} {megabytes / compress_time:7.2f} MB/s '
+                  f'{megabytes / decompress_time:7.2f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
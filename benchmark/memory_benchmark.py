@@ -0,0 +1,98 @@
+import sys
+import os
+import random
+import resource
+import subprocess
+import tempfile
+sys.path.append(os.path.abspath('src'))
+from huffman.file import HuffmanIO
+
+ARCHIVE_SIZES = [4 << 20, 16 << 20]
+
+# The most the peak resident memory may grow while decompressing, whatever the archive size.
+FIXED_OVERHEAD: int = 24 << 20
+
+
+def skewed_bytes(size: int, seed: int = 0) -> bytes:
+    """
+    Generates bytes with a skewed distribution, so that they compress.
+    """
+    generator: random.Random = random.Random(seed)
+    return bytes(generator.choices(range(64), weights=range(64, 0, -1), k=size))
+
+
+def read_status(field: str) -> int:
+    """
+    Reads a memory figure in bytes from /proc/self/status, or returns None off Linux.
+    """
+    if not os.path.exists('/proc/self/status'):
+        return None
+    with open('/proc/self/status') as fp:
+        for line in fp:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def peak_rss() -> int:
+    """
+    Returns the peak resident memory of this process in bytes.
+
+    ru_maxrss is inherited from the parent across exec on Linux, so VmHWM is used there.
+    """
+    peak: int = read_status('VmHWM')
+    if peak is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+    return peak
+
+
+def current_rss() -> int:
+    """
+    Returns the current resident memory of this process in bytes, where the platform tells us.
+    """
+    current: int = read_status('VmRSS')
+    return peak_rss() if current is None else current
+
+
+def child(archive: str, output: str):
+    """
+    Decompresses one archive, printing how far the peak resident memory grew above the start.
+    """
+    before: int = current_rss()
+    HuffmanIO(binary=True).decompress_file(archive, output)
+    print(peak_rss() - before)
+
+
+def measure(archive: str, output: str) -> int:
+    """
+    Decompresses an archive in a fresh process, returning the growth of its peak memory.
+    """
+    result: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, __file__, '--child', archive, output],
+        check=True, stdout=subprocess.PIPE, universal_newlines=True)
+    return int(result.stdout)
+
+
+def main():
+    print(f'{"original":>10} {"archive":>10} {"peak growth":>12}')
+    with tempfile.TemporaryDirectory() as directory:
+        original: str = os.path.join(directory, 'original.dat')
+        archive: str = os.path.join(directory, 'archive.bin')
+        output: str = os.path.join(directory, 'output.dat')
+        for size in ARCHIVE_SIZES:
+            with open(original, 'wb') as fp:
+                fp.write(skewed_bytes(size))
+            HuffmanIO(binary=True, canonical=True).compress_file(original, archive)
+
+            growth: int = measure(archive, output)
+            print(f'{size >> 20:>8}MB {os.path.getsize(archive) >> 20:>8}MB '
+                  f'{growth / (1 << 20):>10.1f}MB')
+            assert growth < FIXED_OVERHEAD, 'peak memory grew with the archive size'
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
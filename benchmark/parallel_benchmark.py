@@ -0,0 +1,63 @@
+import sys
+import os
+import io
+import random
+import time
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.parallel import ParallelHuffmanStream
+
+CORPUS_SIZE: int = 8 << 20
+BLOCK_SIZE: int = 1 << 18
+
+
+def skewed_text(size: int, seed: int = 0) -> bytes:
+    """
+    Generates text with a skewed letter distribution.
+    """
+    generator: random.Random = random.Random(seed)
+    letters: bytes = b'eeeeeeetttttaaaaoooiiinnnsshhrdlcumwfgypbvk     \n'
+    return bytes(generator.choices(letters, k=size))
+
+
+def worker_counts() -> List[int]:
+    """
+    Returns the powers of two up to the number of cores, and the number of cores itself.
+    """
+    cores: int = os.cpu_count() or 1
+    counts: List[int] = []
+    workers: int = 1
+    while workers < cores:
+        counts.append(workers)
+        workers *= 2
+    counts.append(cores)
+    return counts
+
+
+def main():
+    data: bytes = skewed_text(CORPUS_SIZE)
+    megabytes: float = len(data) / (1 << 20)
+    print(f'{"workers":>8} {"compress":>12} {"decompress":>12} {"speedup":>8}')
+
+    baseline: float = 0
+    for workers in worker_counts():
+        stream: ParallelHuffmanStream = ParallelHuffmanStream(BLOCK_SIZE, workers)
+        compressed: io.BytesIO = io.BytesIO()
+        start: float = time.perf_counter()
+        stream.compress(io.BytesIO(data), compressed)
+        compress_time: float = time.perf_counter() - start
+
+        result: io.BytesIO = io.BytesIO()
+        start = time.perf_counter()
+        stream.decompress(io.BytesIO(compressed.getvalue()), result)
+        decompress_time: float = time.perf_counter() - start
+        assert result.getvalue() == data
+
+        baseline = baseline or compress_time + decompress_time
+        speedup: float = baseline / (compress_time + decompress_time)
+        print(f'{workers:>8} {megabytes / compress_time:7.2f} MB/s '
+              f'{megabytes / decompress_time:7.2f} MB/s {speedup:7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
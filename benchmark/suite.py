@@ -0,0 +1,331 @@
+import sys
+import os
+import io
+import argparse
+import json
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+sys.path.append(os.path.abspath('src'))
+from huffman.file import HuffmanIO, CANONICAL_FLAG
+from huffman.tree import HuffmanTree
+from huffman.canonical import CanonicalCode
+from huffman.stream import HuffmanStream, BlockReader, BLOCK, block_header_size
+from huffman.context import ContextHuffmanStream, context_header_size
+from huffman.tokens import TokenHuffmanStream, TokenModel, TOKEN_COUNT, STORED_TOKENS
+from huffman.character_counter import ByteCounter
+from huffman.limited import limit_cost
+
+DEFAULT_SIZE: int = 4 << 20
+TINY_SIZE: int = 100
+TINY_FILES: int = 200
+
+# A throughput this much lower than the baseline is reported as a regression.
+DEFAULT_THRESHOLD: float = 0.10
+
+
+def uniform_bytes(size: int) -> List[bytes]:
+    """
+    Uniformly random bytes, which no code can compress.
+    """
+    return [random.Random(0).getrandbits(8 * size).to_bytes(size, 'big')]
+
+
+def skewed_text(size: int) -> List[bytes]:
+    """
+    ASCII text with a skewed letter distribution.
+    """
+    generator: random.Random = random.Random(1)
+    letters: bytes = b'eeeeeeetttttaaaaoooiiinnnsshhrdlcumwfgypbvk     \n'
+    return [bytes(generator.choices(letters, k=size))]
+
+
+def unicode_text(size: int) -> List[bytes]:
+    """
+    UTF-8 text over two thousand CJK characters, so every symbol spans several bytes.
+    """
+    generator: random.Random = random.Random(2)
+    alphabet: List[str] = [chr(0x4e00 + i) for i in range(2000)] + [' ', '\n']
+    weights: List[float] = [1 / (rank + 1) for rank in range(len(alphabet))]
+    text: str = ''.join(generator.choices(alphabet, weights, k=size // 3))
+    return [text.encode('utf-8')[:size]]
+
+
+def log_lines(size: int) -> List[bytes]:
+    """
+    Repetitive log lines, where whole words and numbers recur.
+    """
+    generator: random.Random = random.Random(4)
+    paths: List[bytes] = [b'GET /api/users', b'POST /api/orders', b'GET /health']
+    lines: List[bytes] = []
+    total: int = 0
+    while total < size:
+        line: bytes = b'2024-05-01 %02d:%02d:%02d INFO [worker-%d] %s status=%d in %dms\n' % (
+            generator.randrange(24), generator.randrange(60), generator.randrange(60),
+            generator.randrange(8), generator.choice(paths), generator.choice([200, 200, 404]),
+            generator.randrange(1000))
+        lines.append(line)
+        total += len(line)
+    return [b''.join(lines)[:size]]
+
+
+def token_header(body: bytes, length: int) -> int:
+    """
+    Returns the bytes at the start of the body of a token block spent on its header.
+    """
+    if TOKEN_COUNT.unpack_from(body)[0] == STORED_TOKENS:
+        return TOKEN_COUNT.size
+    return TokenModel.from_bytes(body)[1]
+
+
+def tiny_files(size: int) -> List[bytes]:
+    """
+    Many small files, where headers and per file setup dominate.
+    """
+    generator: random.Random = random.Random(3)
+    letters: bytes = b'abcdefgh {}":,\n'
+    return [bytes(generator.choices(letters, k=TINY_SIZE)) for _ in range(TINY_FILES)]
+
+
+CORPORA: Dict[str, Callable[[int], List[bytes]]] = {
+    'uniform': uniform_bytes,
+    'skewed': skewed_text,
+    'unicode': unicode_text,
+    'log': log_lines,
+    'tiny': tiny_files,
+}
+
+
+def file_header(archive: bytes) -> int:
+    """
+    Returns the bytes of an archive spent on its header, the padding byte included.
+    """
+    if not archive:
+        return 0
+    if archive[0] & CANONICAL_FLAG:
+        return 1 + CanonicalCode.header_size(archive, 1)
+    return (8 + HuffmanTree.tree_length(archive, 8) + 7) // 8
+
+
+def stream_header(archive: bytes, read_header: Callable[[bytes, int], int]) -> int:
+    """
+    Returns the bytes of a stream spent on block framing and code headers.
+    """
+    reader: BlockReader = BlockReader(io.BytesIO(archive))
+    total: int = BLOCK.size
+    block = reader.read_block()
+    while block is not None:
+        length, body = block
+        total += BLOCK.size + read_header(body, length)
+        block = reader.read_block()
+    return total
+
+
+class FileCodec:
+
+    def __init__(self, directory: str, canonical: bool):
+        self.file_writer: HuffmanIO = HuffmanIO(canonical=canonical, binary=True)
+        self.directory: str = directory
+
+    def compress(self, data: bytes) -> bytes:
+        original: str = os.path.join(self.directory, 'original')
+        with open(original, 'wb') as fp:
+            fp.write(data)
+        self.file_writer.compress_file(original, original + '.bin')
+        with open(original + '.bin', 'rb') as fp:
+            return fp.read()
+
+    def decompress(self, archive: bytes) -> bytes:
+        name: str = os.path.join(self.directory, 'archive')
+        with open(name, 'wb') as fp:
+            fp.write(archive)
+        self.file_writer.decompress_file(name, name + '.out')
+        with open(name + '.out', 'rb') as fp:
+            return fp.read()
+
+    def header(self, archive: bytes) -> int:
+        return file_header(archive)
+
+
+class StreamCodec:
+
+    def __init__(self, stream: HuffmanStream, read_header: Callable[[bytes, int], int]):
+        self.stream: HuffmanStream = stream
+        self.read_header: Callable[[bytes, int], int] = read_header
+
+    def compress(self, data: bytes) -> bytes:
+        sink: io.BytesIO = io.BytesIO()
+        self.stream.compress(io.BytesIO(data), sink)
+        return sink.getvalue()
+
+    def decompress(self, archive: bytes) -> bytes:
+        sink: io.BytesIO = io.BytesIO()
+        self.stream.decompress(io.BytesIO(archive), sink)
+        return sink.getvalue()
+
+    def header(self, archive: bytes) -> int:
+        return stream_header(archive, self.read_header)
+
+
+# Each codec is created with a scratch directory, which only the file codecs use.
+CODECS: Dict[str, Callable[[str], object]] = {
+    'legacy': lambda directory: FileCodec(directory, canonical=False),
+    'canonical': lambda directory: FileCodec(directory, canonical=True),
+    'stream': lambda directory: StreamCodec(HuffmanStream(),
+                                            lambda body, length: block_header_size(body)),
+    'context': lambda directory: StreamCodec(ContextHuffmanStream(), context_header_size),
+    'tokens': lambda directory: StreamCodec(TokenHuffmanStream(), token_header),
+}
+
+
+def length_limit_cost(files: List[bytes]) -> float:
+    """
+    The relative size cost of capping the code of the corpus' byte counts at 15 bits.
+    """
+    counter: ByteCounter = ByteCounter()
+    for data in files:
+        counter.add_text(data)
+    unlimited, limited = limit_cost(counter.get_characters())
+    return limited / unlimited - 1 if unlimited else 0
+
+
+def timed(function: Callable, items: List) -> Tuple[List, float]:
+    """
+    Applies a function to every item, returning the results and the seconds taken.
+    """
+    start: float = time.perf_counter()
+    results: List = [function(item) for item in items]
+    return results, time.perf_counter() - start
+
+
+def peak_memory(function: Callable, items: List) -> int:
+    """
+    Applies a function to every item under tracemalloc, returning the peak bytes allocated.
+    """
+    tracemalloc.start()
+    try:
+        for item in items:
+            function(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(corpus: str, codec_name: str, size: int) -> Dict:
+    """
+    Measures one codec on one corpus.
+
+    Throughput is timed without tracing, then the peak memory is measured in a second run
+    under tracemalloc, which slows Python down too much to time it at the same time.
+    """
+    files: List[bytes] = CORPORA[corpus](size)
+    with tempfile.TemporaryDirectory() as directory:
+        codec = CODECS[codec_name](directory)
+        archives, encode_time = timed(codec.compress, files)
+        results, decode_time = timed(codec.decompress, archives)
+        assert results == files, f'{codec_name} did not round trip {corpus}'
+        encode_peak: int = peak_memory(codec.compress, files)
+        decode_peak: int = peak_memory(codec.decompress, archives)
+
+    original: int = sum(len(data) for data in files)
+    compressed: int = sum(len(archive) for archive in archives)
+    header: int = sum(codec.header(archive) for archive in archives)
+    megabytes: float = original / (1 << 20)
+    return {
+        'corpus': corpus,
+        'codec': codec_name,
+        'files': len(files),
+        'original_bytes': original,
+        'compressed_bytes': compressed,
+        'ratio': compressed / original,
+        'header_bytes': header,
+        'header_overhead': header / compressed if compressed else 0,
+        'length_limit_cost': length_limit_cost(files),
+        'encode_mb_per_s': megabytes / encode_time,
+        'decode_mb_per_s': megabytes / decode_time,
+        'encode_peak_bytes': encode_peak,
+        'decode_peak_bytes': decode_peak,
+    }
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    """
+    Lists the throughputs and ratios of the results which are worse than the baseline.
+
+    Parameters:
+        results: the results of this run.
+        baseline: the results of an earlier run, as written to its JSON output.
+        threshold: the relative change beyond which a result is a regression.
+
+    Return:
+        a description of each regression.
+    """
+    earlier: Dict[Tuple[str, str], Dict] = {(r['corpus'], r['codec']): r for r in baseline}
+    regressions: List[str] = []
+    for result in results:
+        old: Dict = earlier.get((result['corpus'], result['codec']))
+        if old is None:
+            continue
+        name: str = f'{result["codec"]} on {result["corpus"]}'
+        for key in ['encode_mb_per_s', 'decode_mb_per_s']:
+            if result[key] < old[key] * (1 - threshold):
+                regressions.append(f'{name}: {key} {old[key]:.2f} -> {result[key]:.2f}')
+        if result['ratio'] > old['ratio'] * (1 + threshold):
+            regressions.append(f'{name}: ratio {old["ratio"]:.3f} -> {result["ratio"]:.3f}')
+    return regressions
+
+
+def main():
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Measures throughput, ratio, header overhead, length limit cost and peak '
+                    'memory.')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE,
+                        help='bytes per generated corpus, the tiny corpus excepted')
+    parser.add_argument('--corpus', action='append', choices=list(CORPORA),
+                        help='corpus to run, all of them by default')
+    parser.add_argument('--codec', action='append', choices=list(CODECS),
+                        help='codec to run, all of them by default')
+    parser.add_argument('--output', help='file to write the results to, as JSON')
+    parser.add_argument('--compare', help='JSON results of an earlier run to check against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args()
+
+    print(f'{"corpus":>8} {"codec":>10} {"ratio":>7} {"header":>7} {"limit":>7} '
+          f'{"encode":>12} {"decode":>12} {"peak":>9}')
+    results: List[Dict] = []
+    for corpus in args.corpus or list(CORPORA):
+        for codec in args.codec or list(CODECS):
+            result: Dict = run(corpus, codec, args.size)
+            results.append(result)
+            peak: int = max(result['encode_peak_bytes'], result['decode_peak_bytes'])
+            print(f'{corpus:>8} {codec:>10} {result["ratio"]:7.3f} '
+                  f'{result["header_overhead"]:7.1%} {result["length_limit_cost"]:7.2%} '
+                  f'{result["encode_mb_per_s"]:7.2f} MB/s {result["decode_mb_per_s"]:7.2f} MB/s '
+                  f'{peak / (1 << 20):5.1f} MiB')
+
+    if args.output:
+        report: Dict = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'size': args.size,
+            'results': results,
+        }
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            regressions: List[str] = compare(results, json.load(fp)['results'], args.threshold)
+        for regression in regressions:
+            print(f'regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
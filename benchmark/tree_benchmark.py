@@ -0,0 +1,65 @@
+import sys
+import os
+import random
+import time
+from typing import Dict, Tuple
+sys.path.append(os.path.abspath('src'))
+from huffman.tree import HuffmanTree, Node
+
+ALPHABET_SIZES = [256, 1 << 16, 1 << 20]
+
+# Stepping through _process_nodes is quadratic, so it is only timed on small alphabets.
+STEPPING_LIMIT: int = 1 << 12
+
+
+def random_counts(size: int, seed: int = 0) -> Dict[int, int]:
+    """
+    Generates a skewed frequency table over the given number of symbols.
+
+    Parameters:
+        size: the number of distinct symbols.
+        seed: the seed for the random generator.
+
+    Return:
+        a dictionary of each symbol and its count.
+    """
+    generator: random.Random = random.Random(seed)
+    return {symbol: int(generator.paretovariate(1.0)) for symbol in range(size)}
+
+
+def time_construct_tree(counts: Dict[int, int]) -> Tuple[float, float]:
+    """
+    Times building a tree with construct_tree, and the part of it spent walking the code map.
+    """
+    tree: HuffmanTree = HuffmanTree(counts=counts)
+    start: float = time.perf_counter()
+    root: Node = tree.construct_tree()
+    total: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    HuffmanTree._walk_tree(root)
+    return total, time.perf_counter() - start
+
+
+def time_stepping(counts: Dict[int, int]) -> float:
+    """
+    Times merging the nodes one _process_nodes step at a time.
+    """
+    tree: HuffmanTree = HuffmanTree(counts=counts)
+    start: float = time.perf_counter()
+    while len(tree.nodes) > 1:
+        tree._process_nodes()
+    return time.perf_counter() - start
+
+
+def main():
+    print(f'{"symbols":>10} {"construct_tree":>16} {"code map":>10} {"stepping":>12}')
+    for size in ALPHABET_SIZES:
+        counts: Dict[int, int] = random_counts(size)
+        built, walked = time_construct_tree(counts)
+        stepped: str = f'{time_stepping(counts):.3f}s' if size <= STEPPING_LIMIT else 'skipped'
+        print(f'{size:>10} {built:15.3f}s {walked:9.3f}s {stepped:>12}')
+
+
+if __name__ == '__main__':
+    main()
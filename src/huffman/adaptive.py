@@ -0,0 +1,220 @@
+from huffman.encoder import BitWriter, WRITE_SIZE
+from huffman.stream import iter_chunks
+from typing import Iterable, Iterator, List, Tuple
+
+# Byte values, and one more symbol marking the end of the stream.
+END_OF_STREAM: int = 256
+SYMBOLS: int = 257
+
+# A symbol seen for the first time follows the code of the NYT leaf as this many raw bits.
+RAW_LENGTH: int = 9
+
+
+class AdaptiveModel:
+    """
+    The FGK adaptive huffman tree, which the encoder and decoder update identically.
+
+    Nodes are positions in parallel lists, numbered so that weights never decrease with the
+    number and siblings are adjacent, the root holding the highest number. Symbols not yet
+    seen share the zero weight NYT (not yet transmitted) leaf.
+    """
+
+    def __init__(self, symbols: int = SYMBOLS):
+        size: int = 2 * (symbols + 1) - 1
+        self.weight: List[int] = [0] * size
+        self.parent: List[int] = [-1] * size
+        self.left: List[int] = [-1] * size
+        self.right: List[int] = [-1] * size
+        self.symbol: List[int] = [-1] * size
+        self.leaf: List[int] = [-1] * symbols
+        self.root: int = size - 1
+        self.nyt: int = self.root
+        self.next: int = self.root - 1
+
+    def code(self, node: int) -> Tuple[int, int]:
+        """
+        Returns the current code of a node, and its length in bits.
+        """
+        parent: List[int] = self.parent
+        right: List[int] = self.right
+        code: int = 0
+        length: int = 0
+        while node != self.root:
+            up: int = parent[node]
+            if right[up] == node:
+                code |= 1 << length
+            length += 1
+            node = up
+        return code, length
+
+    def _swap(self, a: int, b: int):
+        """
+        Exchanges the subtrees at two positions of equal weight, each keeping its parent.
+        """
+        for column in (self.symbol, self.left, self.right):
+            column[a], column[b] = column[b], column[a]
+        for node in (a, b):
+            if self.left[node] != -1:
+                self.parent[self.left[node]] = node
+                self.parent[self.right[node]] = node
+            elif self.symbol[node] != -1:
+                self.leaf[self.symbol[node]] = node
+        if self.nyt in (a, b):
+            self.nyt = a + b - self.nyt
+
+    def update(self, symbol: int):
+        """
+        Counts one more occurrence of a symbol, restoring the sibling property.
+
+        Parameters:
+            symbol: the symbol just encoded or decoded.
+        """
+        weight: List[int] = self.weight
+        node: int = self.leaf[symbol]
+        if node == -1:
+            # The NYT leaf splits into a new NYT leaf and a leaf for the symbol.
+            branch: int = self.nyt
+            self.left[branch] = self.next - 1
+            self.right[branch] = self.next
+            self.parent[self.next - 1] = branch
+            self.parent[self.next] = branch
+            self.symbol[self.next] = symbol
+            self.leaf[symbol] = self.next
+            self.nyt = self.next - 1
+            node = self.next
+            self.next -= 2
+
+        while node != -1:
+            # Move to the highest numbered node of the same weight before counting.
+            leader: int = node
+            while leader < self.root and weight[leader + 1] == weight[node]:
+                leader += 1
+            if leader != node and leader != self.parent[node]:
+                self._swap(node, leader)
+                node = leader
+            weight[node] += 1
+            node = self.parent[node]
+
+
+class AdaptiveEncoder:
+
+    def __init__(self, sink, buffer_size: int = WRITE_SIZE):
+        self.model: AdaptiveModel = AdaptiveModel()
+        self.writer: BitWriter = BitWriter(sink, {}, buffer_size)
+
+    def _code(self, symbol: int) -> str:
+        """
+        Returns the bits for a symbol under the current tree, then updates the tree.
+        """
+        model: AdaptiveModel = self.model
+        node: int = model.leaf[symbol]
+        if node == -1:
+            code, length = model.code(model.nyt)
+            bits: str = (format(code, f'0{length}b') if length else '') + \
+                format(symbol, f'0{RAW_LENGTH}b')
+        else:
+            code, length = model.code(node)
+            bits = format(code, f'0{length}b')
+        model.update(symbol)
+        return bits
+
+    def write(self, data):
+        """
+        Encodes every byte of a chunk, updating the tree after each one.
+
+        Parameters:
+            data: a bytes-like chunk to encode.
+        """
+        self.writer.write_string(''.join([self._code(byte) for byte in data]))
+
+    def flush(self):
+        """
+        Writes every whole byte encoded so far to the sink, such as to keep a live stream moving.
+        """
+        self.writer.flush()
+
+    def close(self):
+        """
+        Encodes the end of the stream marker, then writes the last partial byte.
+        """
+        self.writer.write_string(self._code(END_OF_STREAM))
+        self.writer.close()
+
+
+def iter_decode(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Decodes an adaptive stream, a chunk of input at a time.
+
+    Parameters:
+        chunks: the bytes-like chunks of the encoded stream.
+
+    Return:
+        An iterator of the decoded bytes of each chunk, possibly empty.
+    """
+    model: AdaptiveModel = AdaptiveModel()
+    left: List[int] = model.left
+    right: List[int] = model.right
+    symbol: List[int] = model.symbol
+    node: int = model.root
+    # The number of raw bits still to read for a new symbol, and those read so far.
+    raw_left: int = RAW_LENGTH
+    raw: int = 0
+
+    for chunk in chunks:
+        result: bytearray = bytearray()
+        for byte in chunk:
+            for shift in range(7, -1, -1):
+                bit: int = (byte >> shift) & 1
+                if raw_left:
+                    raw = (raw << 1) | bit
+                    raw_left -= 1
+                    if raw_left:
+                        continue
+                    if raw == END_OF_STREAM:
+                        yield bytes(result)
+                        return
+                    value: int = raw
+                    raw = 0
+                else:
+                    node = right[node] if bit else left[node]
+                    if node == model.nyt:
+                        raw_left = RAW_LENGTH
+                        continue
+                    if left[node] != -1:
+                        continue
+                    value = symbol[node]
+                result.append(value)
+                model.update(value)
+                node = model.root
+        yield bytes(result)
+    raise ValueError('adaptive stream ends before its end marker')
+
+
+class AdaptiveHuffmanStream:
+
+    def compress(self, source, sink):
+        """
+        Compresses a source into a sink in one pass, with no header.
+
+        Bits are written as soon as a buffer fills, without first counting the source.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        encoder: AdaptiveEncoder = AdaptiveEncoder(sink)
+        for chunk in iter_chunks(source):
+            encoder.write(chunk)
+        encoder.close()
+
+    def decompress(self, source, sink):
+        """
+        Decompresses a stream written by compress.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        for data in iter_decode(iter_chunks(source)):
+            if data:
+                sink.write(data)
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import Executor
+from huffman.stream import DEFAULT_BLOCK_SIZE, BLOCK, encode_block, decode_block
+
+
+async def read_block(reader: asyncio.StreamReader, size: int) -> bytes:
+    """
+    Reads up to size bytes, only returning fewer once the reader reaches the end of its data.
+    """
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+
+
+class AsyncHuffmanStream:
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, executor: Executor = None,
+                 max_code_length: int = None):
+        self.block_size: int = block_size
+        self.executor: Executor = executor
+        self.max_code_length: int = max_code_length
+
+    async def compress(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Compresses everything from a stream reader into a stream writer, in the stream format.
+
+        Blocks are encoded on the executor, the event loop's default one unless another was
+        given, so the loop keeps serving other tasks meanwhile. Waiting on drain after every
+        block stops a slow peer from letting the output pile up in memory.
+
+        Parameters:
+            reader: the stream to read the original data from.
+            writer: the stream to write the compressed data to.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        block: bytes = await read_block(reader, self.block_size)
+        while block:
+            writer.write(await loop.run_in_executor(
+                self.executor, encode_block, block, self.max_code_length))
+            await writer.drain()
+            block = await read_block(reader, self.block_size)
+        writer.write(BLOCK.pack(0, 0))
+        await writer.drain()
+
+    async def decompress(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Decompresses a stream written by compress from a stream reader into a stream writer.
+
+        Parameters:
+            reader: the stream to read the compressed data from.
+            writer: the stream to write the original data to.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        try:
+            length, size = BLOCK.unpack(await reader.readexactly(BLOCK.size))
+            while length != 0:
+                body: bytes = await reader.readexactly(size)
+                data: bytes = await loop.run_in_executor(self.executor, decode_block, body)
+                if len(data) != length:
+                    raise ValueError('decoded block does not match its length')
+                writer.write(data)
+                await writer.drain()
+                length, size = BLOCK.unpack(await reader.readexactly(BLOCK.size))
+        except asyncio.IncompleteReadError:
+            raise ValueError('compressed stream is truncated')
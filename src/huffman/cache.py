@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from huffman.decoder import TableDecoder
+from typing import Callable
+
+DEFAULT_CACHE_SIZE: int = 64
+
+
+class DecoderCache:
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.entries: 'OrderedDict[bytes, TableDecoder]' = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'DecoderCache(hits={self.hits}, misses={self.misses}, ' \
+            f'size={len(self.entries)}, maxsize={self.maxsize})'
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def fingerprint(header: bytes) -> bytes:
+        """
+        Returns the key of a serialized header, a 128-bit hash of its bytes.
+        """
+        return hashlib.blake2b(header, digest_size=16).digest()
+
+    def get(self, header: bytes, build: Callable[[], TableDecoder]) -> TableDecoder:
+        """
+        Returns the decoder for a header, only building it when it is not already cached.
+
+        Parameters:
+            header: the serialized header the decoder is built from.
+            build: called to build the decoder when the header has not been seen recently.
+
+        Return:
+            the decoder for the header.
+        """
+        key: bytes = DecoderCache.fingerprint(header)
+        with self.lock:
+            decoder: TableDecoder = self.entries.get(key)
+            if decoder is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return decoder
+            self.misses += 1
+
+        decoder = build()
+        with self.lock:
+            if self.maxsize > 0:
+                self.entries[key] = decoder
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return decoder
+
+    def resize(self, maxsize: int):
+        """
+        Changes the number of decoders kept, dropping the least recently used ones as needed.
+        """
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > max(maxsize, 0):
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops every cached decoder and resets the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# The cache shared by every decompressor in the process unless they are given their own.
+DECODER_CACHE: DecoderCache = DecoderCache()
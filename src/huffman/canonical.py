@@ -0,0 +1,235 @@
+from huffman.node import Node
+from huffman.tree import HuffmanTree
+from huffman.limited import package_merge
+from huffman.flat import FlatTree, NONE
+from huffman.decoder import TableDecoder, DEFAULT_WIDTH
+from typing import Dict, List, Tuple
+
+# The top bit of the first header byte marks the dense layout, the rest is the longest length.
+DENSE_FLAG: int = 0x80
+MAX_LENGTH: int = 0x7f
+
+# The dense layout stores a 4-bit length for each of the 256 byte symbols.
+DENSE_MAX_LENGTH: int = 15
+DENSE_SIZE: int = 1 + 256 // 2
+
+
+class CanonicalCode:
+
+    def __init__(self, lengths: Dict[int, int]):
+        self.lengths: Dict[int, int] = lengths
+        self.symbols: List[int] = sorted(lengths, key=lambda symbol: (lengths[symbol], symbol))
+        self.codes: Dict[int, Tuple[int, int]] = {}
+
+        code: int = 0
+        previous: int = 0
+        for symbol in self.symbols:
+            length: int = lengths[symbol]
+            code <<= length - previous
+            self.codes[symbol] = (code, length)
+            code += 1
+            previous = length
+
+    def __repr__(self) -> str:
+        return str(self.lengths)
+
+    def __eq__(self, other):
+        return self.lengths == other.lengths
+
+    @staticmethod
+    def from_tree(root: Node) -> 'CanonicalCode':
+        """
+        Creates the canonical code with the same code lengths as the given tree.
+
+        Parameters:
+            root: the root of a huffman tree, or None for an empty tree.
+
+        Return:
+            the canonical code for the leaves of the tree.
+        """
+        lengths: Dict[int, int] = {}
+        if root is None:
+            return CanonicalCode(lengths)
+        if root.data is not None:
+            # A lone symbol still needs one bit per occurrence.
+            lengths[root.data] = 1
+            return CanonicalCode(lengths)
+
+        stack: List[Tuple[Node, int]] = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node.data is not None:
+                lengths[node.data] = depth
+            else:
+                stack.append((node.right, depth + 1))
+                stack.append((node.left, depth + 1))
+        return CanonicalCode(lengths)
+
+    @staticmethod
+    def from_counts(counts: Dict[int, int], max_length: int = None) -> 'CanonicalCode':
+        """
+        Creates the canonical code of a huffman tree built from the given counts.
+
+        Parameters:
+            counts: a dictionary of each symbol and its number of occurrences.
+            max_length: the longest code length allowed, or None for no limit. Codes are only
+                rebuilt with package merge when the huffman tree is deeper than this.
+
+        Return:
+            the canonical code for the counted symbols.
+        """
+        code: CanonicalCode = CanonicalCode.from_tree(HuffmanTree(counts=counts).construct_tree())
+        if max_length is not None and code.max_length() > max_length:
+            code = CanonicalCode(package_merge(counts, max_length))
+        return code
+
+    def max_length(self) -> int:
+        """
+        Returns the length of the longest code, or 0 for an empty code.
+        """
+        return self.lengths[self.symbols[-1]] if self.symbols else 0
+
+    def to_bytes(self) -> bytes:
+        """
+        Writes the header describing this code.
+
+        The sparse layout is the longest length, the number of symbols less one, the number of
+        symbols of each length below the longest, then the symbols in canonical order. The dense
+        layout is used instead when it is smaller, holding a 4-bit length for every byte value.
+
+        Return:
+            the bytes of the header.
+        """
+        longest: int = self.max_length()
+        if longest == 0:
+            return bytes(1)
+        if longest > MAX_LENGTH:
+            raise ValueError(f'code length {longest} does not fit in the header')
+
+        sparse_size: int = 2 + (longest - 1) + len(self.symbols)
+        if longest <= DENSE_MAX_LENGTH and DENSE_SIZE < sparse_size:
+            nibbles: bytearray = bytearray(256)
+            for symbol, length in self.lengths.items():
+                nibbles[symbol] = length
+            dense: bytearray = bytearray([DENSE_FLAG | longest])
+            dense.extend((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, 256, 2))
+            return bytes(dense)
+
+        counts: List[int] = [0] * (longest + 1)
+        for length in self.lengths.values():
+            counts[length] += 1
+        header: bytearray = bytearray([longest, len(self.symbols) - 1])
+        header.extend(counts[1:longest])
+        header.extend(self.symbols)
+        return bytes(header)
+
+    @staticmethod
+    def header_size(data, offset: int = 0) -> int:
+        """
+        Returns the number of bytes of a header written by to_bytes, without parsing it.
+
+        Parameters:
+            data: the bytes-like buffer holding the header.
+            offset: the index of the first byte of the header.
+        """
+        first: int = data[offset]
+        longest: int = first & MAX_LENGTH
+        if longest == 0:
+            return 1
+        if first & DENSE_FLAG:
+            return DENSE_SIZE
+        count: int = data[offset + 1] + 1
+        return 2 + (longest - 1) + count
+
+    @staticmethod
+    def from_bytes(data, offset: int = 0) -> Tuple['CanonicalCode', int]:
+        """
+        Reads a header written by to_bytes.
+
+        Parameters:
+            data: the bytes-like buffer holding the header.
+            offset: the index of the first byte of the header.
+
+        Return:
+            A tuple, containing the code and the index of the first byte after the header.
+        """
+        first: int = data[offset]
+        longest: int = first & MAX_LENGTH
+        lengths: Dict[int, int] = {}
+        if longest == 0:
+            return CanonicalCode(lengths), offset + 1
+
+        if first & DENSE_FLAG:
+            for i in range(128):
+                pair: int = data[offset + 1 + i]
+                if pair >> 4:
+                    lengths[2 * i] = pair >> 4
+                if pair & 0xf:
+                    lengths[2 * i + 1] = pair & 0xf
+            return CanonicalCode(lengths), offset + DENSE_SIZE
+
+        count: int = data[offset + 1] + 1
+        counts: List[int] = list(data[offset + 2:offset + 1 + longest])
+        counts.append(count - sum(counts))
+        position: int = offset + 1 + longest
+        for length, amount in enumerate(counts, 1):
+            for symbol in data[position:position + amount]:
+                lengths[symbol] = length
+            position += amount
+        return CanonicalCode(lengths), position
+
+    def to_tree(self) -> Node:
+        """
+        Builds the huffman tree described by this code.
+
+        Return:
+            the root of the tree, or None for an empty code.
+        """
+        if not self.symbols:
+            return None
+        root: Node = Node()
+        for symbol in self.symbols:
+            code, length = self.codes[symbol]
+            current: Node = root
+            for i in range(length - 1, 0, -1):
+                if (code >> i) & 1:
+                    current.right = current.right or Node()
+                    current = current.right
+                else:
+                    current.left = current.left or Node()
+                    current = current.left
+            if code & 1:
+                current.right = Node(data=symbol)
+            else:
+                current.left = Node(data=symbol)
+        if root.right is None:
+            # A lone symbol only uses the zero code, let the unused one decode to it as well.
+            root.right = root.left
+        return root
+
+    def to_flat(self) -> FlatTree:
+        """
+        Builds the huffman tree described by this code, as a flat tree.
+
+        Return:
+            the tree, or None for an empty code.
+        """
+        if not self.symbols:
+            return None
+        tree: FlatTree = FlatTree.from_codes(self.codes)
+        if tree.right[0] == NONE:
+            # A lone symbol only uses the zero code, let the unused one decode to it as well.
+            tree.right[0] = tree.left[0]
+        return tree
+
+    def decoder(self, width: int = DEFAULT_WIDTH) -> TableDecoder:
+        """
+        Builds a table decoder for this code.
+
+        Parameters:
+            width: the number of bits read per table lookup.
+
+        Return:
+            the decoder for streams written with this code.
+        """
+        return TableDecoder(self.to_flat(), width)
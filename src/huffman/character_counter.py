@@ -1,4 +1,18 @@
-from typing import Dict
+import re
+from collections import Counter
+from typing import Dict, List
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Words, numbers and runs of spaces, the pieces tokens are chosen from. Any other byte is a
+# piece of its own.
+TOKEN_PATTERN = re.compile(rb'[A-Za-z]+|[0-9]+| +|.', re.DOTALL)
+
+# The longest token, so its length fits in a byte.
+MAX_TOKEN_LENGTH: int = 255
 
 
 class CharacterCounter:
@@ -16,11 +30,19 @@ class CharacterCounter:
         Parameters:
             data: the text to be counted
         """
-        for char in data:
-            if char not in self.characters.keys():
-                self.characters[char] = 1
-            else:
-                self.characters[char] += 1
+        # Counter keeps first occurrence order, so ties in the tree are broken as before.
+        for char, count in Counter(data).items():
+            self.characters[char] = self.characters.get(char, 0) + count
+
+    def merge(self, other: 'CharacterCounter'):
+        """
+        Adds the counts of another counter to this one.
+
+        Parameters:
+            other: the counter to be added, such as the counts of another chunk
+        """
+        for char, count in other.get_characters().items():
+            self.characters[char] = self.characters.get(char, 0) + count
 
     def get_characters(self) -> Dict[str, int]:
         """
@@ -45,3 +67,168 @@ class CharacterCounter:
         if(char in self.characters.keys()):
             result = self.characters[char]
         return result
+
+
+class ByteCounter(CharacterCounter):
+
+    def __init__(self):
+        self.histogram: List[int] = [0] * 256
+
+    @property
+    def characters(self) -> Dict[int, int]:
+        """
+        The dictionary of each byte value which has occurred and its count, in byte order.
+        """
+        return {byte: count for byte, count in enumerate(self.histogram) if count}
+
+    def add_text(self, data):
+        """
+        Adds the given bytes to this counter.
+
+        The counts come from numpy's bincount when numpy is installed, and from Counter
+        otherwise. Neither copies the data.
+
+        Parameters:
+            data: any bytes-like object, such as bytes, a memoryview or an mmap
+        """
+        view: memoryview = memoryview(data).cast('B')
+        if numpy is not None:
+            counts = numpy.bincount(numpy.frombuffer(view, dtype=numpy.uint8), minlength=256)
+            self.histogram = [a + int(b) for a, b in zip(self.histogram, counts)]
+        else:
+            for byte, count in Counter(view).items():
+                self.histogram[byte] += count
+
+    def merge(self, other: 'ByteCounter'):
+        """
+        Adds the histogram of another byte counter to this one.
+
+        Parameters:
+            other: the counter to be added, such as the counts of another block or worker
+        """
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    def occurences(self, char: int) -> int:
+        """
+        Returns the number of times the given byte value appeared.
+
+        Parameters:
+            char: the byte value to get the occurences of
+
+        Return:
+            the number of times char appeared in the data.
+        """
+        return self.histogram[char]
+
+
+class ContextCounter:
+
+    def __init__(self, previous: int = 0):
+        # Only contexts which have been followed by some byte get a histogram.
+        self.histograms: Dict[int, List[int]] = {}
+        self.previous: int = previous
+
+    def add_text(self, data):
+        """
+        Counts each byte of the data under the byte before it, carrying on from the last chunk.
+
+        Parameters:
+            data: any bytes-like object, such as bytes, a memoryview or an mmap
+        """
+        view: memoryview = memoryview(data).cast('B')
+        if not view:
+            return
+        if numpy is not None:
+            current = numpy.frombuffer(view, dtype=numpy.uint8).astype(numpy.int32)
+            previous = numpy.empty_like(current)
+            previous[0] = self.previous
+            previous[1:] = current[:-1]
+            counts = numpy.bincount(previous * 256 + current, minlength=256 * 256)
+            for context in numpy.flatnonzero(counts.reshape(256, 256).any(axis=1)):
+                row = counts[context * 256:(context + 1) * 256]
+                histogram: List[int] = self.histograms.setdefault(int(context), [0] * 256)
+                self.histograms[int(context)] = [a + int(b) for a, b in zip(histogram, row)]
+        else:
+            pairs = zip(bytes([self.previous]) + bytes(view[:-1]), view)
+            for (context, byte), count in Counter(pairs).items():
+                self.histograms.setdefault(context, [0] * 256)[byte] += count
+        self.previous = view[-1]
+
+    def get_contexts(self) -> Dict[int, Dict[int, int]]:
+        """
+        Gets the counts of the bytes following each context, for the contexts which occurred.
+
+        Return:
+            a dictionary of each context byte, in byte order, and the counts of the bytes after it.
+        """
+        return {context: {byte: count for byte, count in enumerate(self.histograms[context])
+                          if count}
+                for context in sorted(self.histograms)}
+
+
+class TokenCounter:
+
+    def __init__(self):
+        self.pieces: Counter = Counter()
+
+    def add_text(self, data):
+        """
+        Counts the words, numbers, runs of spaces and other bytes of the data.
+
+        A piece split across two chunks is counted as two pieces.
+
+        Parameters:
+            data: any bytes-like object, such as bytes, a memoryview or an mmap
+        """
+        self.add_pieces(TOKEN_PATTERN.findall(data))
+
+    def add_pieces(self, pieces: List[bytes]):
+        """
+        Counts pieces already split by TOKEN_PATTERN, such as those a block is encoded from.
+        """
+        self.pieces.update(pieces)
+
+    def get_tokens(self, limit: int) -> List[bytes]:
+        """
+        Chooses the pieces worth a symbol of their own, those saving the most symbols.
+
+        A token saves a symbol for each of its bytes but the first, every time it occurs, and
+        costs about one symbol per byte to describe once. Tokens costing more than they save
+        are never chosen.
+
+        Parameters:
+            limit: the largest number of tokens to choose.
+
+        Return:
+            the chosen tokens, the most saving first.
+        """
+        savings: Dict[bytes, int] = {
+            piece: count * (len(piece) - 1) - len(piece) - 1
+            for piece, count in self.pieces.items() if 2 <= len(piece) <= MAX_TOKEN_LENGTH}
+        chosen: List[bytes] = [piece for piece in savings if savings[piece] > 0]
+        chosen.sort(key=lambda piece: (-savings[piece], piece))
+        return chosen[:limit]
+
+    def get_symbols(self, tokens: List[bytes]) -> Dict[int, int]:
+        """
+        Gets the counts of each symbol, with the given tokens as symbols from 256 upwards and
+        every other piece spelled out as bytes.
+
+        Parameters:
+            tokens: the tokens of the alphabet, as returned by get_tokens.
+
+        Return:
+            a dictionary of each symbol which occurred and its count.
+        """
+        symbols: Dict[bytes, int] = {token: 256 + i for i, token in enumerate(tokens)}
+        histogram: List[int] = [0] * 256
+        counts: Dict[int, int] = {}
+        for piece, count in self.pieces.items():
+            symbol: int = symbols.get(piece)
+            if symbol is not None:
+                counts[symbol] = count
+            else:
+                for byte in piece:
+                    histogram[byte] += count
+        counts.update((byte, count) for byte, count in enumerate(histogram) if count)
+        return counts
@@ -0,0 +1,225 @@
+import io
+import operator
+import struct
+import zlib
+from huffman.character_counter import ByteCounter
+from huffman.canonical import CanonicalCode
+from huffman.cache import DecoderCache
+from huffman.decoder import TableDecoder, DEFAULT_CHUNK_SIZE
+from huffman.encoder import BitWriter, code_strings
+from typing import Iterable, Iterator, List, Tuple
+
+ARCHIVE_MAGIC: bytes = b'HUF'
+ARCHIVE_VERSION: int = 1
+CHECKED_BLOCK_SIZE: int = 1 << 20
+
+# The magic, version, original length, largest block and size of the canonical code header.
+# The code header follows, then a CRC32 of both. The magic can never be mistaken for the
+# padding byte of an unchecked archive, which is at most 8, with or without the canonical flag.
+ARCHIVE = struct.Struct('<3sBQIH')
+
+# Each block is its original length, payload length and padding bits, then its payload and a
+# CRC32 of both. Blocks are byte aligned, so they are checked and decoded independently.
+BLOCK_HEAD = struct.Struct('<IIB')
+CRC = struct.Struct('<I')
+
+# Set in the padding byte of a block whose payload is its original bytes, stored as is.
+STORED_FLAG: int = 0x80
+
+
+def is_checked(data) -> bool:
+    """
+    Tells whether a bytes-like archive starts with the versioned header of a checked archive.
+    """
+    return bytes(data[:len(ARCHIVE_MAGIC)]) == ARCHIVE_MAGIC
+
+
+class BlockWriter:
+
+    def __init__(self, sink, code: CanonicalCode):
+        self.sink = sink
+        self.strings: List[str] = code_strings(code.codes)
+        self.lengths: List[int] = [code.lengths.get(byte, 0) for byte in range(256)]
+        self.blocks: int = 0
+
+    def write(self, block):
+        """
+        Encodes one block of original bytes, with its framing and checksum.
+
+        The code of the archive fits the archive as a whole, not each block, so the coded size
+        of every block is worked out from its counts first. A block which coding would not
+        shrink is stored as is, without encoding it.
+        """
+        counter: ByteCounter = ByteCounter()
+        counter.add_text(block)
+        if (sum(map(operator.mul, counter.histogram, self.lengths)) + 7) // 8 >= len(block):
+            payload: bytes = bytes(block)
+            padding: int = STORED_FLAG
+        else:
+            stream: io.BytesIO = io.BytesIO()
+            writer: BitWriter = BitWriter(stream, strings=self.strings)
+            writer.write(block)
+            padding = writer.close()
+            payload = stream.getvalue()
+        head: bytes = BLOCK_HEAD.pack(len(block), len(payload), padding)
+        self.sink.write(head)
+        self.sink.write(payload)
+        self.sink.write(CRC.pack(zlib.crc32(payload, zlib.crc32(head))))
+        self.blocks += 1
+
+
+def write_checked(sink, code: CanonicalCode, length: int, blocks: Iterable[bytes],
+                  block_size: int = CHECKED_BLOCK_SIZE) -> int:
+    """
+    Writes a checked archive, its versioned header then every block.
+
+    Parameters:
+        sink: a writable binary stream.
+        code: the code of every block, empty when the original is.
+        length: the length of the original, which the blocks must add up to.
+        blocks: the original bytes, in blocks of at most block_size bytes.
+        block_size: the largest number of original bytes in a block.
+
+    Return:
+        the number of blocks written.
+    """
+    header: bytes = code.to_bytes()
+    fields: bytes = ARCHIVE.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, length, block_size, len(header))
+    sink.write(fields)
+    sink.write(header)
+    sink.write(CRC.pack(zlib.crc32(header, zlib.crc32(fields))))
+
+    writer: BlockWriter = BlockWriter(sink, code)
+    for block in blocks:
+        writer.write(block)
+    return writer.blocks
+
+
+def read_header(data) -> Tuple[int, int, bytes, int]:
+    """
+    Reads and checks the versioned header of a checked archive.
+
+    Parameters:
+        data: the bytes-like archive, such as bytes or an mmap.
+
+    Return:
+        A tuple, containing the original length, the largest block, the canonical code header
+        and the offset of the first block.
+    """
+    if len(data) < ARCHIVE.size:
+        raise ValueError('archive header is truncated')
+    magic, version, length, block_size, size = ARCHIVE.unpack_from(data)
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError('not a checked archive')
+    if version != ARCHIVE_VERSION:
+        raise ValueError(f'unsupported archive version {version}')
+    end: int = ARCHIVE.size + size + CRC.size
+    if len(data) < end:
+        raise ValueError('archive header is truncated')
+    header: bytes = bytes(data[ARCHIVE.size:ARCHIVE.size + size])
+    checksum: int = zlib.crc32(header, zlib.crc32(data[:ARCHIVE.size]))
+    if CRC.unpack_from(data, end - CRC.size)[0] != checksum:
+        raise ValueError('archive header checksum does not match')
+    if size == 0 or CanonicalCode.header_size(header) != size:
+        raise ValueError('archive code header is corrupt')
+    return length, block_size, header, end
+
+
+def iter_checked_blocks(data, offset: int, length: int,
+                        block_size: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Walks the blocks of a checked archive, checking their framing and checksums.
+
+    Only the stored bytes are checksummed, nothing is decoded, so walking an archive costs
+    about as much as reading it.
+
+    Parameters:
+        data: the bytes-like archive, such as bytes or an mmap.
+        offset: the offset of the first block, as returned by read_header.
+        length: the original length, which the blocks must add up to.
+        block_size: the largest number of original bytes in a block.
+
+    Return:
+        An iterator of tuples, containing the original length of each block, the bit offsets
+        of the start and the end of its payload, and whether it is stored as is.
+    """
+    position: int = 0
+    while position < length:
+        if len(data) < offset + BLOCK_HEAD.size:
+            raise ValueError('archive is truncated')
+        count, size, padding = BLOCK_HEAD.unpack_from(data, offset)
+        stored: bool = padding == STORED_FLAG
+        if count == 0 or count > block_size or position + count > length or \
+                (padding > 7 and not stored) or (stored and size != count):
+            raise ValueError('archive block header is corrupt')
+        start: int = offset + BLOCK_HEAD.size
+        end: int = start + size
+        if len(data) < end + CRC.size:
+            raise ValueError('archive is truncated')
+        checksum: int = zlib.crc32(data[start:end], zlib.crc32(data[offset:start]))
+        if CRC.unpack_from(data, end)[0] != checksum:
+            raise ValueError(f'checksum of the block at offset {offset} does not match')
+        yield count, start * 8, end * 8 - (0 if stored else padding), stored
+        position += count
+        offset = end + CRC.size
+    if offset != len(data):
+        raise ValueError('archive has trailing bytes')
+
+
+def verify_checked(data) -> int:
+    """
+    Checks the header, block framing and every checksum of a checked archive, without decoding.
+
+    Parameters:
+        data: the bytes-like archive, such as bytes or an mmap.
+
+    Return:
+        the number of blocks checked.
+    """
+    length, block_size, _, offset = read_header(data)
+    return sum(1 for _ in iter_checked_blocks(data, offset, length, block_size))
+
+
+def decode_checked(data, cache: DecoderCache, skip: int = 0,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List, int]]:
+    """
+    Decodes a checked archive a chunk at a time, checking each block before decoding it.
+
+    Parameters:
+        data: the bytes-like archive, such as bytes or an mmap.
+        cache: the cache to look the decoder for the archive's header up in.
+        skip: the number of original bytes to pass over. The blocks before them are checked
+            but not decoded.
+        chunk_size: the number of symbols after which a chunk is yielded, chunks never span
+            two blocks.
+
+    Return:
+        An iterator of tuples, containing the decoded symbols, a list or the bytes of a stored
+        block, and the bit offset just past the last of them.
+    """
+    length, block_size, header, offset = read_header(data)
+    decoder: TableDecoder = cache.get(
+        b'C' + header, lambda: CanonicalCode.from_bytes(header)[0].decoder())
+    position: int = 0
+    for count, start, end, stored in iter_checked_blocks(data, offset, length, block_size):
+        position += count
+        if position <= skip:
+            continue
+        drop: int = max(skip - (position - count), 0)
+        if stored:
+            for index in range(start // 8 + drop, end // 8, chunk_size):
+                stop: int = min(index + chunk_size, end // 8)
+                yield data[index:stop], stop * 8
+            continue
+        decoded: int = 0
+        for symbols, bit in decoder.iter_decode(data, start, end, chunk_size):
+            decoded += len(symbols)
+            if decoded > count:
+                raise ValueError('decoded block does not match its length')
+            if drop >= len(symbols):
+                drop -= len(symbols)
+                continue
+            yield symbols[drop:] if drop else symbols, bit
+            drop = 0
+        if decoded != count:
+            raise ValueError('decoded block does not match its length')
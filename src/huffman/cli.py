@@ -0,0 +1,256 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from huffman.stream import HuffmanStream, BLOCK, DEFAULT_BLOCK_SIZE
+from huffman.parallel import ParallelHuffmanStream
+from typing import Callable, List, Tuple
+
+PROGRAM: str = 'huffman'
+SUFFIX: str = '.huf'
+
+
+class CountingReader:
+    """
+    Wraps a readable binary stream, counting the bytes read from it.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.count: int = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data: bytes = self.source.read(size)
+        self.count += len(data)
+        return data
+
+
+class CountingWriter:
+    """
+    Wraps a writable binary stream, counting the bytes written to it. Without a stream it
+    only counts, such as to test an archive.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.count: int = 0
+
+    def write(self, data):
+        self.count += len(data)
+        if self.sink is not None:
+            self.sink.write(data)
+
+
+def make_stream(args: argparse.Namespace, workers: int = 1) -> HuffmanStream:
+    """
+    Creates the stream for the options, encoding blocks on several processes when asked.
+    """
+    if workers > 1:
+        return ParallelHuffmanStream(args.block_size, workers, args.max_code_length)
+    return HuffmanStream(args.block_size, args.max_code_length)
+
+
+def output_name(args: argparse.Namespace, name: str) -> str:
+    """
+    Returns the file the result of a file is written to, or None for standard output.
+    """
+    if args.stdout or name == '-':
+        return None
+    if args.command == 'compress':
+        return name + SUFFIX
+    if not name.endswith(SUFFIX):
+        raise ValueError(f'unknown suffix, expected {SUFFIX}')
+    return name[:-len(SUFFIX)]
+
+
+def process(args: argparse.Namespace, name: str, workers: int = 1) -> Tuple[int, int]:
+    """
+    Compresses, decompresses or tests one file, or standard input when the name is '-'.
+
+    Return:
+        A tuple, containing the number of bytes read and written.
+    """
+    stream: HuffmanStream = make_stream(args, workers)
+    target: str = None if args.command == 'test' else output_name(args, name)
+    if target is not None and os.path.exists(target) and not args.force:
+        raise ValueError(f'{target} already exists, use --force to overwrite it')
+
+    source = sys.stdin.buffer if name == '-' else open(name, 'rb')
+    try:
+        reader: CountingReader = CountingReader(source)
+        if args.command == 'test':
+            writer: CountingWriter = CountingWriter()
+            stream.decompress(reader, writer)
+        elif target is None:
+            writer = CountingWriter(sys.stdout.buffer)
+            getattr(stream, args.command)(reader, writer)
+            sys.stdout.buffer.flush()
+        else:
+            with open(target, 'wb') as sink:
+                writer = CountingWriter(sink)
+                try:
+                    getattr(stream, args.command)(reader, writer)
+                except BaseException:
+                    sink.close()
+                    os.remove(target)
+                    raise
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+    return reader.count, writer.count
+
+
+def _process_file(job: Tuple[argparse.Namespace, str]) -> Tuple[int, int]:
+    """
+    Processes one file of a batch, on a worker process.
+    """
+    args, name = job
+    return process(args, name)
+
+
+def info(name: str) -> Tuple[int, int, int]:
+    """
+    Reads the block headers of a compressed file, skipping over their bodies.
+
+    Return:
+        A tuple, containing the original size, compressed size and number of blocks.
+    """
+    original: int = 0
+    blocks: int = 0
+    with open(name, 'rb') as fp:
+        header: bytes = fp.read(BLOCK.size)
+        while True:
+            if len(header) < BLOCK.size:
+                raise ValueError('compressed stream is truncated')
+            length, size = BLOCK.unpack(header)
+            if length == 0:
+                break
+            original += length
+            blocks += 1
+            fp.seek(size, os.SEEK_CUR)
+            header = fp.read(BLOCK.size)
+        return original, fp.tell(), blocks
+
+
+def list_info(args: argparse.Namespace) -> int:
+    """
+    Prints the sizes and ratio of each compressed file.
+    """
+    status: int = 0
+    print(f'{"compressed":>12} {"original":>12} {"ratio":>7} {"blocks":>7}  name')
+    for name in args.files:
+        try:
+            original, compressed, blocks = info(name)
+        except (OSError, ValueError) as error:
+            print(f'{PROGRAM}: {name}: {error}', file=sys.stderr)
+            status = 1
+            continue
+        ratio: float = compressed / original if original else 0
+        print(f'{compressed:>12} {original:>12} {ratio:7.1%} {blocks:>7}  {name}')
+    return status
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Runs the compress, decompress or test command over every file, in parallel when asked.
+    """
+    names: List[str] = args.files or ['-']
+    if args.command == 'compress' and sum(args.stdout or name == '-' for name in names) > 1:
+        # Streams written back to back would decompress as the first of them alone.
+        print(f'{PROGRAM}: only one file can be compressed to standard output', file=sys.stderr)
+        return 1
+    start: float = time.perf_counter()
+    status: int = 0
+    total_in: int = 0
+    total_out: int = 0
+
+    def report(name: str, result: Callable[[], Tuple[int, int]]):
+        nonlocal status, total_in, total_out
+        try:
+            read, written = result()
+        except (OSError, ValueError) as error:
+            print(f'{PROGRAM}: {name}: {error}', file=sys.stderr)
+            status = 1
+            return
+        total_in += read
+        total_out += written
+        if args.command == 'test' and args.verbose:
+            print(f'{name}: OK', file=sys.stderr)
+
+    if args.jobs > 1 and len(names) > 1 and '-' not in names and not args.stdout:
+        # Files are spread over the workers, each compressed with a serial stream. Files written
+        # to standard output are processed one at a time, so each is written whole and in order.
+        with ProcessPoolExecutor(args.jobs) as pool:
+            futures = [pool.submit(_process_file, (args, name)) for name in names]
+            for name, future in zip(names, futures):
+                report(name, future.result)
+    else:
+        for name in names:
+            report(name, lambda: process(args, name, args.jobs))
+
+    if args.verbose:
+        seconds: float = time.perf_counter() - start
+        megabytes: float = (total_in if args.command == 'compress' else total_out) / (1 << 20)
+        ratio: float = (total_out / total_in if args.command == 'compress' else
+                        total_in / total_out) if total_in and total_out else 0
+        print(f'{len(names)} file(s), {total_in} bytes in, {total_out} bytes out, '
+              f'ratio {ratio:.1%}, {seconds:.2f}s, {megabytes / seconds:.2f} MB/s',
+              file=sys.stderr)
+    return status
+
+
+def positive(text: str) -> int:
+    value: int = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f'{text} is not a positive number')
+    return value
+
+
+def parser() -> argparse.ArgumentParser:
+    """
+    Builds the parser of the command line.
+    """
+    result: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog=PROGRAM, description='Compresses files or pipes with huffman codes.')
+    commands = result.add_subparsers(dest='command', required=True)
+
+    for command, text in [('compress', 'compress files, or standard input to standard output'),
+                          ('decompress', f'decompress {SUFFIX} files, or standard input'),
+                          ('test', 'check every block of compressed files decodes to its '
+                                   'recorded length. Streams carry no checksum, so only their '
+                                   'structure is checked, not their content')]:
+        sub: argparse.ArgumentParser = commands.add_parser(command, help=text, description=text)
+        sub.add_argument('files', nargs='*', help="files to process, '-' or none for stdin")
+        sub.add_argument('-c', '--stdout', action='store_true',
+                         help='write to standard output instead of files')
+        sub.add_argument('-f', '--force', action='store_true', help='overwrite existing files')
+        sub.add_argument('-j', '--jobs', type=positive, default=1,
+                         help='worker processes, over files or else over the blocks of one')
+        sub.add_argument('-b', '--block-size', type=positive, default=DEFAULT_BLOCK_SIZE,
+                         help='bytes per independently coded block')
+        sub.add_argument('--max-code-length', type=positive, default=None,
+                         help='longest code allowed, in bits')
+        sub.add_argument('-v', '--verbose', action='store_true',
+                         help='print a throughput summary to standard error')
+        sub.set_defaults(handler=run)
+
+    sub = commands.add_parser('list', aliases=['info'], help='list sizes of compressed files',
+                              description='list the sizes of compressed files')
+    sub.add_argument('files', nargs='+', help='compressed files')
+    sub.set_defaults(handler=list_info)
+    return result
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Runs the command line tool.
+
+    Parameters:
+        argv: the arguments, those of the process by default.
+
+    Return:
+        the exit status, non zero when any file failed.
+    """
+    args: argparse.Namespace = parser().parse_args(argv)
+    return args.handler(args)
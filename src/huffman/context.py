@@ -0,0 +1,271 @@
+import io
+from array import array
+from huffman.character_counter import ContextCounter
+from huffman.canonical import CanonicalCode
+from huffman.encoder import BitWriter, code_strings
+from huffman.limited import encoded_size
+from huffman.stream import HuffmanStream, BlockReader, BLOCK, STORED_BLOCK, iter_blocks
+from typing import Dict, List, Tuple
+
+# Codes are capped so each context decodes with one lookup in a table of at most 4K entries.
+CONTEXT_MAX_LENGTH: int = 12
+
+# Up to this many used contexts are listed by value, beyond it a bitmap of all 256 is smaller.
+CONTEXT_LIST_SIZE: int = 32
+BITMAP_SIZE: int = 256 // 8
+
+
+class ContextModel:
+    """
+    An order-1 model, holding a canonical code for the bytes following each context byte.
+
+    The context of the first byte of a block is 0.
+    """
+
+    def __init__(self, codes: Dict[int, CanonicalCode]):
+        self.codes: Dict[int, CanonicalCode] = codes
+        self.strings: List[List[str]] = [None] * 256
+        for context, code in codes.items():
+            self.strings[context] = code_strings(code.codes)
+        self.tables: List[array] = None
+        self.widths: List[int] = None
+
+    def __eq__(self, other):
+        return self.codes == other.codes
+
+    @staticmethod
+    def from_counter(counter: ContextCounter,
+                     max_length: int = CONTEXT_MAX_LENGTH) -> 'ContextModel':
+        """
+        Builds a length limited code for each context of a counter.
+        """
+        return ContextModel({context: CanonicalCode.from_counts(counts, max_length)
+                             for context, counts in counter.get_contexts().items()})
+
+    def to_bytes(self) -> bytes:
+        """
+        Writes the used contexts, then the canonical header of each in context order.
+
+        The contexts are the number of them less one, then either the list of their values or
+        a bitmap of the 256 possible ones, whichever is smaller.
+
+        Return:
+            the bytes of the header.
+        """
+        contexts: List[int] = sorted(self.codes)
+        header: bytearray = bytearray([len(contexts) - 1])
+        if len(contexts) <= CONTEXT_LIST_SIZE:
+            header.extend(contexts)
+        else:
+            bitmap: bytearray = bytearray(BITMAP_SIZE)
+            for context in contexts:
+                bitmap[context >> 3] |= 0x80 >> (context & 7)
+            header.extend(bitmap)
+        for context in contexts:
+            header.extend(self.codes[context].to_bytes())
+        return bytes(header)
+
+    @staticmethod
+    def from_bytes(data, offset: int = 0) -> Tuple['ContextModel', int]:
+        """
+        Reads a header written by to_bytes.
+
+        Parameters:
+            data: the bytes-like buffer holding the header.
+            offset: the index of the first byte of the header.
+
+        Return:
+            A tuple, containing the model and the index of the first byte after the header.
+        """
+        count: int = data[offset] + 1
+        position: int = offset + 1
+        if count <= CONTEXT_LIST_SIZE:
+            contexts: List[int] = list(data[position:position + count])
+            position += count
+        else:
+            contexts = [context for context in range(256)
+                        if data[position + (context >> 3)] & (0x80 >> (context & 7))]
+            position += BITMAP_SIZE
+        codes: Dict[int, CanonicalCode] = {}
+        for context in contexts:
+            codes[context], position = CanonicalCode.from_bytes(data, position)
+        return ContextModel(codes), position
+
+    def _build_tables(self):
+        """
+        Builds a lookup table for each context, as wide as its longest code.
+
+        Each entry packs the decoded byte above the 4-bit length of its code. Entries no code
+        reaches are left as 0, a length no code has.
+        """
+        self.tables = [None] * 256
+        self.widths = [0] * 256
+        for context, code in self.codes.items():
+            width: int = code.max_length()
+            if width > 15:
+                raise ValueError(f'code length {width} is too long for a context table')
+            table: array = array('H', bytes(2 << width))
+            for symbol, (value, length) in code.codes.items():
+                if value >> length:
+                    raise ValueError(f'code lengths of context {context} are over full')
+                shift: int = width - length
+                for index in range(value << shift, (value + 1) << shift):
+                    table[index] = (symbol << 4) | length
+            self.tables[context] = table
+            self.widths[context] = width
+
+    def encode(self, data) -> str:
+        """
+        Returns the codes of each byte of a block, in the context of the byte before it.
+        """
+        strings: List[List[str]] = self.strings
+        view: memoryview = memoryview(data).cast('B')
+        return ''.join([strings[context][byte]
+                        for context, byte in zip(b'\x00' + bytes(view[:-1]), view)])
+
+    def decode(self, data, start: int, count: int) -> bytes:
+        """
+        Decodes a number of bytes, one table lookup each.
+
+        Parameters:
+            data: the bytes-like buffer holding the encoded block.
+            start: the index of the first byte of the payload.
+            count: the number of bytes to decode.
+
+        Return:
+            the decoded bytes.
+        """
+        if self.tables is None:
+            self._build_tables()
+        tables: List[array] = self.tables
+        widths: List[int] = self.widths
+        size: int = len(data)
+
+        result: bytearray = bytearray()
+        context: int = 0
+        index: int = start
+        accumulator: int = 0
+        available: int = 0
+        for _ in range(count):
+            table: array = tables[context]
+            if table is None:
+                raise ValueError(f'no code for context {context}')
+            width: int = widths[context]
+            while available < width:
+                # Past the end, zeros stand in for the padding of the last byte. A code never
+                # needs more than two of them, so a corrupt length is not decoded on and on.
+                if index >= size + 2:
+                    raise ValueError('encoded stream ends in the middle of a symbol')
+                accumulator = (accumulator << 8) | (data[index] if index < size else 0)
+                index += 1
+                available += 8
+            entry: int = table[(accumulator >> (available - width)) & ((1 << width) - 1)]
+            if not entry & 0xf:
+                raise ValueError('invalid code in context stream')
+            available -= entry & 0xf
+            accumulator &= (1 << available) - 1
+            context = entry >> 4
+            result.append(context)
+        if (index - size) * 8 > available:
+            raise ValueError('encoded stream ends in the middle of a symbol')
+        return bytes(result)
+
+
+def encode_context_block(data: bytes, max_length: int = CONTEXT_MAX_LENGTH) -> bytes:
+    """
+    Compresses one block with a code for each context, built from its own byte pair counts.
+
+    As in encode_block, a block which coding would not shrink is stored as is, after the
+    STORED_BLOCK byte. That byte also starts the header of a block using all 256 contexts, but
+    coded bodies are never longer than their block, so only a stored body is a byte longer.
+
+    Parameters:
+        data: the non empty block to compress.
+        max_length: the longest code length allowed, at most 15.
+
+    Return:
+        the framed block, its original and body lengths then the body.
+    """
+    counter: ContextCounter = ContextCounter()
+    counter.add_text(data)
+    model: ContextModel = ContextModel.from_counter(counter, max_length)
+    header: bytes = model.to_bytes()
+    bits: int = sum(encoded_size(counts, model.codes[context].lengths)
+                    for context, counts in counter.get_contexts().items())
+    if len(header) + (bits + 7) // 8 > len(data):
+        return b''.join([BLOCK.pack(len(data), len(data) + 1), bytes([STORED_BLOCK]), data])
+
+    payload: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(payload, {})
+    writer.write_string(model.encode(data))
+    writer.close()
+    return b''.join([
+        BLOCK.pack(len(data), len(header) + payload.tell()),
+        header,
+        payload.getvalue(),
+    ])
+
+
+def decode_context_block(body: bytes, length: int) -> bytes:
+    """
+    Decompresses the body of one block written by encode_context_block.
+
+    Parameters:
+        body: the context header and payload of the block, or its stored bytes.
+        length: the original length of the block.
+
+    Return:
+        the original bytes of the block.
+    """
+    if len(body) == length + 1 and body[0] == STORED_BLOCK:
+        return bytes(body[1:])
+    try:
+        model, start = ContextModel.from_bytes(body)
+    except IndexError:
+        raise ValueError('block header is truncated') from None
+    if start > len(body):
+        raise ValueError('block header is truncated')
+    return model.decode(body, start, length)
+
+
+def context_header_size(body, length: int) -> int:
+    """
+    Returns the number of bytes at the start of the body of a block spent on its header.
+    """
+    if len(body) == length + 1 and body[0] == STORED_BLOCK:
+        return 1
+    return ContextModel.from_bytes(body)[1]
+
+
+class ContextHuffmanStream(HuffmanStream):
+
+    def __init__(self, block_size: int = 1 << 20, max_code_length: int = CONTEXT_MAX_LENGTH):
+        # Blocks are larger by default, to spread the cost of up to 256 codes per header.
+        super().__init__(block_size, max_code_length)
+
+    def compress(self, source, sink):
+        """
+        Compresses a source into a sink with order-1 context codes, one block at a time.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        for block in iter_blocks(source, self.block_size):
+            sink.write(encode_context_block(block, self.max_code_length))
+        sink.write(BLOCK.pack(0, 0))
+
+    def decompress(self, source, sink):
+        """
+        Decompresses a stream written by compress, one block at a time.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        reader: BlockReader = BlockReader(source)
+        block = reader.read_block()
+        while block is not None:
+            length, body = block
+            sink.write(decode_context_block(body, length))
+            block = reader.read_block()
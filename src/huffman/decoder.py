@@ -0,0 +1,151 @@
+from huffman.node import Node
+from huffman.flat import FlatTree, NONE
+from typing import Iterator, List, Tuple, Union
+
+DEFAULT_WIDTH: int = 10
+DEFAULT_CHUNK_SIZE: int = 1 << 16
+
+
+class TableDecoder:
+
+    def __init__(self, root: Union[Node, FlatTree], width: int = DEFAULT_WIDTH):
+        if isinstance(root, Node):
+            root = FlatTree.from_node(root)
+        if root is not None and root.is_leaf(0):
+            # A lone leaf is written with a 1-bit code, either bit decodes to it.
+            lone: FlatTree = FlatTree()
+            branch: int = lone.add_node()
+            lone.left[branch] = lone.right[branch] = lone.add_leaf(root.value(0))
+            root = lone
+        self.tree: FlatTree = root
+        self.width: int = width
+        self.table: List[Tuple[tuple, int, int]] = []
+        if root is not None:
+            self.table = [self._build_entry(value) for value in range(1 << width)]
+
+    def _build_entry(self, value: int) -> Tuple[tuple, int, int]:
+        """
+        Builds the lookup entry for the given table index.
+
+        Parameters:
+            value: the next width bits of the stream, as an integer.
+
+        Return:
+            A tuple of the symbols fully decoded by these bits, the number of bits those symbols
+            consumed, and the index of the node reached when no symbol fit in the table width
+            (otherwise None).
+        """
+        tree: FlatTree = self.tree
+        symbols: List = []
+        consumed: int = 0
+        current: int = 0
+        for i in range(self.width - 1, -1, -1):
+            current = tree.right[current] if (value >> i) & 1 else tree.left[current]
+            if current == NONE:
+                raise ValueError('code does not cover every bit pattern')
+            if tree.is_leaf(current):
+                symbols.append(tree.value(current))
+                consumed = self.width - i
+                current = 0
+        if not symbols:
+            return (), self.width, current
+        return tuple(symbols), consumed, None
+
+    def decode(self, data, start: int, end: int) -> List:
+        """
+        Decodes every symbol stored between two bit offsets of a buffer.
+
+        Parameters:
+            data: the bytes-like buffer holding the encoded stream.
+            start: the bit offset of the first encoded bit.
+            end: the bit offset just past the last encoded bit.
+
+        Return:
+            the list of decoded symbols, in order.
+        """
+        result: List = []
+        for symbols, _ in self.iter_decode(data, start, end):
+            result.extend(symbols)
+        return result
+
+    def iter_decode(self, data, start: int, end: int,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List, int]]:
+        """
+        Decodes the symbols stored between two bit offsets of a buffer, a chunk at a time.
+
+        Parameters:
+            data: the bytes-like buffer holding the encoded stream, such as bytes or an mmap.
+            start: the bit offset of the first encoded bit.
+            end: the bit offset just past the last encoded bit.
+            chunk_size: the number of symbols after which a chunk is yielded.
+
+        Return:
+            An iterator of tuples, containing a list of at least chunk_size decoded symbols (the
+            last may be shorter), and the bit offset just past the last of those symbols.
+        """
+        if start >= end:
+            return
+        if not self.table:
+            raise ValueError('an empty code cannot decode any bits')
+
+        width: int = self.width
+        mask: int = (1 << width) - 1
+        table = self.table
+        tree: FlatTree = self.tree
+        left, right, leaf, values = tree.left, tree.right, tree.leaf, tree.values
+        result: List = []
+
+        index: int = start >> 3
+        available: int = 8 - (start & 7)
+        accumulator: int = data[index] & ((1 << available) - 1)
+        index += 1
+        remaining: int = end - start
+
+        while remaining >= width:
+            while available < width:
+                accumulator = (accumulator << 8) | data[index]
+                index += 1
+                available += 8
+
+            symbols, consumed, node = table[(accumulator >> (available - width)) & mask]
+            available -= consumed
+            remaining -= consumed
+            accumulator &= (1 << available) - 1
+            if node is None:
+                result.extend(symbols)
+            else:
+                # The code is longer than the table, walk the rest of the tree.
+                while leaf[node] == NONE:
+                    if remaining == 0:
+                        raise ValueError('encoded stream ends in the middle of a symbol')
+                    if available == 0:
+                        accumulator = data[index]
+                        index += 1
+                        available = 8
+                    available -= 1
+                    remaining -= 1
+                    node = right[node] if (accumulator >> available) & 1 else left[node]
+                accumulator &= (1 << available) - 1
+                result.append(values[leaf[node]])
+
+            if len(result) >= chunk_size:
+                yield result, end - remaining
+                result = []
+
+        # Fewer bits than the table width are left, finish one bit at a time.
+        current: int = 0
+        while remaining > 0:
+            if available == 0:
+                accumulator = data[index]
+                index += 1
+                available = 8
+            available -= 1
+            remaining -= 1
+            current = right[current] if (accumulator >> available) & 1 else left[current]
+            if leaf[current] != NONE:
+                result.append(values[leaf[current]])
+                current = 0
+        if current != 0:
+            raise ValueError('encoded stream ends in the middle of a symbol')
+        if result:
+            yield result, end
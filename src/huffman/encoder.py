@@ -0,0 +1,101 @@
+from typing import Dict, List, Tuple
+
+WRITE_SIZE: int = 1 << 16
+
+
+def code_strings(table: Dict[int, Tuple[int, int]], size: int = 256) -> List[str]:
+    """
+    Converts a table of integer codes into the code of each byte value as a string of bits.
+
+    Parameters:
+        table: a dictionary of each byte value and a tuple of its code and code length.
+        size: the number of symbols, more than 256 for alphabets wider than bytes.
+
+    Return:
+        a list of size strings of '0' and '1', empty for symbols without a code.
+    """
+    strings: List[str] = [''] * size
+    for symbol, (code, length) in table.items():
+        strings[symbol] = format(code, f'0{length}b') if length else ''
+    return strings
+
+
+class BitWriter:
+
+    def __init__(self, sink, table: Dict[int, Tuple[int, int]] = None,
+                 buffer_size: int = WRITE_SIZE, strings: List[str] = None):
+        self.sink = sink
+        self.buffer_size: int = buffer_size
+        self.buffer: bytearray = bytearray()
+        self.pending: str = ''
+        self.written: int = 0
+        # Callers encoding many messages with one code can convert the table once.
+        self.strings: List[str] = strings if strings is not None else code_strings(table)
+
+    def _pack(self, bits: str):
+        """
+        Moves every whole byte of the given bits into the buffer, keeping the rest pending.
+        """
+        cut: int = len(bits) - len(bits) % 8
+        if cut:
+            self.buffer += int(bits[:cut], 2).to_bytes(cut // 8, 'big')
+            self.written += cut // 8
+            if len(self.buffer) >= self.buffer_size:
+                self.sink.write(self.buffer)
+                self.buffer = bytearray()
+        self.pending = bits[cut:]
+
+    def tell(self) -> int:
+        """
+        Returns the number of bits written so far, including those not yet flushed.
+        """
+        return self.written * 8 + len(self.pending)
+
+    def write_bits(self, value: int, length: int):
+        """
+        Writes a raw value, such as a header, most significant bit first.
+
+        Parameters:
+            value: the bits to write, as an integer.
+            length: the number of bits to write.
+        """
+        self._pack(self.pending + (format(value, f'0{length}b') if length else ''))
+
+    def write_string(self, bits: str):
+        """
+        Writes bits given as a string of '0' and '1', such as codes joined by the caller.
+        """
+        self._pack(self.pending + bits)
+
+    def write(self, data):
+        """
+        Encodes every byte of a chunk with the code table.
+
+        The codes of the whole chunk are joined and packed at once, which is far quicker in
+        Python than shifting each code into an integer accumulator.
+
+        Parameters:
+            data: a bytes-like chunk of symbols to encode.
+        """
+        strings: List[str] = self.strings
+        self._pack(self.pending + ''.join([strings[byte] for byte in data]))
+
+    def flush(self):
+        """
+        Writes every whole byte so far to the sink, keeping only a partial last byte pending.
+        """
+        if self.buffer:
+            self.sink.write(self.buffer)
+            self.buffer = bytearray()
+
+    def close(self) -> int:
+        """
+        Writes the last partial byte, padded with zeros, and flushes the buffer to the sink.
+
+        Return:
+            the number of padding bits in the last byte.
+        """
+        padding: int = -len(self.pending) % 8
+        self._pack(self.pending + '0' * padding)
+        self.flush()
+        return padding
@@ -1,54 +1,514 @@
+import codecs
+import io
+import mmap
+import os
+from huffman.character_counter import CharacterCounter
 from huffman.tree import HuffmanTree, Node
+from huffman.decoder import TableDecoder, DEFAULT_CHUNK_SIZE
+from huffman.flat import FlatTree
+from huffman.canonical import CanonicalCode
+from huffman.limited import package_merge
+from huffman.cache import DecoderCache, DECODER_CACHE
+from huffman.encoder import BitWriter, WRITE_SIZE
+from huffman.index import SeekIndex, DEFAULT_INTERVAL, index_name
+from huffman.stats import NullStats, Stats, NULL_STATS
+from huffman.stream import iter_chunks, iter_blocks, READ_SIZE
+from huffman.checked import CHECKED_BLOCK_SIZE, is_checked, write_checked, verify_checked
+from huffman.checked import decode_checked
 from bitstring import BitArray
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Set in the padding byte when the header holds canonical code lengths instead of the tree.
+CANONICAL_FLAG: int = 0x80
+
+# Decoded pages of a mapped archive are dropped from memory in steps of this many bytes.
+RELEASE_SIZE: int = 1 << 22
+
+
+def read_binary(file_name: str) -> Iterator[bytes]:
+    """
+    Iterates over the raw bytes of a file, in chunks.
+    """
+    with open(file_name, 'rb') as fp:
+        yield from iter_chunks(fp)
+
+
+def read_view(view: memoryview) -> Iterator[memoryview]:
+    """
+    Iterates over a buffer held in memory, in slices the size of the chunks read from a file.
+    """
+    for i in range(0, len(view), READ_SIZE):
+        yield view[i:i + READ_SIZE]
+
+
+def read_text(file_name: str) -> Iterator[bytes]:
+    """
+    Iterates over the lines of a text file, encoded as UTF-8.
+    """
+    with open(file_name) as fp:
+        for line in fp:
+            yield line.encode('utf-8')
 
 
 class HuffmanIO:
 
+    def __init__(self, canonical: bool = False, binary: bool = False, cache: DecoderCache = None,
+                 max_code_length: int = None, index_interval: int = None, stats: Stats = None,
+                 checksum: bool = False, block_size: int = CHECKED_BLOCK_SIZE):
+        if checksum and index_interval:
+            raise ValueError('checked archives are indexed by their blocks, not a seek index')
+        self.canonical: bool = canonical
+        self.binary: bool = binary
+        self.cache: DecoderCache = cache if cache is not None else DECODER_CACHE
+        self.max_code_length: int = max_code_length
+        # When set, compress_file also writes a sidecar index with a sync point this often.
+        self.index_interval: int = index_interval
+        # Timers and counters of every job, which cost next to nothing unless given.
+        self.stats: NullStats = stats if stats is not None else NULL_STATS
+        # When set, archives get a versioned header and a CRC32 per block of block_size bytes.
+        self.checksum: bool = checksum
+        self.block_size: int = block_size
+
     def compress_file(self, input_file_name, output_file_name):
-        tree: HuffmanTree = HuffmanTree(input_file_name)
+        """
+        Compresses a file. Text files are compressed as their UTF-8 bytes, binary files as is.
+
+        Parameters:
+            input_file_name: the file to compress.
+            output_file_name: the file to write the archive to.
+        """
+        with self.stats.capture():
+            if self.binary:
+                self._compress(lambda: read_binary(input_file_name), output_file_name)
+            else:
+                self._compress(lambda: read_text(input_file_name), output_file_name)
+
+    def _compress(self, read: Callable[[], Iterator[bytes]], output_file_name):
+        """
+        Compresses the bytes produced by read into a file, with its index when one is asked for.
+        """
+        with open(output_file_name, 'wb') as file_out:
+            index: SeekIndex = self._write_archive(read, file_out)
+        if index is not None:
+            index.stamp(output_file_name)
+            index.save(index_name(output_file_name))
+        self.stats.count('bytes_out', os.path.getsize(output_file_name))
+
+    def _write_archive(self, read: Callable[[], Iterator[bytes]], sink) -> SeekIndex:
+        """
+        Compresses the bytes produced by read, which is called once to count and once to encode.
+
+        Parameters:
+            read: returns an iterator of the bytes-like chunks to compress.
+            sink: the seekable binary stream to write the archive to, left empty for no bytes.
+
+        Return:
+            the index of the archive when index_interval is set, otherwise None.
+        """
+        stats: NullStats = self.stats
+        counter: CharacterCounter = CharacterCounter()
+        with stats.phase('count'):
+            for chunk in stats.timed_chunks('read', read()):
+                counter.add_text(chunk)
+                stats.count('bytes_in', len(chunk))
+        counts: Dict[int, int] = counter.get_characters()
+        if self.checksum:
+            self._write_checked(read, sink, counts)
+            return None
+        tree: HuffmanTree = HuffmanTree(counts=counts, stats=stats)
         root: Node = tree.construct_tree()
-        if root is not None:
-            padding: int = 0
-            with open(input_file_name) as file_in:
-                with open(output_file_name, 'wb') as file_out:
-
-                    # Write Place Holder for Padding
-                    file_out.write(BitArray('0b0000').tobytes())
-
-                    current: str = file_in.readline()
-                    bits: BitArray = BitArray()
-                    bits += tree.to_bits()
-                    while current != '':
-                        for char in current:
-                            bits += tree.get_character(char)
-                            if(len(bits) % 8 == 0):
-                                file_out.write(bits.tobytes())
-                                bits = BitArray()
-                        current = file_in.readline()
-                    file_out.write(bits.tobytes())
-                    padding = 8 - (len(bits) % 8)
-
-                # Write the Padding Number to the start of the file.
-                with open(output_file_name, 'rb+') as fp:
-                    fp.seek(0, 0)
-                    fp.write(padding.to_bytes(1, byteorder="little"))
-        else:
-            with open(output_file_name, 'w'):
-                pass
+        if root is None:
+            return None
+
+        with stats.phase('header'):
+            flag: int = 0
+            header: BitArray = tree.to_bits()
+            table: Dict[int, Tuple[int, int]] = tree.get_code_table()
+            code: CanonicalCode = CanonicalCode.from_tree(root)
+            if self.max_code_length is not None and code.max_length() > self.max_code_length:
+                # The tree is too deep, write the tree of the length limited code instead.
+                code = CanonicalCode(package_merge(counts, self.max_code_length))
+                header = code.to_tree().to_bits()
+                table = code.codes
+            # The canonical header is smaller for large alphabets, but a tree spends only 9 bits
+            # a leaf and 1 a branch, which is less for a handful of symbols.
+            if self.canonical:
+                lengths: bytes = code.to_bytes()
+                if len(lengths) * 8 <= len(header):
+                    flag = CANONICAL_FLAG
+                    header = BitArray(bytes=lengths)
+                    table = code.codes
+
+        with stats.phase('encode'):
+            # Write Place Holder for Padding
+            sink.write(BitArray('0b0000').tobytes())
+
+            writer: BitWriter = BitWriter(stats.timed_sink('write', sink), table)
+            writer.write_bits(header.uint, len(header))
+            chunks: Iterator[bytes] = stats.timed_chunks('read', read())
+            index: SeekIndex = None
+            if self.index_interval:
+                index = self._write_indexed(writer, chunks)
+            else:
+                for chunk in chunks:
+                    writer.write(chunk)
+            # A full last byte has always been recorded as 8 bits of padding.
+            padding: int = writer.close() or 8
+            stats.count('header_bits', len(header))
+            stats.count('blocks')
+
+        # Write the Padding Number to the start of the archive.
+        sink.seek(0, io.SEEK_SET)
+        sink.write((flag | padding).to_bytes(1, byteorder="little"))
+        sink.seek(0, io.SEEK_END)
+        return index
+
+    def _write_checked(self, read: Callable[[], Iterator[bytes]], sink, counts: Dict[int, int]):
+        """
+        Encodes the bytes produced by read into a checked archive, with the canonical code of
+        the given counts. Unlike other archives, one is written even when there are no bytes.
+        """
+        stats: NullStats = self.stats
+        with stats.phase('header'):
+            code: CanonicalCode = CanonicalCode({})
+            if counts:
+                code = CanonicalCode.from_counts(counts, self.max_code_length)
+        with stats.phase('encode'):
+            blocks: Iterator[bytes] = iter_blocks(stats.timed_chunks('read', read()),
+                                                  self.block_size)
+            stats.count('blocks', write_checked(stats.timed_sink('write', sink), code,
+                                                sum(counts.values()), blocks, self.block_size))
+
+    def compress(self, data) -> bytes:
+        """
+        Compresses bytes held in memory into an archive, as compress_file does for a file.
+
+        Parameters:
+            data: any bytes-like object, such as bytes, a bytearray or a memoryview.
+
+        Return:
+            the archive, empty when the data is unless it is checked.
+        """
+        view: memoryview = memoryview(data).cast('B')
+        sink: io.BytesIO = io.BytesIO()
+        with self.stats.capture():
+            self._write_archive(lambda: read_view(view), sink)
+        self.stats.count('bytes_out', sink.tell())
+        return sink.getvalue()
+
+    def decompress(self, data) -> bytes:
+        """
+        Decompresses an archive held in memory, written with any header layout.
+
+        Parameters:
+            data: any bytes-like archive, such as bytes or a memoryview.
+
+        Return:
+            the original bytes.
+        """
+        view: memoryview = memoryview(data).cast('B')
+        if not view:
+            return b''
+        with self.stats.capture():
+            return b''.join(self._decompress(view))
+
+    def verify(self, data) -> int:
+        """
+        Checks an archive held in memory is intact, much faster than decoding it.
+
+        The header and the framing and CRC32 of every block of a checked archive are checked,
+        nothing is decoded. Other archives carry no checksums, so only their header is.
+
+        Parameters:
+            data: any bytes-like archive, such as bytes or an mmap.
+
+        Return:
+            the number of blocks whose checksum matched, 0 for an archive without checksums.
+        """
+        if not len(data):
+            return 0
+        if is_checked(data):
+            return verify_checked(data)
+        _, start, end = self._decoder(data)
+        return 0
+
+    def verify_file(self, input_file_name) -> int:
+        """
+        Checks an archive file is intact, as verify does for one held in memory.
+        """
+        if os.path.getsize(input_file_name) == 0:
+            return 0
+        with open(input_file_name, 'rb') as file_in:
+            with mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.verify(data)
+
+    def _write_indexed(self, writer: BitWriter, chunks: Iterator[bytes]) -> SeekIndex:
+        """
+        Encodes chunks, recording a sync point every index_interval bytes of the original.
+
+        Parameters:
+            writer: the writer of the payload, which follows the one byte of padding.
+            chunks: the bytes to encode.
+
+        Return:
+            the index of the payload, without the size of the archive.
+        """
+        index: SeekIndex = SeekIndex()
+        interval: int = self.index_interval
+        position: int = 0
+        for chunk in chunks:
+            view: memoryview = memoryview(chunk)
+            while view:
+                step: int = interval - position % interval
+                if step == interval:
+                    index.add(position, 8 + writer.tell())
+                writer.write(view[:step])
+                position += len(view[:step])
+                view = view[step:]
+        return index
+
+    def index_file(self, input_file_name, interval: int = DEFAULT_INTERVAL) -> SeekIndex:
+        """
+        Writes the sidecar index of an existing archive, by decoding it once.
+
+        Parameters:
+            input_file_name: the archive to index.
+            interval: the least number of original bytes between two sync points.
+
+        Return:
+            the index written.
+        """
+        index: SeekIndex = SeekIndex()
+        index.stamp(input_file_name)
+        if index.archive_size > 0:
+            with open(input_file_name, 'rb') as file_in:
+                with mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    decoder, start, end = self._decoder(data)
+                    index.add(0, start)
+                    position: int = 0
+                    released: int = 0
+                    for symbols, offset in decoder.iter_decode(data, start, end, interval):
+                        position += len(symbols)
+                        if offset < end:
+                            index.add(position, offset)
+                        released = release_pages(data, released, offset // 8)
+        index.save(index_name(input_file_name))
+        return index
+
+    def _load_index(self, input_file_name) -> SeekIndex:
+        """
+        Loads the sidecar index of an archive. An index which does not match the archive, left
+        over from an earlier archive of the same name or in an older layout, is rebuilt.
+
+        Return:
+            the index, or None when the archive has none.
+        """
+        if not os.path.exists(index_name(input_file_name)):
+            return None
+        try:
+            index: SeekIndex = SeekIndex.load(index_name(input_file_name))
+            if index.matches(input_file_name):
+                return index
+        except ValueError:
+            pass
+        return self.index_file(input_file_name, self.index_interval or DEFAULT_INTERVAL)
+
+    def read_range(self, input_file_name, start: int, length: int) -> bytes:
+        """
+        Decodes a range of the original bytes of an archive.
+
+        Decoding starts from the last sync point of the sidecar index before the range, when
+        the archive has one, and stops once the range is complete. An index which no longer
+        matches the archive is rebuilt first. Without an index, the archive is decoded from its
+        start.
+
+        Parameters:
+            input_file_name: the archive to read from.
+            start: the offset in the original of the first byte to read.
+            length: the number of bytes to read.
+
+        Return:
+            the bytes of the range, shorter than length when the range ends past the original.
+        """
+        if length <= 0 or os.path.getsize(input_file_name) == 0:
+            return b''
 
-    def decompress_file(self, input_file_name, output_file_name):
         with open(input_file_name, 'rb') as file_in:
-            binary: bytes = file_in.read()
-        if(binary != b''):
-            data: BitArray = BitArray(filename=input_file_name)
-            tree: HuffmanTree = HuffmanTree(bit_array=data)
-            data: BitArray = tree.get_data()
+            with mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if is_checked(data):
+                    chunks: Iterator[Tuple[List, int]] = decode_checked(
+                        data, self.cache, start, min(length, DEFAULT_CHUNK_SIZE))
+                    position: int = start
+                else:
+                    decoder, offset, end = self._decoder(data)
+                    position = 0
+                    index: SeekIndex = self._load_index(input_file_name)
+                    if index is not None:
+                        position, offset = index.locate(start)
+                    chunk_size: int = min(start - position + length, DEFAULT_CHUNK_SIZE)
+                    chunks = decoder.iter_decode(data, offset, end, chunk_size)
+
+                skip: int = start - position
+                result: bytearray = bytearray()
+                for symbols, _ in chunks:
+                    if skip >= len(symbols):
+                        skip -= len(symbols)
+                        continue
+                    result += bytes(symbols[skip:])
+                    skip = 0
+                    if len(result) >= length:
+                        break
+                return bytes(result[:length])
+
+    def decompress_file(self, input_file_name, output_file_name):
+        """
+        Decompresses an archive, writing text as UTF-8 or binary files as is.
 
-            with open(output_file_name, 'w') as fp:
-                while data:
-                    character, data = tree.process_stream(data)
-                    fp.write(character)
+        The archive is memory mapped and decoded in place, and the output is written a chunk
+        at a time, so neither is ever held in memory as a whole.
 
+        Parameters:
+            input_file_name: the archive to decompress.
+            output_file_name: the file to write the original data to.
+        """
+        with self.stats.capture():
+            with open(output_file_name, 'wb' if self.binary else 'w', buffering=WRITE_SIZE) as fp:
+                sink = self.stats.timed_sink('write', fp)
+                for chunk in self.iter_decompress(input_file_name):
+                    sink.write(chunk)
+
+    def iter_decompress(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+        """
+        Decompresses an archive lazily, yielding the original data a chunk at a time.
+
+        Nothing is decoded before a chunk is asked for, so a consumer can stop early, such as
+        after the first lines of a log, and never holds more than a chunk of the output. A file
+        stays memory mapped until the iterator is exhausted or closed.
+
+        Parameters:
+            source: the file name of an archive, or a bytes-like archive held in memory.
+            chunk_size: the number of original bytes to decode per chunk. A chunk may be a few
+                bytes longer, and is shorter at the end of the archive or of a checked block.
+
+        Return:
+            An iterator of bytes, or of strings decoded from UTF-8 when binary is not set.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            if os.path.getsize(source) > 0:
+                with open(source, 'rb') as file_in:
+                    with mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        yield from self._iter_output(data, chunk_size)
+        else:
+            view: memoryview = memoryview(source).cast('B')
+            if view:
+                yield from self._iter_output(view, chunk_size)
+
+    def _iter_output(self, data, chunk_size: int) -> Iterator:
+        """
+        Decodes a non empty archive into chunks of bytes, or of text when binary is not set.
+        """
+        chunks: Iterator[bytes] = self._decompress(data, chunk_size)
+        if self.binary:
+            yield from chunks
+            return
+        # A character split across two chunks is held back until the second one.
+        text = codecs.getincrementaldecoder('utf-8')()
+        for chunk in chunks:
+            decoded: str = text.decode(chunk)
+            if decoded:
+                yield decoded
+        decoded = text.decode(b'', final=True)
+        if decoded:
+            yield decoded
+
+    def _decoder(self, data) -> Tuple[TableDecoder, int, int]:
+        """
+        Reads the header of a non empty archive, written with either unchecked header layout.
+
+        Parameters:
+            data: the bytes-like archive, such as bytes or an mmap.
+
+        Return:
+            A tuple, containing the decoder for the archive and the bit offsets of the start and
+            the end of its payload.
+        """
+        if is_checked(data):
+            raise ValueError('checked archives are read by block, without a seek index')
+        if not 1 <= data[0] & ~CANONICAL_FLAG <= 8:
+            # Such a padding byte is never written, and a lone leaf tree would decode anything.
+            raise ValueError('not an archive, or its first byte is corrupt')
+        try:
+            if data[0] & CANONICAL_FLAG:
+                size: int = CanonicalCode.header_size(data, 1)
+                header: bytes = bytes(data[1:1 + size])
+                decoder: TableDecoder = self.cache.get(
+                    b'C' + header, lambda: CanonicalCode.from_bytes(header)[0].decoder())
+                start: int = (1 + size) * 8
+                end: int = len(data) * 8 - (data[0] & ~CANONICAL_FLAG) % 8
+            else:
+                # The tree is measured in place, and only parsed when its decoder is not cached.
+                length: int = HuffmanTree.tree_length(data, 8)
+                size = (8 + length + 7) // 8
+                bits: int = int.from_bytes(data[1:size], 'big') >> ((size - 1) * 8 - length)
+                key: bytes = b'T' + length.to_bytes(2, 'big') + \
+                    bits.to_bytes((length + 7) // 8, 'big')
+                decoder = self.cache.get(
+                    key, lambda: TableDecoder(FlatTree.from_bits(data, 8)[0]))
+                start = 8 + length
+                end = len(data) * 8 - data[0] % 8
+        except IndexError:
+            raise ValueError('archive header is truncated') from None
+        if start > end:
+            raise ValueError('archive header is truncated')
+        return decoder, start, end
+
+    def _decompress(self, data, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Decodes a non empty archive, written with any header layout, a chunk at a time.
+
+        Parameters:
+            data: the bytes-like archive, such as bytes or an mmap.
+            chunk_size: the number of symbols after which a chunk is yielded.
+        """
+        stats: NullStats = self.stats
+        stats.count('bytes_in', len(data))
+        checked: bool = is_checked(data)
+        if checked:
+            # Each chunk is a block, checked against its CRC32 before it is decoded.
+            chunks: Iterator[Tuple[List, int]] = decode_checked(
+                data, self.cache, chunk_size=chunk_size)
         else:
-            with open(output_file_name, 'w'):
-                pass
+            with stats.phase('header'):
+                decoder, start, end = self._decoder(data)
+            stats.count('blocks')
+            chunks = decoder.iter_decode(data, start, end, chunk_size)
+        released: int = 0
+        for symbols, position in stats.timed_chunks('decode', chunks):
+            if checked:
+                stats.count('blocks')
+            stats.count('bytes_out', len(symbols))
+            yield bytes(symbols)
+            released = release_pages(data, released, position // 8)
+
+
+def release_pages(data, start: int, end: int) -> int:
+    """
+    Drops the pages of a memory mapped archive that have already been decoded.
+
+    Without this the mapped file stays resident, and the peak memory grows with the archive.
+
+    Parameters:
+        data: the archive being decoded, nothing is done unless it is an mmap.
+        start: the offset of the first page not yet released.
+        end: the offset of the first byte still to be decoded.
+
+    Return:
+        the offset of the first page not yet released.
+    """
+    if not isinstance(data, mmap.mmap) or not hasattr(mmap, 'MADV_DONTNEED'):
+        return start
+    end -= end % mmap.PAGESIZE
+    if end - start >= RELEASE_SIZE:
+        data.madvise(mmap.MADV_DONTNEED, start, end - start)
+        return end
+    return start
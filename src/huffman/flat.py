@@ -0,0 +1,195 @@
+from array import array
+from huffman.node import Node
+from bitstring import BitArray
+from typing import Dict, List, Tuple
+
+# The index of a child which does not exist, or of the value of a node which is not a leaf.
+NONE: int = -1
+
+
+class FlatTree:
+
+    def __init__(self):
+        self.left: array = array('i')
+        self.right: array = array('i')
+        self.leaf: array = array('i')
+        self.values: List = []
+
+    def __len__(self) -> int:
+        return len(self.leaf)
+
+    def add_node(self) -> int:
+        """
+        Appends a branch without children, returning its index.
+        """
+        self.left.append(NONE)
+        self.right.append(NONE)
+        self.leaf.append(NONE)
+        return len(self.leaf) - 1
+
+    def add_leaf(self, value) -> int:
+        """
+        Appends a leaf holding the given value, returning its index.
+        """
+        index: int = self.add_node()
+        self.leaf[index] = len(self.values)
+        self.values.append(value)
+        return index
+
+    def is_leaf(self, index: int) -> bool:
+        """
+        Returns whether the node at the given index is a leaf.
+        """
+        return self.leaf[index] != NONE
+
+    def value(self, index: int):
+        """
+        Returns the value held by the leaf at the given index.
+        """
+        return self.values[self.leaf[index]]
+
+    @staticmethod
+    def from_node(root: Node) -> 'FlatTree':
+        """
+        Copies a tree of nodes into a flat tree, the root becoming index 0.
+
+        Parameters:
+            root: the root of the tree of nodes.
+
+        Return:
+            the flat tree.
+        """
+        tree: FlatTree = FlatTree()
+        stack: List[Tuple[Node, int, bool]] = [(root, NONE, False)]
+        while stack:
+            node, parent, is_right = stack.pop()
+            index: int = tree.add_leaf(node.data) if node.data is not None else tree.add_node()
+            if parent != NONE:
+                if is_right:
+                    tree.right[parent] = index
+                else:
+                    tree.left[parent] = index
+            if node.data is None:
+                stack.append((node.right, index, True))
+                stack.append((node.left, index, False))
+        return tree
+
+    @staticmethod
+    def from_codes(codes: Dict[int, Tuple[int, int]]) -> 'FlatTree':
+        """
+        Builds the tree of a prefix code.
+
+        Parameters:
+            codes: a dictionary of each value and a tuple of its code and code length.
+
+        Return:
+            the flat tree, where a code with an unused sibling leaves that child missing.
+        """
+        tree: FlatTree = FlatTree()
+        tree.add_node()
+        for value, (code, length) in codes.items():
+            current: int = 0
+            for i in range(length - 1, 0, -1):
+                children: array = tree.right if (code >> i) & 1 else tree.left
+                if children[current] == NONE:
+                    children[current] = tree.add_node()
+                current = children[current]
+            children = tree.right if code & 1 else tree.left
+            children[current] = tree.add_leaf(value)
+        return tree
+
+    def to_node(self, index: int = 0) -> Node:
+        """
+        Copies the subtree at the given index into a tree of nodes, such as for tests.
+        """
+        nodes: Dict[int, Node] = {}
+        stack: List[int] = [index]
+        while stack:
+            current: int = stack.pop()
+            if self.is_leaf(current):
+                nodes[current] = Node(data=self.value(current))
+            else:
+                nodes[current] = Node()
+                stack.extend(child for child in (self.left[current], self.right[current])
+                             if child != NONE)
+        for current, node in nodes.items():
+            node.left = nodes.get(self.left[current])
+            node.right = nodes.get(self.right[current])
+        return nodes[index]
+
+    def code_table(self) -> Dict:
+        """
+        Walks the tree, returning the code of every leaf.
+
+        Return:
+            a dictionary of each leaf value and a tuple of its code and code length.
+        """
+        result: Dict = {}
+        stack: List[Tuple[int, int, int]] = [(0, 0, 0)]
+        while stack:
+            index, code, length = stack.pop()
+            if self.is_leaf(index):
+                result[self.value(index)] = (code, length)
+                continue
+            if self.right[index] != NONE:
+                stack.append((self.right[index], (code << 1) | 1, length + 1))
+            if self.left[index] != NONE:
+                stack.append((self.left[index], code << 1, length + 1))
+        return result
+
+    def to_bits(self) -> BitArray:
+        """
+        Writes the tree in the layout of Node.to_bits, for leaves holding byte values.
+        """
+        parts: List[str] = []
+        stack: List[int] = [0]
+        while stack:
+            index: int = stack.pop()
+            if self.is_leaf(index):
+                parts.append('0' + format(self.value(index), '08b'))
+            else:
+                parts.append('1')
+                stack.append(self.right[index])
+                stack.append(self.left[index])
+        return BitArray(bin=''.join(parts))
+
+    @staticmethod
+    def from_bits(data, start: int) -> Tuple['FlatTree', int]:
+        """
+        Reads a tree written by Node.to_bits in place, with leaves read as byte values.
+
+        Parameters:
+            data: the bytes-like buffer holding the tree.
+            start: the bit offset of the first bit of the tree.
+
+        Return:
+            A tuple, containing the tree and the bit offset just past it.
+        """
+        tree: FlatTree = FlatTree()
+        position: int = start
+        # Each entry is a branch still missing a child, and whether it is the right one.
+        stack: List[Tuple[int, bool]] = []
+        while True:
+            bit: int = (data[position >> 3] >> (7 - (position & 7))) & 1
+            position += 1
+            if bit:
+                index: int = tree.add_node()
+            else:
+                offset: int = position & 7
+                value: int = data[position >> 3]
+                if offset:
+                    value = ((value << 8) | data[(position >> 3) + 1]) >> (8 - offset)
+                index = tree.add_leaf(value & 0xff)
+                position += 8
+
+            if stack:
+                parent, is_right = stack.pop()
+                if is_right:
+                    tree.right[parent] = index
+                else:
+                    tree.left[parent] = index
+                    stack.append((parent, True))
+            if bit:
+                stack.append((index, False))
+            elif not stack:
+                return tree, position
@@ -0,0 +1,133 @@
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import Tuple
+
+# The magic of the first layout, without a checksum, was b'HUFI'. Such indexes are rebuilt.
+INDEX_MAGIC: bytes = b'HUFX'
+INDEX_SUFFIX: str = '.idx'
+
+# The original bytes between two sync points, when an index is written while compressing.
+DEFAULT_INTERVAL: int = 1 << 20
+
+# The bytes at each end of an archive checksummed into its index. The start holds the code
+# header, so an index left over from another archive of the same size is told apart without
+# reading the whole archive.
+FINGERPRINT_SIZE: int = 1 << 12
+
+# An index holds the size and checksum of its archive and the number of sync points, then each
+# sync point as the offset of a byte of the original and the bit offset in the archive of its
+# code.
+INDEX_HEADER = struct.Struct('<4sQIQ')
+SYNC_POINT = struct.Struct('<QQ')
+
+
+def index_name(archive_name: str) -> str:
+    """
+    Returns the name of the sidecar index of an archive.
+    """
+    return archive_name + INDEX_SUFFIX
+
+
+def archive_fingerprint(file_name: str) -> Tuple[int, int]:
+    """
+    Returns the size of an archive and a CRC32 of its first and last FINGERPRINT_SIZE bytes.
+    """
+    with open(file_name, 'rb') as fp:
+        head: bytes = fp.read(FINGERPRINT_SIZE)
+        size: int = fp.seek(0, os.SEEK_END)
+        fp.seek(max(size - FINGERPRINT_SIZE, len(head)))
+        return size, zlib.crc32(fp.read(), zlib.crc32(head))
+
+
+class SeekIndex:
+
+    def __init__(self, archive_size: int = 0, archive_checksum: int = 0):
+        self.archive_size: int = archive_size
+        self.archive_checksum: int = archive_checksum
+        self.positions: array = array('Q')
+        self.offsets: array = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, position: int, offset: int):
+        """
+        Records a sync point, after every sync point already recorded.
+
+        Parameters:
+            position: the offset in the original of the first byte decoded from the sync point.
+            offset: the bit offset in the archive of the code of that byte.
+        """
+        self.positions.append(position)
+        self.offsets.append(offset)
+
+    def stamp(self, file_name: str):
+        """
+        Records the size and checksum of the archive this index belongs to.
+        """
+        self.archive_size, self.archive_checksum = archive_fingerprint(file_name)
+
+    def matches(self, file_name: str) -> bool:
+        """
+        Tells whether the archive is still the one this index was stamped with.
+        """
+        return (self.archive_size, self.archive_checksum) == archive_fingerprint(file_name)
+
+    def locate(self, position: int) -> Tuple[int, int]:
+        """
+        Finds the last sync point at or before an offset of the original.
+
+        Parameters:
+            position: the offset in the original to seek to.
+
+        Return:
+            A tuple, containing the original offset and the archive bit offset of the sync point.
+        """
+        i: int = bisect_right(self.positions, position) - 1
+        if i < 0:
+            raise ValueError(f'no sync point at or before {position}')
+        return self.positions[i], self.offsets[i]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the index.
+        """
+        parts = [INDEX_HEADER.pack(INDEX_MAGIC, self.archive_size, self.archive_checksum,
+                                   len(self))]
+        parts.extend(SYNC_POINT.pack(position, offset)
+                     for position, offset in zip(self.positions, self.offsets))
+        return b''.join(parts)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'SeekIndex':
+        """
+        Reads an index written by to_bytes.
+        """
+        if len(data) < INDEX_HEADER.size or data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError('not a seek index')
+        _, archive_size, archive_checksum, count = INDEX_HEADER.unpack_from(data)
+        end: int = INDEX_HEADER.size + count * SYNC_POINT.size
+        if len(data) < end:
+            raise ValueError('seek index is truncated')
+        index: SeekIndex = SeekIndex(archive_size, archive_checksum)
+        for position, offset in SYNC_POINT.iter_unpack(data[INDEX_HEADER.size:end]):
+            index.add(position, offset)
+        return index
+
+    def save(self, file_name: str):
+        """
+        Writes the index to a file.
+        """
+        with open(file_name, 'wb') as fp:
+            fp.write(self.to_bytes())
+
+    @staticmethod
+    def load(file_name: str) -> 'SeekIndex':
+        """
+        Reads an index from a file written by save.
+        """
+        with open(file_name, 'rb') as fp:
+            return SeekIndex.from_bytes(fp.read())
@@ -0,0 +1,96 @@
+from heapq import merge
+from huffman.tree import HuffmanTree
+from huffman.node import Node
+from typing import Dict, List, Tuple
+
+# The longest code the dense canonical header can describe, and a table of 32K entries.
+DEFAULT_MAX_LENGTH: int = 15
+
+
+def package_merge(counts: Dict, max_length: int = DEFAULT_MAX_LENGTH) -> Dict:
+    """
+    Finds the optimal code lengths for the given counts, none longer than max_length.
+
+    Each symbol starts as an item weighing its count. Each of max_length - 1 rounds pairs up
+    the lightest items of the previous round into packages, and merges those back with the
+    symbols. The lightest 2n - 2 items of the last round hold each symbol once per bit of its
+    code.
+
+    Parameters:
+        counts: a dictionary of each symbol and its number of occurrences.
+        max_length: the longest code length allowed.
+
+    Return:
+        a dictionary of each symbol and its code length.
+    """
+    symbols: List = sorted(counts, key=lambda symbol: counts[symbol])
+    if len(symbols) <= 1:
+        return {symbol: 1 for symbol in symbols}
+    if len(symbols) > 1 << max_length:
+        raise ValueError(
+            f'{len(symbols)} symbols cannot all have codes of {max_length} bits or less')
+
+    # Items are indices into these lists. Symbols come first, and hold their own index as a
+    # left child and no right child.
+    weights: List[int] = [counts[symbol] for symbol in symbols]
+    left: List[int] = list(range(len(symbols)))
+    right: List[int] = [-1] * len(symbols)
+
+    leaves: List[int] = list(left)
+    current: List[int] = leaves
+    for _ in range(max_length - 1):
+        packages: List[int] = []
+        for i in range(0, len(current) - 1, 2):
+            packages.append(len(weights))
+            weights.append(weights[current[i]] + weights[current[i + 1]])
+            left.append(current[i])
+            right.append(current[i + 1])
+        # Ties go to the symbols, so equal weights never produce longer codes than needed.
+        current = list(merge(leaves, packages, key=weights.__getitem__))
+
+    lengths: List[int] = [0] * len(symbols)
+    stack: List[int] = current[:2 * len(symbols) - 2]
+    while stack:
+        item: int = stack.pop()
+        if right[item] == -1:
+            lengths[item] += 1
+        else:
+            stack.append(left[item])
+            stack.append(right[item])
+    return {symbol: length for symbol, length in zip(symbols, lengths)}
+
+
+def huffman_lengths(counts: Dict) -> Dict:
+    """
+    Returns the code lengths of the unconstrained huffman tree for the given counts.
+    """
+    tree: HuffmanTree = HuffmanTree(counts=counts)
+    root: Node = tree.construct_tree()
+    if root is None:
+        return {}
+    if root.data is not None:
+        return {root.data: 1}
+    return {symbol: length for symbol, (_, length) in tree.get_code_table().items()}
+
+
+def encoded_size(counts: Dict, lengths: Dict) -> int:
+    """
+    Returns the number of bits needed to encode the counted symbols with the given lengths.
+    """
+    return sum(count * lengths[symbol] for symbol, count in counts.items())
+
+
+def limit_cost(counts: Dict, max_length: int = DEFAULT_MAX_LENGTH) -> Tuple[int, int]:
+    """
+    Measures what capping the code length costs for the given counts.
+
+    Parameters:
+        counts: a dictionary of each symbol and its number of occurrences.
+        max_length: the longest code length allowed.
+
+    Return:
+        A tuple, containing the encoded size in bits with unconstrained huffman codes and with
+        codes of at most max_length bits. Their ratio less one is the relative cost of the cap.
+    """
+    unlimited: int = encoded_size(counts, huffman_lengths(counts))
+    return unlimited, encoded_size(counts, package_merge(counts, max_length))
@@ -0,0 +1,90 @@
+from huffman.character_counter import ByteCounter
+from huffman.canonical import CanonicalCode
+from huffman.file import HuffmanIO
+from huffman.tables import CodeTable
+from huffman.cache import DecoderCache
+from typing import Iterable, List, Tuple
+
+
+def compress(data, canonical: bool = True, max_code_length: int = None,
+             checksum: bool = False) -> bytes:
+    """
+    Compresses bytes held in memory, without touching the file system.
+
+    Parameters:
+        data: any bytes-like object, read in place.
+        canonical: whether to write the canonical header rather than the tree, when it is smaller.
+        max_code_length: the longest code length allowed, or None for no limit.
+        checksum: whether to write a versioned header and a CRC32 per block.
+
+    Return:
+        the archive, in the layout of HuffmanIO.compress_file.
+    """
+    writer: HuffmanIO = HuffmanIO(canonical=canonical, binary=True,
+                                  max_code_length=max_code_length, checksum=checksum)
+    return writer.compress(data)
+
+
+def decompress(data, cache: DecoderCache = None) -> bytes:
+    """
+    Decompresses an archive held in memory, written by compress or HuffmanIO.
+
+    Parameters:
+        data: any bytes-like archive, read in place.
+        cache: the cache to look the decoder for the archive's header up in.
+
+    Return:
+        the original bytes.
+    """
+    return HuffmanIO(binary=True, cache=cache).decompress(data)
+
+
+def verify(data) -> int:
+    """
+    Checks an archive held in memory is intact without decoding it, see HuffmanIO.verify.
+
+    Return:
+        the number of blocks whose checksum matched, 0 for an archive without checksums.
+    """
+    return HuffmanIO(binary=True).verify(data)
+
+
+def compress_many(buffers: Iterable, table_id: int = 0,
+                  max_code_length: int = None) -> Tuple[bytes, List[bytes]]:
+    """
+    Compresses a batch of buffers with one code, built from their combined byte counts.
+
+    The code and its encoder are built once for the whole batch, and each buffer is only
+    prefixed by the table id and its padding, so thousands of small buffers cost little more
+    than one large one.
+
+    Parameters:
+        buffers: the bytes-like buffers to compress, such as memoryviews, read in place.
+        table_id: the id written into every compressed buffer.
+        max_code_length: the longest code length allowed, or None for no limit.
+
+    Return:
+        A tuple, containing the serialized code table and each compressed buffer in order.
+    """
+    views: List[memoryview] = [memoryview(buffer).cast('B') for buffer in buffers]
+    counter: ByteCounter = ByteCounter()
+    for view in views:
+        counter.add_text(view)
+    code: CanonicalCode = CanonicalCode.from_counts(counter.get_characters(), max_code_length)
+    table: CodeTable = CodeTable(table_id, code)
+    return table.to_bytes(), [table.compress(view) for view in views]
+
+
+def decompress_many(table: bytes, messages: Iterable) -> List[bytes]:
+    """
+    Decompresses a batch written by compress_many.
+
+    Parameters:
+        table: the serialized code table of the batch.
+        messages: the compressed buffers.
+
+    Return:
+        each original buffer, in order.
+    """
+    code_table: CodeTable = CodeTable.from_bytes(table)
+    return [code_table.decompress(message) for message in messages]
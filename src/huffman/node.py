@@ -1,8 +1,12 @@
 from bitstring import BitArray
+from typing import Dict, List, Tuple
 
 
 class Node:
 
+    # Trees of a million symbols hold two million nodes, so they do without an instance dict.
+    __slots__ = ('count', 'data', 'left', 'right')
+
     def __init__(self, count: int = 0, data: str = None, left=None, right=None):
         self.count: int = count
         self.data: str = data
@@ -10,43 +14,87 @@ class Node:
         self.left: Node = left
 
     def __repr__(self):
-        return f'[{self.data}:{self.count}]\n\t({self.left})\n\t({self.right})'
+        # Children are formatted before their parents, without recursing.
+        text: Dict[int, str] = {}
+        stack: List[Tuple[Node, bool]] = [(self, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                left: str = text[id(node.left)] if node.left is not None else 'None'
+                right: str = text[id(node.right)] if node.right is not None else 'None'
+                text[id(node)] = f'[{node.data}:{node.count}]\n\t({left})\n\t({right})'
+                continue
+            stack.append((node, True))
+            for child in (node.left, node.right):
+                if child is not None:
+                    stack.append((child, False))
+        return text[id(self)]
 
     def __eq__(self, other):
-        current_equal: bool = self.count == other.count and self.data == other.data
-        children_equal: bool = self.left == other.left and self.right == other.right
-
-        return current_equal and children_equal
+        if not isinstance(other, Node):
+            return NotImplemented
+        stack: List[Tuple[Node, Node]] = [(self, other)]
+        while stack:
+            first, second = stack.pop()
+            if first is None or second is None:
+                if first is not second:
+                    return False
+                continue
+            if first.count != second.count or first.data != second.data:
+                return False
+            stack.append((first.right, second.right))
+            stack.append((first.left, second.left))
+        return True
 
     def to_bits(self) -> BitArray:
         """
         Returns the Binary Representation of this Node
 
+        Leaves hold either a character or a byte value, both are written as 8 bits.
+
         Return:
             the binary representation of this node.
         """
-        if self.data is None:
-            return BitArray('0b1') + self.left.to_bits() + self.right.to_bits()
-        else:
-            return BitArray('0b0') + BitArray(bytes(self.data, encoding='utf8'))
+        parts: List[str] = []
+        stack: List[Node] = [self]
+        while stack:
+            node: Node = stack.pop()
+            if node.data is None:
+                parts.append('1')
+                stack.append(node.right)
+                stack.append(node.left)
+            elif isinstance(node.data, int):
+                parts.append('0' + format(node.data, '08b'))
+            else:
+                parts.append('0' + BitArray(bytes(node.data, encoding='utf8')).bin)
+        return BitArray(bin=''.join(parts))
 
-    def from_bits(self, bits: BitArray) -> BitArray:
+    def from_bits(self, bits: BitArray, binary: bool = False) -> BitArray:
         """
         Overrides the current node, with the well-formed bit array
 
         Parameters:
             bits: the well formed bitarray representing a node in the binary tree.
+            binary: whether leaves should hold byte values rather than characters.
 
         Return:
             any left over bits in the bit array after parsing bits.
         """
-        if bits[0] == 0:
-            self.data: str = bits[1:9].tobytes().decode(encoding="utf-8")
-            return bits[9:]
-        else:
-            self.data: str = None
-            self.left = Node()
-            self.right = Node()
-            remaining: BitArray = self.left.from_bits(bits[1:])
-            remaining = self.right.from_bits(remaining)
-            return remaining
+        position: int = 0
+        stack: List[Node] = [self]
+        while stack:
+            node: Node = stack.pop()
+            if bits[position] == 0:
+                if binary:
+                    node.data = bits[position + 1:position + 9].uint
+                else:
+                    node.data = bits[position + 1:position + 9].tobytes().decode(encoding="utf-8")
+                position += 9
+            else:
+                node.data = None
+                node.left = Node()
+                node.right = Node()
+                stack.append(node.right)
+                stack.append(node.left)
+                position += 1
+        return bits[position:]
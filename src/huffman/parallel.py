@@ -0,0 +1,80 @@
+import os
+from functools import partial
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from huffman.stream import HuffmanStream, BlockReader, DEFAULT_BLOCK_SIZE, BLOCK
+from huffman.stream import iter_blocks, encode_block, decode_block
+from typing import Callable, Deque, Iterable, Iterator
+
+
+def ordered_map(pool: Executor, function: Callable, items: Iterable, window: int) -> Iterator:
+    """
+    Maps a function over items on a pool, yielding the results in the order of the items.
+
+    At most window items are in flight at once, so a long input is never read ahead of the
+    results being consumed.
+
+    Parameters:
+        pool: the executor to run the function on.
+        function: the function to apply to each item.
+        items: the arguments to the function.
+        window: the largest number of pending calls.
+    """
+    pending: Deque[Future] = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(function, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+class ParallelHuffmanStream(HuffmanStream):
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, workers: int = None,
+                 max_code_length: int = None):
+        super().__init__(block_size, max_code_length)
+        self.workers: int = workers or os.cpu_count() or 1
+
+    def compress(self, source, sink):
+        """
+        Compresses a source into a sink, encoding the blocks on a pool of processes.
+
+        The output is identical to HuffmanStream.compress with the same block size.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        with ProcessPoolExecutor(self.workers) as pool:
+            blocks: Iterator[bytes] = iter_blocks(source, self.block_size)
+            encode: Callable[[bytes], bytes] = partial(
+                encode_block, max_length=self.max_code_length)
+            for encoded in ordered_map(pool, encode, blocks, 2 * self.workers):
+                sink.write(encoded)
+        sink.write(BLOCK.pack(0, 0))
+
+    def decompress(self, source, sink):
+        """
+        Decompresses a stream written by compress, decoding the blocks on a pool of processes.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        reader: BlockReader = BlockReader(source)
+        lengths: Deque[int] = deque()
+
+        def bodies() -> Iterator[bytes]:
+            block = reader.read_block()
+            while block is not None:
+                length, body = block
+                lengths.append(length)
+                yield body
+                block = reader.read_block()
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            for data in ordered_map(pool, decode_block, bodies(), 2 * self.workers):
+                if len(data) != lengths.popleft():
+                    raise ValueError('decoded block does not match its length')
+                sink.write(data)
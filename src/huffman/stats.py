@@ -0,0 +1,163 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+
+class NullStats:
+    """
+    The stats of uninstrumented objects, every call does nothing.
+
+    Instrumented code only reports per phase or per chunk, never per symbol, so with these
+    stats the cost is a few no-op calls per file.
+    """
+
+    enabled: bool = False
+
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    @contextmanager
+    def capture(self):
+        yield
+
+    def timed_chunks(self, name: str, chunks: Iterator) -> Iterator:
+        return chunks
+
+    def timed_sink(self, name: str, sink):
+        return sink
+
+
+class TimedSink:
+    """
+    Wraps a writable stream, timing every write into a phase of some stats.
+    """
+
+    def __init__(self, sink, stats: 'Stats', name: str):
+        self.sink = sink
+        self.stats: Stats = stats
+        self.name: str = name
+
+    def write(self, data):
+        with self.stats.phase(self.name):
+            return self.sink.write(data)
+
+
+class Stats(NullStats):
+    """
+    Collects the time spent in each phase of a job, and counts of what it processed.
+
+    Phases may nest, such as read and write inside count and encode, so their times do not
+    add up to the total.
+    """
+
+    enabled: bool = True
+
+    def __init__(self, callback: Callable[[str, float], None] = None, profile: bool = False,
+                 trace_memory: bool = False):
+        """
+        Parameters:
+            callback: called with the name and seconds of every phase as it ends.
+            profile: whether capture runs the job under cProfile.
+            trace_memory: whether capture measures the peak memory allocated with tracemalloc.
+        """
+        self.timers: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.callback: Callable[[str, float], None] = callback
+        self.profile: bool = profile
+        self.trace_memory: bool = trace_memory
+        self.profiler: cProfile.Profile = None
+
+    def __repr__(self) -> str:
+        timers: str = ', '.join(f'{name}={seconds:.4f}s' for name, seconds in self.timers.items())
+        counters: str = ', '.join(f'{name}={count}' for name, count in self.counters.items())
+        return f'Stats({timers}; {counters})'
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times the body of a with statement, adding it to the named phase.
+        """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - start
+            self.timers[name] = self.timers.get(name, 0.0) + elapsed
+            if self.callback is not None:
+                self.callback(name, elapsed)
+
+    def count(self, name: str, amount: int = 1):
+        """
+        Adds to the named counter.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def capture(self):
+        """
+        Runs the body of a with statement under cProfile and tracemalloc, when enabled.
+
+        The profile is kept in profiler, and the peak memory in the peak_memory counter.
+        """
+        tracing: bool = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.profile:
+            self.profiler = self.profiler or cProfile.Profile()
+            self.profiler.enable()
+        try:
+            yield
+        finally:
+            if self.profile:
+                self.profiler.disable()
+            if self.trace_memory:
+                peak: int = tracemalloc.get_traced_memory()[1]
+                self.counters['peak_memory'] = max(self.counters.get('peak_memory', 0), peak)
+            if tracing:
+                tracemalloc.stop()
+
+    def timed_chunks(self, name: str, chunks: Iterator) -> Iterator:
+        """
+        Wraps an iterator, timing every step of it into the named phase.
+        """
+        iterator: Iterator = iter(chunks)
+        while True:
+            with self.phase(name):
+                chunk = next(iterator, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def timed_sink(self, name: str, sink):
+        """
+        Wraps a writable stream, timing every write into the named phase.
+        """
+        return TimedSink(sink, self, name)
+
+    def profile_report(self, limit: int = 20) -> str:
+        """
+        Returns the functions which took the most cumulative time under capture.
+        """
+        if self.profiler is None:
+            return ''
+        text: io.StringIO = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(limit)
+        return text.getvalue()
+
+    def to_dict(self) -> Dict:
+        """
+        Returns the timers and counters, such as to log them as JSON.
+        """
+        return {'timers': dict(self.timers), 'counters': dict(self.counters)}
+
+
+# The stats shared by every object which was not given its own.
+NULL_STATS: NullStats = NullStats()
@@ -0,0 +1,220 @@
+import io
+import struct
+from huffman.character_counter import ByteCounter
+from huffman.canonical import CanonicalCode
+from huffman.cache import DecoderCache, DECODER_CACHE
+from huffman.decoder import TableDecoder
+from huffman.encoder import BitWriter
+from huffman.limited import encoded_size
+from huffman.stats import NullStats, NULL_STATS
+from typing import Dict, Iterator, Tuple
+
+DEFAULT_BLOCK_SIZE: int = 1 << 16
+READ_SIZE: int = 1 << 16
+
+# Each block starts with its original length and the length of its body.
+# A block with an original length of zero ends the stream.
+BLOCK = struct.Struct('<II')
+
+# The first byte of the body of a block stored as is, in place of a code header. It reads as a
+# dense header with codes longer than the dense layout allows, which is never written.
+STORED_BLOCK: int = 0xff
+
+
+def iter_chunks(source, size: int = READ_SIZE) -> Iterator[bytes]:
+    """
+    Iterates over the bytes of a readable binary stream, or an iterable of byte chunks.
+
+    Parameters:
+        source: an object with a read method, or an iterable of bytes-like chunks.
+        size: the number of bytes to request per read.
+    """
+    if hasattr(source, 'read'):
+        chunk: bytes = source.read(size)
+        while chunk:
+            yield chunk
+            chunk = source.read(size)
+    else:
+        for chunk in source:
+            if chunk:
+                yield chunk
+
+
+def iter_blocks(source, block_size: int) -> Iterator[bytes]:
+    """
+    Regroups the chunks of a source into blocks of block_size bytes, the last may be shorter.
+    """
+    buffer: bytearray = bytearray()
+    for chunk in iter_chunks(source, block_size):
+        buffer += chunk
+        while len(buffer) >= block_size:
+            yield bytes(buffer[:block_size])
+            del buffer[:block_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def encode_block(data: bytes, max_length: int = None) -> bytes:
+    """
+    Compresses one block with a code built from its own byte counts.
+
+    The coded size is worked out from the counts first, and a block which coding would not
+    shrink, such as random or already compressed data, is stored as is without encoding it.
+
+    Parameters:
+        data: the non empty block to compress.
+        max_length: the longest code length allowed, or None for no limit.
+
+    Return:
+        the framed block, its original and body lengths then the body.
+    """
+    counter: ByteCounter = ByteCounter()
+    counter.add_text(data)
+    counts: Dict[int, int] = counter.get_characters()
+    code: CanonicalCode = CanonicalCode.from_counts(counts, max_length)
+    header: bytes = code.to_bytes()
+    if len(header) + (encoded_size(counts, code.lengths) + 7) // 8 >= len(data):
+        return b''.join([BLOCK.pack(len(data), len(data) + 1), bytes([STORED_BLOCK]), data])
+
+    payload: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(payload, code.codes)
+    writer.write(data)
+    padding: int = writer.close()
+    return b''.join([
+        BLOCK.pack(len(data), len(header) + payload.tell() + 1),
+        header,
+        payload.getvalue(),
+        bytes([padding]),
+    ])
+
+
+def decode_block(body: bytes, cache: DecoderCache = DECODER_CACHE) -> bytes:
+    """
+    Decompresses the body of one block, which a stored block is only copied out of.
+
+    Parameters:
+        body: the code header, payload and padding trailer of the block.
+        cache: the cache to look the decoder for the block's header up in.
+
+    Return:
+        the original bytes of the block.
+    """
+    try:
+        if body[0] == STORED_BLOCK:
+            return bytes(body[1:])
+        size: int = CanonicalCode.header_size(body)
+    except IndexError:
+        raise ValueError('block header is truncated') from None
+    if size >= len(body):
+        raise ValueError('block header is truncated')
+    header: bytes = bytes(body[:size])
+    decoder: TableDecoder = cache.get(
+        b'C' + header, lambda: CanonicalCode.from_bytes(header)[0].decoder())
+    end: int = (len(body) - 1) * 8 - body[-1]
+    return bytes(decoder.decode(body, size * 8, end))
+
+
+def block_header_size(body) -> int:
+    """
+    Returns the number of bytes at the start of the body of a block spent on its header.
+    """
+    return 1 if body[0] == STORED_BLOCK else CanonicalCode.header_size(body)
+
+
+class BlockReader:
+
+    def __init__(self, source):
+        self.chunks: Iterator[bytes] = iter_chunks(source)
+        self.buffer: bytearray = bytearray()
+
+    def read(self, size: int) -> bytes:
+        """
+        Reads exactly size bytes from the source.
+
+        Parameters:
+            size: the number of bytes to read.
+
+        Return:
+            the bytes read.
+        """
+        while len(self.buffer) < size:
+            chunk: bytes = next(self.chunks, None)
+            if chunk is None:
+                raise ValueError('compressed stream is truncated')
+            self.buffer += chunk
+        result: bytes = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return result
+
+    def read_block(self) -> Tuple[int, bytes]:
+        """
+        Reads the next framed block from the source.
+
+        Return:
+            A tuple, containing the original length and the body of the block, or None once
+            the end of the stream has been reached.
+        """
+        length, size = BLOCK.unpack(self.read(BLOCK.size))
+        if length == 0:
+            return None
+        return length, self.read(size)
+
+
+class HuffmanStream:
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, max_code_length: int = None,
+                 stats: NullStats = NULL_STATS):
+        self.block_size: int = block_size
+        self.max_code_length: int = max_code_length
+        self.stats: NullStats = stats
+
+    def compress(self, source, sink):
+        """
+        Compresses a source into a sink in a single pass, one block at a time.
+
+        Each block gets its own code, and only one block is held in memory at once. The sink
+        is only ever written to in order, so pipes and sockets work as well as files.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        stats: NullStats = self.stats
+        with stats.capture():
+            for block in stats.timed_chunks('read', iter_blocks(source, self.block_size)):
+                with stats.phase('encode'):
+                    encoded: bytes = encode_block(block, self.max_code_length)
+                with stats.phase('write'):
+                    sink.write(encoded)
+                stats.count('blocks')
+                stats.count('bytes_in', len(block))
+                stats.count('bytes_out', len(encoded))
+            sink.write(BLOCK.pack(0, 0))
+            stats.count('bytes_out', BLOCK.size)
+
+    def decompress(self, source, sink):
+        """
+        Decompresses a stream written by compress, one block at a time.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        stats: NullStats = self.stats
+        with stats.capture():
+            reader: BlockReader = BlockReader(source)
+            with stats.phase('read'):
+                block = reader.read_block()
+            while block is not None:
+                length, body = block
+                with stats.phase('decode'):
+                    data: bytes = decode_block(body)
+                if len(data) != length:
+                    raise ValueError('decoded block does not match its length')
+                with stats.phase('write'):
+                    sink.write(data)
+                stats.count('blocks')
+                stats.count('bytes_in', BLOCK.size + len(body))
+                stats.count('bytes_out', length)
+                with stats.phase('read'):
+                    block = reader.read_block()
@@ -0,0 +1,151 @@
+import io
+import struct
+from huffman.character_counter import ByteCounter
+from huffman.tree import HuffmanTree, Node
+from huffman.canonical import CanonicalCode
+from huffman.decoder import TableDecoder
+from huffman.encoder import BitWriter, code_strings
+from typing import Dict, Iterable, List
+
+TABLE_MAGIC: bytes = b'HUFT'
+
+# A message is the id of its table and the padding of its last byte, then the payload.
+MESSAGE = struct.Struct('<IB')
+TABLE_ID = struct.Struct('<I')
+
+
+class CodeTable:
+
+    def __init__(self, table_id: int, code: CanonicalCode):
+        self.table_id: int = table_id
+        self.code: CanonicalCode = code
+        self.strings: List[str] = code_strings(code.codes)
+        self.decoder: TableDecoder = code.decoder()
+
+    @staticmethod
+    def train(samples: Iterable[bytes], table_id: int) -> 'CodeTable':
+        """
+        Builds a table from the byte counts of a sample corpus.
+
+        Every byte value is counted once more than it occurs, so the table can encode any
+        message, including bytes never seen in the samples.
+
+        Parameters:
+            samples: the messages to take the byte counts from.
+            table_id: the id written into every message compressed with the table.
+
+        Return:
+            the trained table.
+        """
+        counter: ByteCounter = ByteCounter()
+        for sample in samples:
+            counter.add_text(sample)
+        counts: Dict[int, int] = {byte: count + 1 for byte, count in enumerate(counter.histogram)}
+        root: Node = HuffmanTree(counts=counts).construct_tree()
+        return CodeTable(table_id, CanonicalCode.from_tree(root))
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the table, its id and the code lengths.
+        """
+        return TABLE_MAGIC + TABLE_ID.pack(self.table_id) + self.code.to_bytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'CodeTable':
+        """
+        Reads a table written by to_bytes.
+        """
+        if data[:len(TABLE_MAGIC)] != TABLE_MAGIC:
+            raise ValueError('not a code table')
+        table_id: int = TABLE_ID.unpack_from(data, len(TABLE_MAGIC))[0]
+        code, _ = CanonicalCode.from_bytes(data, len(TABLE_MAGIC) + TABLE_ID.size)
+        return CodeTable(table_id, code)
+
+    def save(self, file_name: str):
+        """
+        Writes the table to a file.
+        """
+        with open(file_name, 'wb') as fp:
+            fp.write(self.to_bytes())
+
+    def compress(self, message) -> bytes:
+        """
+        Compresses a message with this table.
+
+        Parameters:
+            message: the bytes-like message to compress.
+
+        Return:
+            the table id, padding and payload of the message.
+        """
+        payload: io.BytesIO = io.BytesIO()
+        writer: BitWriter = BitWriter(payload, strings=self.strings)
+        writer.write(message)
+        padding: int = writer.close()
+        return MESSAGE.pack(self.table_id, padding) + payload.getvalue()
+
+    def decompress(self, message) -> bytes:
+        """
+        Decompresses a message compressed with this table.
+
+        Parameters:
+            message: the bytes-like compressed message.
+
+        Return:
+            the original message.
+        """
+        table_id, padding = MESSAGE.unpack_from(message)
+        if table_id != self.table_id:
+            raise ValueError(f'message was compressed with table {table_id}')
+        end: int = len(message) * 8 - padding
+        return bytes(self.decoder.decode(message, MESSAGE.size * 8, end))
+
+
+# Every table loaded in this process, by id, so their decode tables are only built once.
+TABLES: Dict[int, CodeTable] = {}
+
+
+def register_table(table: CodeTable):
+    """
+    Adds a table to the tables of this process, replacing any table with the same id.
+    """
+    TABLES[table.table_id] = table
+
+
+def load_table(file_name: str) -> CodeTable:
+    """
+    Reads a table from a file and registers it.
+
+    Parameters:
+        file_name: the file written by CodeTable.save.
+
+    Return:
+        the loaded table.
+    """
+    with open(file_name, 'rb') as fp:
+        table: CodeTable = CodeTable.from_bytes(fp.read())
+    register_table(table)
+    return table
+
+
+def compress_message(message, table_id: int) -> bytes:
+    """
+    Compresses a message with a registered table.
+    """
+    try:
+        table: CodeTable = TABLES[table_id]
+    except KeyError:
+        raise ValueError(f'no table with id {table_id} has been loaded')
+    return table.compress(message)
+
+
+def decompress_message(message) -> bytes:
+    """
+    Decompresses a message with the registered table named by its id.
+    """
+    table_id: int = TABLE_ID.unpack_from(message)[0]
+    try:
+        table: CodeTable = TABLES[table_id]
+    except KeyError:
+        raise ValueError(f'no table with id {table_id} has been loaded')
+    return table.decompress(message)
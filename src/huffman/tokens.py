@@ -0,0 +1,250 @@
+import io
+import struct
+from huffman.character_counter import TokenCounter, TOKEN_PATTERN
+from huffman.canonical import CanonicalCode
+from huffman.decoder import TableDecoder
+from huffman.encoder import BitWriter, code_strings
+from huffman.flat import FlatTree
+from huffman.limited import encoded_size
+from huffman.stream import HuffmanStream, BlockReader, BLOCK, iter_blocks
+from typing import Dict, List, Tuple
+
+# The largest number of tokens added to the 256 byte symbols of a block.
+TOKEN_LIMIT: int = 1024
+
+# Codes are capped so their lengths fit the 4-bit entries of the header.
+TOKEN_MAX_LENGTH: int = 15
+
+# The header starts with the number of tokens. This number instead marks a block stored as is.
+TOKEN_COUNT = struct.Struct('<H')
+STORED_TOKENS: int = 0xffff
+
+
+class PieceCodes(dict):
+    """
+    The codes of the pieces of a block as strings of bits, a token's own code or the codes of
+    its bytes. Pieces which are not tokens are spelled out the first time they are looked up.
+    """
+
+    def __init__(self, strings: List[str], tokens: List[bytes]):
+        super().__init__()
+        self.strings: List[str] = strings
+        for i, token in enumerate(tokens):
+            self[token] = strings[256 + i]
+
+    def __missing__(self, piece: bytes) -> str:
+        bits: str = ''.join([self.strings[byte] for byte in piece])
+        self[piece] = bits
+        return bits
+
+
+class TokenModel:
+    """
+    A code over an alphabet of the 256 bytes and tokens, frequent words, numbers or runs of
+    spaces, which are symbols from 256 upwards.
+
+    A block is split into pieces as TokenCounter counts them. Each token piece is coded as one
+    symbol, which decodes straight to all of its bytes.
+    """
+
+    def __init__(self, tokens: List[bytes], code: CanonicalCode):
+        self.tokens: List[bytes] = tokens
+        self.code: CanonicalCode = code
+        self.pieces: PieceCodes = PieceCodes(code_strings(code.codes, 256 + len(tokens)), tokens)
+        self.decoder: TableDecoder = None
+
+    def __eq__(self, other):
+        return self.tokens == other.tokens and self.code == other.code
+
+    def to_bytes(self) -> bytes:
+        """
+        Writes the tokens, then the code length of every symbol.
+
+        The tokens are their number, then the length and bytes of each. The lengths are 4 bits
+        for each of the 256 bytes and the tokens, in symbol order.
+
+        Return:
+            the bytes of the header.
+        """
+        header: bytearray = bytearray(TOKEN_COUNT.pack(len(self.tokens)))
+        for token in self.tokens:
+            header.append(len(token))
+            header.extend(token)
+        nibbles: bytearray = bytearray(256 + len(self.tokens) + 1)
+        for symbol, length in self.code.lengths.items():
+            nibbles[symbol] = length
+        header.extend((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles) - 1, 2))
+        return bytes(header)
+
+    @staticmethod
+    def from_bytes(data, offset: int = 0) -> Tuple['TokenModel', int]:
+        """
+        Reads a header written by to_bytes.
+
+        Parameters:
+            data: the bytes-like buffer holding the header.
+            offset: the index of the first byte of the header.
+
+        Return:
+            A tuple, containing the model and the index of the first byte after the header.
+        """
+        count: int = TOKEN_COUNT.unpack_from(data, offset)[0]
+        position: int = offset + TOKEN_COUNT.size
+        tokens: List[bytes] = []
+        for _ in range(count):
+            size: int = data[position]
+            tokens.append(bytes(data[position + 1:position + 1 + size]))
+            position += 1 + size
+        lengths: Dict[int, int] = {}
+        for symbol in range(256 + count):
+            pair: int = data[position + symbol // 2]
+            length: int = pair & 0xf if symbol & 1 else pair >> 4
+            if length:
+                lengths[symbol] = length
+        return TokenModel(tokens, CanonicalCode(lengths)), position + (256 + count + 1) // 2
+
+    def encode(self, pieces: List[bytes]) -> str:
+        """
+        Returns the codes of the pieces of a block, as split by TOKEN_PATTERN.
+        """
+        return ''.join(map(self.pieces.__getitem__, pieces))
+
+    def decode(self, data, start: int, end: int) -> bytes:
+        """
+        Decodes the symbols stored between two bit offsets, each into all of its bytes.
+
+        The leaves of the decoder hold the bytes of their symbol, so a table lookup yields whole
+        tokens and the output is joined in one go.
+
+        Parameters:
+            data: the bytes-like buffer holding the encoded block.
+            start: the bit offset of the first encoded bit.
+            end: the bit offset just past the last encoded bit.
+
+        Return:
+            the decoded bytes.
+        """
+        if self.decoder is None:
+            tree: FlatTree = self.code.to_flat()
+            expansions: List[bytes] = [bytes([byte]) for byte in range(256)] + self.tokens
+            tree.values = [expansions[symbol] for symbol in tree.values]
+            self.decoder = TableDecoder(tree)
+        return b''.join(self.decoder.decode(data, start, end))
+
+
+def check_token_options(limit: int, max_length: int):
+    """
+    Refuses options the token header cannot hold.
+
+    Parameters:
+        limit: the largest number of tokens to choose, below STORED_TOKENS.
+        max_length: the longest code length allowed, at most TOKEN_MAX_LENGTH.
+    """
+    if not 0 <= limit < STORED_TOKENS:
+        raise ValueError(f'token limit must be below {STORED_TOKENS}, not {limit}')
+    if max_length is None or not 0 < max_length <= TOKEN_MAX_LENGTH:
+        raise ValueError(f'token code length must be at most {TOKEN_MAX_LENGTH} bits, '
+                         f'not {max_length}')
+
+
+def encode_token_block(data: bytes, limit: int = TOKEN_LIMIT,
+                       max_length: int = TOKEN_MAX_LENGTH) -> bytes:
+    """
+    Compresses one block with a code over bytes and the tokens chosen from its own pieces.
+
+    As in encode_block, a block which coding would not shrink is stored as is.
+
+    Parameters:
+        data: the non empty block to compress.
+        limit: the largest number of tokens to choose, below STORED_TOKENS.
+        max_length: the longest code length allowed, at most TOKEN_MAX_LENGTH.
+
+    Return:
+        the framed block, its original and body lengths then the body.
+    """
+    check_token_options(limit, max_length)
+    # The block is split once, for both counting and encoding.
+    pieces: List[bytes] = TOKEN_PATTERN.findall(data)
+    counter: TokenCounter = TokenCounter()
+    counter.add_pieces(pieces)
+    tokens: List[bytes] = counter.get_tokens(limit)
+    counts: Dict[int, int] = counter.get_symbols(tokens)
+    model: TokenModel = TokenModel(tokens, CanonicalCode.from_counts(counts, max_length))
+    header: bytes = model.to_bytes()
+    bits: int = encoded_size(counts, model.code.lengths)
+    if len(header) + (bits + 7) // 8 >= len(data) + 1:
+        return b''.join([BLOCK.pack(len(data), len(data) + TOKEN_COUNT.size),
+                         TOKEN_COUNT.pack(STORED_TOKENS), data])
+
+    payload: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(payload, {})
+    writer.write_string(model.encode(pieces))
+    padding: int = writer.close()
+    return b''.join([
+        BLOCK.pack(len(data), len(header) + payload.tell() + 1),
+        header,
+        payload.getvalue(),
+        bytes([padding]),
+    ])
+
+
+def decode_token_block(body: bytes, length: int) -> bytes:
+    """
+    Decompresses the body of one block written by encode_token_block.
+
+    Parameters:
+        body: the token header, payload and padding trailer of the block.
+        length: the original length of the block.
+
+    Return:
+        the original bytes of the block.
+    """
+    try:
+        if TOKEN_COUNT.unpack_from(body)[0] == STORED_TOKENS:
+            return bytes(body[TOKEN_COUNT.size:])
+        model, start = TokenModel.from_bytes(body)
+    except (IndexError, struct.error):
+        raise ValueError('block header is truncated') from None
+    if start >= len(body):
+        raise ValueError('block header is truncated')
+    data: bytes = model.decode(body, start * 8, (len(body) - 1) * 8 - body[-1])
+    if len(data) != length:
+        raise ValueError('decoded block does not match its length')
+    return data
+
+
+class TokenHuffmanStream(HuffmanStream):
+
+    def __init__(self, block_size: int = 1 << 20, max_code_length: int = TOKEN_MAX_LENGTH,
+                 limit: int = TOKEN_LIMIT):
+        check_token_options(limit, max_code_length)
+        # Blocks are larger by default, to spread the cost of the tokens in each header.
+        super().__init__(block_size, max_code_length)
+        self.limit: int = limit
+
+    def compress(self, source, sink):
+        """
+        Compresses a source into a sink with codes over bytes and tokens, one block at a time.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        for block in iter_blocks(source, self.block_size):
+            sink.write(encode_token_block(block, self.limit, self.max_code_length))
+        sink.write(BLOCK.pack(0, 0))
+
+    def decompress(self, source, sink):
+        """
+        Decompresses a stream written by compress, one block at a time.
+
+        Parameters:
+            source: a readable binary stream, or an iterable of byte chunks.
+            sink: a writable binary stream.
+        """
+        reader: BlockReader = BlockReader(source)
+        block = reader.read_block()
+        while block is not None:
+            length, body = block
+            sink.write(decode_token_block(body, length))
+            block = reader.read_block()
@@ -1,83 +1,115 @@
 import sys
+from bisect import bisect_right
+from collections import deque
 from huffman.character_counter import CharacterCounter
 from huffman.node import Node
-from typing import List, Dict, Tuple
+from huffman.stats import NullStats, NULL_STATS
+from typing import Deque, List, Dict, Tuple
 from bitstring import BitArray
 
 
 class HuffmanTree:
 
-    def __init__(self, file_name: str = None, bit_array: BitArray = None):
+    def __init__(self, file_name: str = None, bit_array: BitArray = None, counts: Dict = None,
+                 binary: bool = False, stats: NullStats = NULL_STATS):
+        self.stats: NullStats = stats
         if file_name is not None:
             self.file_name: str = file_name
             self.counter: CharacterCounter = CharacterCounter()
-            self.binary_map = None
             with open(file_name) as fp:
                 result: str = fp.readline()
                 while result != '':
                     self.counter.add_text(result)
                     result = fp.readline()
+            counts = self.counter.get_characters()
 
+        if counts is not None:
+            self.binary_map = None
             self.nodes: List[Node] = []
-            for letter, count in self.counter.get_characters().items():
+            for letter, count in counts.items():
                 self.nodes.append(Node(count, letter))
 
-            # Sort From Lowest Count to highest count.
+            # Sort From Lowest Count to highest count, ties stay in order of first occurrence.
             self.nodes.sort(key=lambda x: x.count)
         elif bit_array is not None:
             self.padding = bit_array[0:8].uint
             bit_array = bit_array[8:]
             self.root = Node()
-            bit_array = self.root.from_bits(bit_array)
+            bit_array = self.root.from_bits(bit_array, binary)
             self.data = bit_array
 
     def _process_nodes(self):
         """
         Takes a single step in the encoding process, combining the two smallest items.
         """
-        left: Node = self.nodes[0]
-        right: Node = self.nodes[1]
-
-        self.nodes.remove(left)
-        self.nodes.remove(right)
+        left: Node = self.nodes.pop(0)
+        right: Node = self.nodes.pop(0)
 
         new_node: Node = Node(left.count + right.count)
         new_node.left = left
         new_node.right = right
-        self.nodes.append(new_node)
-        self.nodes.sort(key=lambda x: x.count)
+
+        # Place the new node after every node of equal count, as a stable sort would.
+        index: int = bisect_right([node.count for node in self.nodes], new_node.count)
+        self.nodes.insert(index, new_node)
+
+    @staticmethod
+    def _pop_smallest(leaves: Deque[Node], merged: Deque[Node]) -> Node:
+        """
+        Removes the node with the lowest count from the front of the two queues.
+
+        Ties go to the leaves queue, since those nodes were created before any merged node.
+        """
+        if merged and (not leaves or merged[0].count < leaves[0].count):
+            return merged.popleft()
+        return leaves.popleft()
 
     def construct_tree(self) -> Node:
         """
         Constructs the Huffman tree.
 
+        The sorted nodes and the merged nodes are kept in two queues. Merged nodes are created
+        in order of increasing count, so the two smallest nodes are always at the front of the
+        queues, and the tree is built in linear time.
+
         Return:
             The node representing the root of the huffman tree.
         """
-        while len(self.nodes) > 1:
-            self._process_nodes()
-        self.root: Node = self.nodes[0] if self.nodes else None
-        if self.root:
-            self.binary_map = HuffmanTree._walk_tree(self.root)
-        return self.root
+        with self.stats.phase('tree'):
+            self.stats.count('symbols', len(self.nodes))
+            leaves: Deque[Node] = deque(self.nodes)
+            merged: Deque[Node] = deque()
+            while len(leaves) + len(merged) > 1:
+                left: Node = HuffmanTree._pop_smallest(leaves, merged)
+                right: Node = HuffmanTree._pop_smallest(leaves, merged)
+                merged.append(Node(left.count + right.count, left=left, right=right))
+            self.nodes = list(leaves) + list(merged)
+
+            self.root: Node = self.nodes[0] if self.nodes else None
+            if self.root:
+                self.binary_map = HuffmanTree._walk_tree(self.root)
+            return self.root
 
     @staticmethod
     def _walk_tree(node, current: BitArray = BitArray()) -> Dict[str, BitArray]:
         """
         Walk the Huffman Tree, constructing a dictiary of their associated bit arrays
-        """
-        if node.data is not None:
-            return {node.data: current}
 
-        else:
-            left_array: BitArray = current.copy()
-            left_array.append('0b0')
-            right_array: BitArray = current.copy()
-            right_array.append('0b1')
-            result: Dict[str, BitArray] = {}
-            result.update(HuffmanTree._walk_tree(node.left, left_array))
-            result.update(HuffmanTree._walk_tree(node.right, right_array))
-            return result
+        Codes are carried down as integers, only the leaves get a bit array. A lone leaf gets
+        the 1-bit code 0, as in CanonicalCode.from_tree, so its occurrences are still written.
+        """
+        result: Dict[str, BitArray] = {}
+        if node.data is not None and not current:
+            return {node.data: BitArray('0b0')}
+        stack: List[Tuple[Node, int, int]] = [(node, current.uint if current else 0, len(current))]
+        while stack:
+            node, code, length = stack.pop()
+            if node.data is not None:
+                result[node.data] = BitArray(uint=code, length=length) if length else BitArray()
+            else:
+                stack.append((node.right, (code << 1) | 1, length + 1))
+                stack.append((node.left, code << 1, length + 1))
+        return result
 
     def get_character(self, char: str) -> BitArray:
         """
@@ -91,6 +123,16 @@ class HuffmanTree:
         """
         return self.binary_map[char]
 
+    def get_code_table(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns every character's code as an integer, along with its length in bits.
+
+        Return:
+            a dictionary of each character and a tuple of its code and code length.
+        """
+        return {char: (bits.uint if bits else 0, len(bits))
+                for char, bits in self.binary_map.items()}
+
     def to_bits(self) -> BitArray:
         """
         Writes the representation of this Tree to a BitArray
@@ -100,6 +142,31 @@ class HuffmanTree:
         """
         return self.root.to_bits() if self.root else None
 
+    @staticmethod
+    def tree_length(data, start: int) -> int:
+        """
+        Measures a tree written by to_bits, without building it.
+
+        Parameters:
+            data: the bytes-like buffer holding the tree.
+            start: the bit offset of the first bit of the tree.
+
+        Return:
+            the number of bits in the tree.
+        """
+        position: int = start
+        pending: int = 1
+        while pending:
+            bit: int = (data[position >> 3] >> (7 - (position & 7))) & 1
+            position += 1
+            if bit:
+                # A branch is followed by its two children.
+                pending += 1
+            else:
+                position += 8
+                pending -= 1
+        return position - start
+
     def get_data(self) -> BitArray:
         """
         Returns the remaining data after reading from a bitarray
@@ -1,5 +1,5 @@
-from huffman.file import HuffmanIO
+import sys
+from huffman.cli import main
 
-stuff = HuffmanIO()
-stuff.compress_file("test/data/simple.txt", "test/data/test.bin")
-stuff.decompress_file("test/data/test.bin", "test/data/result.txt")
+if __name__ == '__main__':
+    sys.exit(main())
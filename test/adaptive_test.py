@@ -0,0 +1,72 @@
+import sys
+import os
+import io
+import random
+sys.path.append(os.path.abspath('src'))
+from huffman.adaptive import AdaptiveHuffmanStream, AdaptiveEncoder, AdaptiveModel, iter_decode
+import pytest
+
+
+def test_round_trip(round_trip):
+    """
+    Test empty, single byte, repetitive, skewed and random inputs.
+    """
+    generator: random.Random = random.Random(3)
+    for data in [b'', b'a', b'ab' * 500, bytes(range(256)) * 3,
+                 bytes(generator.choices(b'aaaaabbbcd\n', k=20000)),
+                 bytes(generator.randrange(256) for _ in range(5000))]:
+        assert round_trip(AdaptiveHuffmanStream(), data) == data
+
+
+def test_compresses_skewed_text():
+    """
+    Test skewed text gets smaller, without any header.
+    """
+    data: bytes = bytes(random.Random(5).choices(b'aaaaaaaabbbbccd', k=10000))
+    compressed: io.BytesIO = io.BytesIO()
+    AdaptiveHuffmanStream().compress(io.BytesIO(data), compressed)
+    assert len(compressed.getvalue()) < len(data) * 0.3
+
+
+def test_emits_before_close():
+    """
+    Test the encoder writes output before it has seen the whole input.
+    """
+    sink: io.BytesIO = io.BytesIO()
+    encoder: AdaptiveEncoder = AdaptiveEncoder(sink, buffer_size=16)
+    encoder.write(b'hello adaptive world, ' * 20)
+    assert len(sink.getvalue()) > 0
+    encoder.write(b'x')
+    encoder.flush()
+    written: int = len(sink.getvalue())
+    encoder.close()
+
+    # The flushed bytes decode on their own, up to the end of what was written so far.
+    assert next(iter_decode([sink.getvalue()[:written]])).startswith(b'hello adaptive world, ')
+
+
+def test_truncated():
+    """
+    Test a stream cut before its end marker is refused.
+    """
+    compressed: io.BytesIO = io.BytesIO()
+    AdaptiveHuffmanStream().compress(io.BytesIO(b'some data to cut short'), compressed)
+    with pytest.raises(ValueError):
+        AdaptiveHuffmanStream().decompress([compressed.getvalue()[:-2]], io.BytesIO())
+
+
+def test_sibling_property():
+    """
+    Test weights never decrease with the node number, and each branch weighs its children.
+    """
+    model: AdaptiveModel = AdaptiveModel()
+    generator: random.Random = random.Random(11)
+    for symbol in generator.choices(range(40), weights=range(1, 41), k=3000):
+        model.update(symbol)
+        used: range = range(model.next + 1, model.root + 1)
+        assert all(model.weight[i] <= model.weight[i + 1] for i in used[:-1])
+    for node in used:
+        if model.left[node] != -1:
+            assert model.weight[node] == model.weight[model.left[node]] + \
+                model.weight[model.right[node]]
+            assert model.parent[model.left[node]] == node
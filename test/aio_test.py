@@ -0,0 +1,95 @@
+import sys
+import os
+import asyncio
+import io
+import socket
+sys.path.append(os.path.abspath('src'))
+from huffman.aio import AsyncHuffmanStream
+from huffman.stream import HuffmanStream
+import pytest
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    """
+    Creates a stream reader which holds the given data and then ends.
+    """
+    reader: asyncio.StreamReader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def _pipe():
+    """
+    Opens a connected pair of streams in process, returning the reader of one end and the
+    writers of both ends.
+    """
+    left, right = socket.socketpair()
+    reader, left_writer = await asyncio.open_connection(sock=left)
+    _, writer = await asyncio.open_connection(sock=right)
+    return reader, (writer, left_writer)
+
+
+async def _run(coroutine, reader: asyncio.StreamReader, writers) -> bytes:
+    """
+    Runs a compression coroutine into a pipe, returning everything that came out of it.
+    """
+    async def produce():
+        await coroutine
+        writers[0].close()
+
+    result, _ = await asyncio.gather(reader.read(), produce())
+    writers[1].close()
+    return result
+
+
+def test_compress_matches_stream(skewed_text):
+    """
+    Test the async compressor writes the same stream as the blocking one.
+    """
+    data: bytes = skewed_text(10000)
+    expected: io.BytesIO = io.BytesIO()
+    HuffmanStream(block_size=1024).compress(io.BytesIO(data), expected)
+
+    async def main():
+        reader, writers = await _pipe()
+        stream: AsyncHuffmanStream = AsyncHuffmanStream(block_size=1024)
+        return await _run(stream.compress(_reader(data), writers[0]), reader, writers)
+
+    assert asyncio.run(main()) == expected.getvalue()
+
+
+def test_round_trip_interleaved(skewed_text):
+    """
+    Test many compressions and decompressions sharing the event loop.
+    """
+    inputs = [skewed_text(size) for size in range(1000, 9000, 1000)]
+
+    async def round_trip(data: bytes) -> bytes:
+        stream: AsyncHuffmanStream = AsyncHuffmanStream(block_size=700)
+        reader, writers = await _pipe()
+        compressed: bytes = await _run(stream.compress(_reader(data), writers[0]), reader, writers)
+        reader, writers = await _pipe()
+        return await _run(stream.decompress(_reader(compressed), writers[0]), reader, writers)
+
+    async def main():
+        return await asyncio.gather(*[round_trip(data) for data in inputs])
+
+    assert asyncio.run(main()) == inputs
+
+
+def test_decompress_truncated():
+    """
+    Test decompressing a stream which ends part way through a block.
+    """
+    compressed: io.BytesIO = io.BytesIO()
+    HuffmanStream().compress(io.BytesIO(b'hello world'), compressed)
+
+    async def main():
+        truncated: asyncio.StreamReader = _reader(compressed.getvalue()[:-10])
+        reader, writers = await _pipe()
+        stream: AsyncHuffmanStream = AsyncHuffmanStream()
+        await _run(stream.decompress(truncated, writers[0]), reader, writers)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
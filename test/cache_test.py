@@ -0,0 +1,92 @@
+import sys
+import os
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.cache import DecoderCache
+from huffman.decoder import TableDecoder
+from huffman.file import HuffmanIO
+from huffman.node import Node
+
+ROOT: Node = Node(left=Node(data=97), right=Node(data=98))
+
+
+def _build(built: List[bytes], header: bytes):
+    """
+    Returns a build function which records the header it was called for.
+    """
+    def build() -> TableDecoder:
+        built.append(header)
+        return TableDecoder(ROOT)
+    return build
+
+
+def test_hit_and_miss():
+    """
+    Test a repeated header reuses the decoder built the first time.
+    """
+    cache: DecoderCache = DecoderCache()
+    built: List[bytes] = []
+    first: TableDecoder = cache.get(b'one', _build(built, b'one'))
+    second: TableDecoder = cache.get(b'one', _build(built, b'one'))
+
+    assert first is second
+    assert built == [b'one']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_evicted():
+    """
+    Test the least recently used decoder is dropped once the cache is full.
+    """
+    cache: DecoderCache = DecoderCache(maxsize=2)
+    built: List[bytes] = []
+    for header in [b'a', b'b', b'a', b'c', b'a', b'b']:
+        cache.get(header, _build(built, header))
+
+    assert built == [b'a', b'b', b'c', b'b']
+    assert len(cache) == 2
+
+
+def test_resize_and_clear():
+    """
+    Test shrinking the cache and clearing it.
+    """
+    cache: DecoderCache = DecoderCache(maxsize=4)
+    built: List[bytes] = []
+    for header in [b'a', b'b', b'c']:
+        cache.get(header, _build(built, header))
+    cache.resize(1)
+    assert len(cache) == 1
+    cache.get(b'c', _build(built, b'c'))
+    assert cache.hits == 1
+
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+
+def test_disabled():
+    """
+    Test a cache of size zero never keeps a decoder.
+    """
+    cache: DecoderCache = DecoderCache(maxsize=0)
+    built: List[bytes] = []
+    cache.get(b'a', _build(built, b'a'))
+    cache.get(b'a', _build(built, b'a'))
+
+    assert built == [b'a', b'a']
+
+
+def test_decompress_file_reuses_decoder(tmp_path):
+    """
+    Test decompressing archives with the same header hits the cache, for both layouts.
+    """
+    for canonical in [False, True]:
+        cache: DecoderCache = DecoderCache()
+        file_writer: HuffmanIO = HuffmanIO(canonical=canonical, cache=cache)
+        file_writer.compress_file('test/data/simple.txt', str(tmp_path / 'simple.bin'))
+        for _ in range(3):
+            file_writer.decompress_file(str(tmp_path / 'simple.bin'), str(tmp_path / 'simple.txt'))
+
+        assert (cache.hits, cache.misses) == (2, 1)
+        with open(str(tmp_path / 'simple.txt')) as fp, open('test/data/simple.txt') as expected:
+            assert fp.read() == expected.read()
@@ -0,0 +1,133 @@
+import sys
+import os
+from typing import Dict
+sys.path.append(os.path.abspath('src'))
+from huffman.tree import HuffmanTree, Node
+from huffman.canonical import CanonicalCode
+from huffman.file import HuffmanIO, CANONICAL_FLAG
+
+
+def test_codes_from_lengths():
+    """
+    Test assigning canonical codes from the code lengths.
+    """
+    code: CanonicalCode = CanonicalCode({97: 1, 99: 2, 98: 2})
+
+    assert code.symbols == [97, 98, 99]
+    assert code.codes == {97: (0b0, 1), 98: (0b10, 2), 99: (0b11, 2)}
+
+
+def test_from_tree():
+    """
+    Test taking the code lengths from a huffman tree.
+    """
+    root: Node = Node(left=Node(left=Node(data=98), right=Node(data=99)), right=Node(data=97))
+
+    assert CanonicalCode.from_tree(root).lengths == {97: 1, 98: 2, 99: 2}
+
+
+def test_from_tree_single_leaf():
+    """
+    Test a tree with a single leaf still uses one bit per symbol.
+    """
+    assert CanonicalCode.from_tree(Node(5, 120)).lengths == {120: 1}
+
+
+def test_to_bytes_sparse():
+    """
+    Test the header of a small alphabet.
+    """
+    code: CanonicalCode = CanonicalCode({97: 1, 98: 2, 99: 2})
+
+    assert code.to_bytes() == bytes([2, 2, 1, 97, 98, 99])
+
+
+def test_to_bytes_empty():
+    """
+    Test the header of an empty code.
+    """
+    assert CanonicalCode({}).to_bytes() == b'\x00'
+    assert CanonicalCode.from_bytes(b'\x00') == (CanonicalCode({}), 1)
+
+
+def test_from_bytes_sparse():
+    """
+    Test reading the header of a small alphabet, starting part way through a buffer.
+    """
+    code, offset = CanonicalCode.from_bytes(bytes([7, 2, 2, 1, 97, 98, 99, 5]), 1)
+
+    assert code.lengths == {97: 1, 98: 2, 99: 2}
+    assert offset == 7
+
+
+def test_round_trip_dense():
+    """
+    Test the header of a full byte alphabet uses the dense layout.
+    """
+    counts: Dict[int, int] = {symbol: symbol + 1 for symbol in range(256)}
+    tree: HuffmanTree = HuffmanTree(counts=counts)
+    code: CanonicalCode = CanonicalCode.from_tree(tree.construct_tree())
+    header: bytes = code.to_bytes()
+
+    assert len(header) == 129
+    # The tree layout would take 255 branch bits and 256 leaves of 9 bits.
+    assert len(header) * 8 < 255 + 256 * 9
+    assert CanonicalCode.from_bytes(header) == (code, 129)
+
+
+def test_decoder():
+    """
+    Test decoding a stream written with the canonical codes.
+    """
+    code: CanonicalCode = CanonicalCode({97: 1, 98: 2, 99: 2})
+
+    assert code.decoder().decode(bytes([0b01011000]), 0, 5) == [97, 98, 99]
+
+
+def test_decoder_single_symbol():
+    """
+    Test decoding a stream with only one symbol.
+    """
+    code: CanonicalCode = CanonicalCode({120: 1})
+
+    assert code.decoder().decode(b'\x00', 0, 3) == [120, 120, 120]
+
+
+def test_file_round_trip(tmp_path):
+    """
+    Test compressing and decompressing the test files with canonical codes.
+    """
+    file_writer: HuffmanIO = HuffmanIO(canonical=True)
+    for name in ['simple', 'biased', 'empty']:
+        compressed: str = str(tmp_path / f'{name}.bin')
+        result: str = str(tmp_path / f'{name}.txt')
+        file_writer.compress_file(f'test/data/{name}.txt', compressed)
+        file_writer.decompress_file(compressed, result)
+
+        with open(result) as fp, open(f'test/data/{name}.txt') as expected:
+            assert fp.read() == expected.read()
+
+
+def test_smaller_header_written():
+    """
+    Test the canonical header is only written when it is no larger than the tree.
+    """
+    small: bytes = b'abacabad' * 4
+    large: bytes = bytes(range(256)) * 2 + b'a' * 300
+    for data, flagged in [(small, False), (large, True)]:
+        archive: bytes = HuffmanIO(canonical=True, binary=True).compress(data)
+        tree: bytes = HuffmanIO(binary=True).compress(data)
+        assert bool(archive[0] & CANONICAL_FLAG) == flagged
+        assert len(archive) <= len(tree)
+        assert HuffmanIO(binary=True).decompress(archive) == data
+
+
+def test_header_size():
+    """
+    Test measuring headers of every layout without parsing them.
+    """
+    dense: CanonicalCode = CanonicalCode.from_tree(
+        HuffmanTree(counts={symbol: symbol + 1 for symbol in range(256)}).construct_tree())
+    for code in [CanonicalCode({}), CanonicalCode({97: 1, 98: 2, 99: 2}), dense]:
+        header: bytes = code.to_bytes()
+        assert CanonicalCode.header_size(b'x' + header + b'yz', 1) == len(header)
@@ -4,7 +4,8 @@ import sys
 import os
 sys.path.append(os.path.abspath('src'))
 
-from huffman.character_counter import CharacterCounter
+from huffman import character_counter
+from huffman.character_counter import CharacterCounter, ByteCounter, ContextCounter, TokenCounter
 
 
 @pytest.fixture
@@ -83,3 +84,91 @@ def test_occurences_not_present(counter):
     counter.add_text('hello world')
     counter.add_text('long')
     assert counter.occurences('z') == expected
+
+
+def test_merge(counter):
+    """
+    Tests merging the counts of another counter.
+    """
+    other = CharacterCounter()
+    counter.add_text('hello')
+    other.add_text('world')
+    counter.merge(other)
+    assert counter.occurences('l') == 3
+    assert counter.occurences('w') == 1
+
+
+def test_byte_counter():
+    """
+    Tests counting bytes from a memoryview.
+    """
+    counter = ByteCounter()
+    counter.add_text(memoryview(b'hello world'))
+    assert counter.occurences(ord('l')) == 3
+    assert counter.occurences(ord('z')) == 0
+
+
+def test_byte_counter_matches_character_counter():
+    """
+    Tests the byte counter against the character counter over every byte value.
+    """
+    data = bytes(range(256)) + b'mississippi'
+    counter = ByteCounter()
+    counter.add_text(data)
+    expected = CharacterCounter()
+    expected.add_text(data)
+    assert counter.get_characters() == expected.get_characters()
+
+
+def test_byte_counter_merge():
+    """
+    Tests merging the histograms of two byte counters.
+    """
+    first = ByteCounter()
+    first.add_text(b'aab')
+    second = ByteCounter()
+    second.add_text(b'bc')
+    first.merge(second)
+    assert first.get_characters() == {ord('a'): 2, ord('b'): 2, ord('c'): 1}
+
+
+def test_context_counter(monkeypatch):
+    """
+    Tests counting bytes by the byte before them, across chunks, with and without numpy.
+    """
+    for module in [character_counter.numpy, None]:
+        monkeypatch.setattr(character_counter, 'numpy', module)
+        counter = ContextCounter()
+        counter.add_text(b'abab')
+        counter.add_text(memoryview(b'ba'))
+        counter.add_text(b'')
+        assert counter.get_contexts() == {
+            0: {ord('a'): 1},
+            ord('a'): {ord('b'): 2},
+            ord('b'): {ord('a'): 2, ord('b'): 1},
+        }
+
+
+def test_token_counter():
+    """
+    Tests splitting text into words, numbers, spaces and other bytes, and choosing tokens.
+    """
+    counter = TokenCounter()
+    counter.add_text(b'GET /users 200\n' * 3)
+    counter.add_text(memoryview(b'GET  /x'))
+    assert counter.pieces[b'GET'] == 4
+    assert counter.pieces[b'200'] == 3
+    assert counter.pieces[b'  '] == 1
+    assert counter.pieces[b'/'] == 4
+
+    # GET saves 4 * 2 - 4 symbols, users 3 * 4 - 6, 200 only 3 * 2 - 4 and x nothing.
+    assert counter.get_tokens(10) == [b'users', b'GET', b'200']
+    assert counter.get_tokens(1) == [b'users']
+
+    symbols = counter.get_symbols([b'users', b'GET'])
+    assert symbols[256] == 3
+    assert symbols[257] == 4
+    assert symbols[ord('0')] == 6
+    assert ord('G') not in symbols
+    assert sum(count for symbol, count in symbols.items() if symbol < 256) + 3 * 5 + 4 * 3 == \
+        len(b'GET /users 200\n' * 3 + b'GET  /x')
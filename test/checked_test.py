@@ -0,0 +1,187 @@
+import sys
+import os
+import random
+sys.path.append(os.path.abspath('src'))
+from huffman.checked import ARCHIVE_MAGIC, BLOCK_HEAD, CRC, is_checked, read_header
+from huffman.file import HuffmanIO
+from huffman.memory import compress, decompress, verify
+import pytest
+
+TEXT: bytes = b'the quick brown fox jumps over the lazy dog\n' * 50
+
+
+def checked(block_size: int = 256) -> HuffmanIO:
+    return HuffmanIO(binary=True, checksum=True, block_size=block_size)
+
+
+def test_header():
+    """
+    Test the versioned header records the original length and is told apart from others.
+    """
+    archive: bytes = checked().compress(TEXT)
+    length, block_size, _, _ = read_header(archive)
+
+    assert archive.startswith(ARCHIVE_MAGIC)
+    assert is_checked(archive)
+    assert not is_checked(compress(TEXT))
+    assert not is_checked(compress(TEXT, canonical=False))
+    assert (length, block_size) == (len(TEXT), 256)
+
+
+@pytest.mark.parametrize('data', [b'', b'a', b'a' * 1000, TEXT, bytes(range(256)) * 3])
+def test_round_trip(data: bytes):
+    """
+    Test checked archives round trip through the same decompress as other archives.
+    """
+    archive: bytes = checked().compress(data)
+
+    assert archive
+    assert HuffmanIO(binary=True).decompress(archive) == data
+    assert verify(archive) == (len(data) + 255) // 256
+
+
+def test_file_round_trip(tmp_path):
+    """
+    Test checked archives of text files, which are read a line at a time.
+    """
+    original: str = os.path.join(tmp_path, 'original.txt')
+    with open(original, 'w') as fp:
+        fp.write('héllo wörld\n' * 100)
+    file_writer: HuffmanIO = HuffmanIO(checksum=True, block_size=100)
+    file_writer.compress_file(original, original + '.bin')
+
+    assert file_writer.verify_file(original + '.bin') == 14
+    file_writer.decompress_file(original + '.bin', original + '.out')
+    with open(original + '.out') as fp:
+        assert fp.read() == 'héllo wörld\n' * 100
+
+
+def test_read_range(tmp_path):
+    """
+    Test ranges of a checked archive, within and across blocks.
+    """
+    name: str = os.path.join(tmp_path, 'archive.bin')
+    with open(name, 'wb') as fp:
+        fp.write(checked(100).compress(TEXT))
+    reader: HuffmanIO = HuffmanIO(binary=True)
+
+    for start, length in [(0, 10), (95, 10), (300, 1000), (len(TEXT) - 5, 10), (5000, 10)]:
+        assert reader.read_range(name, start, length) == TEXT[start:start + length]
+
+
+def test_verify_unchecked():
+    """
+    Test archives without checksums verify their header only.
+    """
+    assert verify(compress(TEXT)) == 0
+    assert verify(compress(TEXT, canonical=False)) == 0
+    assert verify(b'') == 0
+    with pytest.raises(ValueError):
+        verify(b'\x00garbage')
+    with pytest.raises(ValueError):
+        verify(compress(TEXT)[:2])
+
+
+@pytest.mark.parametrize('canonical', [True, False])
+def test_unchecked_truncated_header(tmp_path, canonical: bool):
+    """
+    Test every way of decoding an unchecked archive cut short in its header refuses it.
+    """
+    file_writer: HuffmanIO = HuffmanIO(canonical=canonical, binary=True)
+    archive: bytes = file_writer.compress(TEXT + bytes(range(256)))
+    name: str = str(tmp_path / 'truncated.bin')
+    for size in range(1, 11):
+        with open(name, 'wb') as fp:
+            fp.write(archive[:size])
+        with pytest.raises(ValueError, match='truncated'):
+            file_writer.decompress(archive[:size])
+        with pytest.raises(ValueError, match='truncated'):
+            list(file_writer.iter_decompress(archive[:size]))
+        with pytest.raises(ValueError, match='truncated'):
+            file_writer.decompress_file(name, name + '.out')
+        with pytest.raises(ValueError, match='truncated'):
+            file_writer.read_range(name, 0, 10)
+
+
+def test_detects_every_flipped_byte():
+    """
+    Test flipping any single byte of a checked archive fails verify and decompress.
+    """
+    archive: bytes = checked(64).compress(TEXT[:300])
+    for i in range(len(archive)):
+        corrupt: bytearray = bytearray(archive)
+        corrupt[i] ^= 0x10
+        with pytest.raises(ValueError):
+            verify(corrupt)
+        with pytest.raises(ValueError):
+            decompress(corrupt)
+
+
+def test_detects_truncation():
+    """
+    Test truncating a checked archive anywhere, or extending it, fails verify.
+    """
+    archive: bytes = checked(64).compress(TEXT[:300])
+    for size in range(1, len(archive)):
+        with pytest.raises(ValueError):
+            verify(archive[:size])
+    with pytest.raises(ValueError, match='trailing'):
+        verify(archive + b'\x00')
+
+
+def test_detects_random_corruption():
+    """
+    Test random corruption of a large archive is reported as a checksum mismatch.
+    """
+    generator: random.Random = random.Random(0)
+    archive: bytes = checked(1024).compress(TEXT * 4)
+    first: int = read_header(archive)[3] + BLOCK_HEAD.size
+    for _ in range(20):
+        corrupt: bytearray = bytearray(archive)
+        corrupt[generator.randrange(first, len(archive) - CRC.size)] ^= 1 << generator.randrange(8)
+        with pytest.raises(ValueError, match='checksum'):
+            verify(corrupt)
+
+
+def test_unsupported_version():
+    """
+    Test archives of a later version are refused rather than misread.
+    """
+    archive: bytearray = bytearray(checked().compress(TEXT))
+    archive[len(ARCHIVE_MAGIC)] = 2
+
+    with pytest.raises(ValueError, match='version'):
+        decompress(archive)
+
+
+def test_no_seek_index():
+    """
+    Test checked archives refuse a sidecar seek index, their blocks serve instead.
+    """
+    with pytest.raises(ValueError):
+        HuffmanIO(checksum=True, index_interval=1024)
+
+
+def test_mixed_blocks_stored():
+    """
+    Test blocks the archive's code would expand are stored as is, and read back in ranges.
+    """
+    noise: bytes = random.Random(2).getrandbits(8 * 512).to_bytes(512, 'big')
+    data: bytes = TEXT[:1024] + noise + TEXT[:1024]
+    archive: bytes = checked(512).compress(data)
+
+    assert len(archive) < len(data)
+    assert verify(archive) == 5
+    assert decompress(archive) == data
+    assert noise[:100] in list(HuffmanIO(binary=True).iter_decompress(archive, 100))
+
+
+def test_random_archive_stored():
+    """
+    Test an archive of random bytes grows by its framing only.
+    """
+    noise: bytes = random.Random(3).getrandbits(8 * 4096).to_bytes(4096, 'big')
+    archive: bytes = checked(1024).compress(noise)
+
+    assert len(archive) - len(noise) <= read_header(archive)[3] + 4 * (BLOCK_HEAD.size + CRC.size)
+    assert decompress(archive) == noise
@@ -0,0 +1,133 @@
+import sys
+import os
+import io
+sys.path.append(os.path.abspath('src'))
+from huffman.cli import main, info, SUFFIX
+from huffman.stream import BLOCK
+
+
+class Stdin:
+    """
+    Stands in for sys.stdin, with the given bytes as its binary buffer.
+    """
+
+    def __init__(self, data: bytes):
+        self.buffer: io.BytesIO = io.BytesIO(data)
+
+    def close(self):
+        # Worker processes close their standard input as they start.
+        pass
+
+
+def _write(tmp_path, name: str, data: bytes) -> str:
+    path: str = str(tmp_path / name)
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return path
+
+
+def test_compress_decompress_files(tmp_path):
+    """
+    Test compressing files next to themselves, then restoring them.
+    """
+    data: bytes = b'the quick brown fox jumps over the lazy dog\n' * 500
+    first: str = _write(tmp_path, 'first.txt', data)
+    second: str = _write(tmp_path, 'second.txt', data[::-1])
+    assert main(['compress', '-b', '4096', first, second]) == 0
+    os.remove(first)
+    os.remove(second)
+
+    assert main(['test', first + SUFFIX, second + SUFFIX]) == 0
+    assert main(['decompress', first + SUFFIX, second + SUFFIX]) == 0
+    with open(first, 'rb') as fp:
+        assert fp.read() == data
+    with open(second, 'rb') as fp:
+        assert fp.read() == data[::-1]
+
+
+def test_parallel_files(tmp_path):
+    """
+    Test a batch of files compressed on several workers.
+    """
+    names = [_write(tmp_path, f'{i}.dat', bytes([i]) * 1000 + b'xyz') for i in range(4)]
+    assert main(['compress', '-j', '2'] + names) == 0
+    for name in names:
+        original, compressed, blocks = info(name + SUFFIX)
+        assert original == 1003
+        assert compressed == os.path.getsize(name + SUFFIX)
+        assert blocks == 1
+
+
+def test_parallel_files_to_stdout(tmp_path, capsysbinary):
+    """
+    Test several files decompressed to standard output with workers are written in order.
+    """
+    names = [_write(tmp_path, f'{i}.txt', bytes([65 + i]) * 20000 + b'\n') for i in range(4)]
+    assert main(['compress', '-j', '2'] + names) == 0
+    capsysbinary.readouterr()
+    assert main(['decompress', '-c', '-j', '2'] + [name + SUFFIX for name in names]) == 0
+    assert capsysbinary.readouterr().out == b''.join(bytes([65 + i]) * 20000 + b'\n'
+                                                     for i in range(4))
+
+
+def test_one_stream_to_stdout(tmp_path, capsys):
+    """
+    Test compressing several files to standard output is refused, as the streams would be
+    concatenated and only the first decompressed.
+    """
+    names = [_write(tmp_path, f'{i}.txt', b'some data') for i in range(2)]
+    assert main(['compress', '-c'] + names) == 1
+    assert 'only one file' in capsys.readouterr().err
+    assert main(['compress', '-c', '-j', '2'] + names) == 1
+    assert main(['compress', '-', '-']) == 1
+
+
+def test_pipe(tmp_path, monkeypatch, capsysbinary):
+    """
+    Test streaming standard input to standard output, both ways.
+    """
+    data: bytes = bytes(range(256)) * 100
+    monkeypatch.setattr(sys, 'stdin', Stdin(data))
+    assert main(['compress', '-b', '1000', '-j', '2']) == 0
+    compressed: bytes = capsysbinary.readouterr().out
+    assert len(compressed) > 0
+
+    monkeypatch.setattr(sys, 'stdin', Stdin(compressed))
+    assert main(['decompress', '-']) == 0
+    assert capsysbinary.readouterr().out == data
+
+
+def test_errors(tmp_path, capsys):
+    """
+    Test failures are reported per file, and leave no partial output.
+    """
+    name: str = _write(tmp_path, 'data.txt', b'some data')
+    assert main(['compress', name]) == 0
+    assert main(['compress', name]) == 1
+    assert 'already exists' in capsys.readouterr().err
+    assert main(['compress', '--force', name]) == 0
+
+    assert main(['decompress', name]) == 1
+    assert 'unknown suffix' in capsys.readouterr().err
+
+    with open(name + SUFFIX, 'rb') as fp:
+        truncated: str = _write(tmp_path, 'truncated.txt' + SUFFIX, fp.read()[:-4])
+    assert main(['decompress', truncated]) == 1
+    assert not os.path.exists(truncated[:-len(SUFFIX)])
+    assert main(['test', truncated]) == 1
+    assert main(['list', truncated]) == 1
+
+    empty: str = _write(tmp_path, 'empty.txt' + SUFFIX, BLOCK.pack(5, 0) + BLOCK.pack(0, 0))
+    assert main(['test', empty]) == 1
+    assert 'truncated' in capsys.readouterr().err
+
+
+def test_list_and_summary(tmp_path, capsys):
+    """
+    Test the listing of a compressed file and the throughput summary.
+    """
+    name: str = _write(tmp_path, 'data.txt', b'aaaaaaaabbbc' * 1000)
+    assert main(['compress', '-v', name]) == 0
+    assert 'MB/s' in capsys.readouterr().err
+    assert main(['info', name + SUFFIX]) == 0
+    assert '12000' in capsys.readouterr().out
@@ -0,0 +1,39 @@
+import io
+import random
+from typing import Callable
+import pytest
+
+
+def _skewed_text(size: int) -> bytes:
+    """
+    Generates skewed text of the given size.
+    """
+    generator: random.Random = random.Random(size)
+    return bytes(generator.choice(b'aaaaabbbccdefgh \n') for _ in range(size))
+
+
+def _round_trip(stream, data: bytes) -> bytes:
+    """
+    Compresses then decompresses the data with a stream, through in memory streams.
+    """
+    compressed: io.BytesIO = io.BytesIO()
+    stream.compress(io.BytesIO(data), compressed)
+    result: io.BytesIO = io.BytesIO()
+    stream.decompress(io.BytesIO(compressed.getvalue()), result)
+    return result.getvalue()
+
+
+@pytest.fixture
+def skewed_text() -> Callable[[int], bytes]:
+    """
+    Generates skewed text of a given size, the same for the same size.
+    """
+    return _skewed_text
+
+
+@pytest.fixture
+def round_trip() -> Callable[[object, bytes], bytes]:
+    """
+    Compresses then decompresses data with a stream, returning the result.
+    """
+    return _round_trip
@@ -0,0 +1,138 @@
+import sys
+import os
+import io
+import random
+sys.path.append(os.path.abspath('src'))
+from huffman.character_counter import ContextCounter
+from huffman.context import ContextModel, ContextHuffmanStream, encode_context_block
+from huffman.context import decode_context_block, CONTEXT_LIST_SIZE
+from huffman.stream import HuffmanStream, BLOCK, STORED_BLOCK
+import pytest
+
+
+def _text(size: int) -> bytes:
+    """
+    Generates text where each letter strongly predicts the next.
+    """
+    generator: random.Random = random.Random(size)
+    words = [b'the ', b'then ', b'there ', b'huffman ', b'coding ', b'context ', b'\n']
+    return b''.join(generator.choice(words) for _ in range(size // 6))[:size]
+
+
+def test_header_round_trip():
+    """
+    Test the header lists few contexts by value, and many with a bitmap.
+    """
+    for data in [b'abcabcabd', bytes(range(256)) * 2]:
+        counter: ContextCounter = ContextCounter()
+        counter.add_text(data)
+        model: ContextModel = ContextModel.from_counter(counter)
+        header: bytes = model.to_bytes()
+        result, end = ContextModel.from_bytes(header + b'rest')
+        assert result == model
+        assert end == len(header)
+
+
+def test_unused_contexts_are_free():
+    """
+    Test the header only grows with the contexts which occur.
+    """
+    counter: ContextCounter = ContextCounter()
+    counter.add_text(b'ab' * 100)
+    header: bytes = ContextModel.from_counter(counter).to_bytes()
+    # The count, the three contexts 0, a and b, then a 3 byte code for each.
+    assert len(header) == 1 + 3 + 3 * 3
+    assert len(header) < CONTEXT_LIST_SIZE
+
+
+def test_block_round_trip():
+    """
+    Test single blocks, including one with a single symbol.
+    """
+    for data in [b'a', b'aaaa', b'ab', _text(5000), bytes(range(256)) * 4]:
+        framed: bytes = encode_context_block(data)
+        length, size = BLOCK.unpack_from(framed)
+        assert length == len(data)
+        assert size == len(framed) - BLOCK.size
+        assert decode_context_block(framed[BLOCK.size:], length) == data
+
+
+def test_truncated_block():
+    """
+    Test a block missing the end of its payload is refused.
+    """
+    data: bytes = _text(5000)
+    framed: bytes = encode_context_block(data)
+    with pytest.raises(ValueError):
+        decode_context_block(framed[BLOCK.size:-10], len(data))
+
+
+def test_corrupt_block():
+    """
+    Test a truncated header, or a length far past the payload, is refused.
+    """
+    data: bytes = _text(5000)
+    body: bytes = encode_context_block(data)[BLOCK.size:]
+    with pytest.raises(ValueError):
+        decode_context_block(body[:3], len(data))
+    with pytest.raises(ValueError):
+        decode_context_block(body, 1 << 30)
+
+
+def test_random_block_stored(round_trip):
+    """
+    Test a block coding would not shrink is stored as is, behind the stream's one byte marker.
+    """
+    data: bytes = random.Random(0).getrandbits(8 * 4096).to_bytes(4096, 'big')
+    block: bytes = encode_context_block(data)
+
+    assert BLOCK.unpack_from(block) == (len(data), len(data) + 1)
+    assert block[BLOCK.size] == STORED_BLOCK
+    assert decode_context_block(block[BLOCK.size:], len(data)) == data
+    assert round_trip(ContextHuffmanStream(block_size=1000), data) == data
+
+
+def test_small_block_stored():
+    """
+    Test a block too small to pay for its header is stored rather than expanded.
+    """
+    data: bytes = _text(40)
+    block: bytes = encode_context_block(data)
+
+    assert len(block) == BLOCK.size + len(data) + 1
+    assert decode_context_block(block[BLOCK.size:], len(data)) == data
+
+
+def test_all_contexts_coded():
+    """
+    Test a coded block using all 256 contexts, whose header also starts with the marker byte,
+    is not mistaken for a stored one.
+    """
+    generator: random.Random = random.Random(5)
+    data: bytes = bytes(range(256)) * 4 + bytes(generator.choice(b'ab') for _ in range(60000))
+    block: bytes = encode_context_block(data)
+
+    assert block[BLOCK.size] == STORED_BLOCK
+    assert BLOCK.unpack_from(block)[1] < len(data)
+    assert decode_context_block(block[BLOCK.size:], len(data)) == data
+
+
+def test_stream_round_trip(round_trip):
+    """
+    Test a stream of several blocks.
+    """
+    data: bytes = _text(50000) + bytes(random.Random(1).randrange(256) for _ in range(3000))
+    assert round_trip(ContextHuffmanStream(block_size=10000), data) == data
+    assert round_trip(ContextHuffmanStream(), b'') == b''
+
+
+def test_better_than_order_zero():
+    """
+    Test text where letters predict the next compresses better than with a single code.
+    """
+    data: bytes = _text(100000)
+    order_zero: io.BytesIO = io.BytesIO()
+    HuffmanStream(block_size=1 << 20).compress(io.BytesIO(data), order_zero)
+    order_one: io.BytesIO = io.BytesIO()
+    ContextHuffmanStream().compress(io.BytesIO(data), order_one)
+    assert len(order_one.getvalue()) < 0.7 * len(order_zero.getvalue())
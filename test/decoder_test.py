@@ -0,0 +1,124 @@
+import sys
+import os
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.tree import HuffmanTree, Node
+from huffman.decoder import TableDecoder
+from bitstring import BitArray
+import pytest
+
+
+def _simple_stream():
+    """
+    Encodes the simple test file with its own tree, returning the tree and the encoded bytes.
+    """
+    tree: HuffmanTree = HuffmanTree('test/data/simple.txt')
+    tree.construct_tree()
+    with open('test/data/simple.txt') as fp:
+        text: str = fp.read()
+    bits: BitArray = BitArray()
+    for char in text:
+        bits += tree.get_character(char)
+    return tree, text, bits
+
+
+def test_table_entry_multiple_symbols():
+    """
+    Test a table entry which holds more than one short code.
+    """
+    root: Node = Node(left=Node(data='a'), right=Node(data='b'))
+    decoder: TableDecoder = TableDecoder(root, width=3)
+
+    assert decoder.table[0b010] == (('a', 'b', 'a'), 3, None)
+
+
+def test_table_entry_long_code():
+    """
+    Test a table entry for a code longer than the table width.
+    """
+    deep: Node = Node(left=Node(data='b'), right=Node(data='c'))
+    root: Node = Node(left=Node(data='a'), right=Node(left=deep, right=Node(data='d')))
+    decoder: TableDecoder = TableDecoder(root, width=2)
+
+    symbols, consumed, node = decoder.table[0b10]
+    assert symbols == ()
+    assert consumed == 2
+    assert decoder.tree.to_node(node) == deep
+
+
+def test_decode_simple():
+    """
+    Test decoding the simple file, with the table wide enough for every code.
+    """
+    tree, text, bits = _simple_stream()
+    decoder: TableDecoder = TableDecoder(tree.root, width=8)
+
+    assert ''.join(decoder.decode(bits.tobytes(), 0, len(bits))) == text
+
+
+def test_decode_simple_narrow_table():
+    """
+    Test decoding the simple file, with codes longer than the table width.
+    """
+    tree, text, bits = _simple_stream()
+    decoder: TableDecoder = TableDecoder(tree.root, width=2)
+
+    assert ''.join(decoder.decode(bits.tobytes(), 0, len(bits))) == text
+
+
+def test_decode_offset():
+    """
+    Test decoding a stream starting in the middle of a byte.
+    """
+    tree, text, bits = _simple_stream()
+    decoder: TableDecoder = TableDecoder(tree.root)
+    shifted: BitArray = BitArray('0b101') + bits
+
+    assert ''.join(decoder.decode(shifted.tobytes(), 3, len(shifted))) == text
+
+
+def test_decode_matches_process_stream():
+    """
+    Test the table decoder against the bit by bit decoder on the biased file.
+    """
+    given: BitArray = BitArray(filename='test/data/biased.bin')
+    tree: HuffmanTree = HuffmanTree(bit_array=given)
+    data: BitArray = tree.get_data()
+
+    expected: List[str] = []
+    stream: BitArray = data
+    while stream:
+        character, stream = tree.process_stream(stream)
+        expected.append(character)
+
+    decoder: TableDecoder = TableDecoder(tree.root)
+    assert decoder.decode(data.tobytes(), 0, len(data)) == expected
+
+
+def test_decode_truncated():
+    """
+    Test decoding a stream which stops part way through a code.
+    """
+    tree, text, bits = _simple_stream()
+    decoder: TableDecoder = TableDecoder(tree.root)
+
+    with pytest.raises(ValueError):
+        decoder.decode(bits.tobytes(), 0, len(bits) - 1)
+
+
+def test_iter_decode_chunks():
+    """
+    Test decoding a chunk at a time, with the bit offset after each chunk.
+    """
+    tree, text, bits = _simple_stream()
+    decoder: TableDecoder = TableDecoder(tree.root, width=4)
+    data: bytes = bits.tobytes()
+
+    chunks = list(decoder.iter_decode(data, 0, len(bits), chunk_size=5))
+    assert ''.join(''.join(symbols) for symbols, _ in chunks) == text
+    assert all(len(symbols) >= 5 for symbols, _ in chunks[:-1])
+    assert chunks[-1][1] == len(bits)
+
+    # Each offset is exactly where decoding the rest of the stream can resume.
+    symbols, position = chunks[0]
+    assert ''.join(symbols + decoder.decode(data, position, len(bits))) == text
@@ -0,0 +1,102 @@
+import sys
+import os
+import io
+from typing import Dict, Tuple
+sys.path.append(os.path.abspath('src'))
+from huffman.encoder import BitWriter
+from huffman.tree import HuffmanTree
+from bitstring import BitArray
+
+TABLE: Dict[int, Tuple[int, int]] = {97: (0b1, 1), 98: (0b00, 2), 99: (0b01, 2)}
+
+
+def test_write():
+    """
+    Test encoding a chunk, padding the last byte.
+    """
+    sink: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(sink, TABLE)
+    writer.write(b'abcab')
+
+    assert writer.close() == 0
+    assert sink.getvalue() == bytes([0b10001100])
+
+
+def test_write_padding():
+    """
+    Test the padding of a partial last byte.
+    """
+    sink: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(sink, TABLE)
+    writer.write(b'bc')
+
+    assert writer.close() == 4
+    assert sink.getvalue() == bytes([0b00010000])
+
+
+def test_write_across_chunks():
+    """
+    Test bits left over from one chunk carry into the next.
+    """
+    sink: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(sink, TABLE)
+    writer.write_bits(0b101, 3)
+    writer.write(b'bb')
+    writer.write(b'ccaa')
+    writer.close()
+
+    assert sink.getvalue() == BitArray('0b1010000010111000').tobytes()
+
+
+def test_flush_buffer():
+    """
+    Test the buffer is written out once it reaches its size.
+    """
+    chunks = []
+
+    class Sink:
+        def write(self, data):
+            chunks.append(bytes(data))
+
+    writer: BitWriter = BitWriter(Sink(), TABLE, buffer_size=4)
+    writer.write(b'a' * 40)
+    assert chunks == [b'\xff' * 5]
+    writer.close()
+    assert chunks == [b'\xff' * 5]
+
+
+def test_matches_code_table():
+    """
+    Test encoding the simple file against its BitArray codes.
+    """
+    tree: HuffmanTree = HuffmanTree('test/data/simple.txt')
+    tree.construct_tree()
+    with open('test/data/simple.txt') as fp:
+        text: str = fp.read()
+
+    table: Dict[int, Tuple[int, int]] = {
+        ord(char): code for char, code in tree.get_code_table().items()}
+    sink: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(sink, table)
+    writer.write(text.encode())
+    writer.close()
+
+    expected: BitArray = BitArray()
+    for char in text:
+        expected += tree.get_character(char)
+    assert sink.getvalue() == expected.tobytes()
+
+
+def test_tell():
+    """
+    Test the bit position counts flushed and pending bits.
+    """
+    sink: io.BytesIO = io.BytesIO()
+    writer: BitWriter = BitWriter(sink, TABLE, buffer_size=1)
+    assert writer.tell() == 0
+    writer.write(b'abcab')
+    assert writer.tell() == 8
+    writer.write(b'a')
+    assert writer.tell() == 9
+    writer.close()
+    assert len(sink.getvalue()) == 2
@@ -90,3 +90,128 @@ def test_file_decompression_empty():
     expected: bytes = b''
 
     assert result == expected
+
+
+def test_binary_round_trip(tmp_path):
+    """
+    Test compressing random binary data in byte mode, with both header layouts.
+    """
+    data: bytes = os.urandom(5000) + bytes(range(256)) + b'\r\n\x00' * 100
+    original: str = str(tmp_path / 'random.dat')
+    with open(original, 'wb') as fp:
+        fp.write(data)
+
+    for canonical in [False, True]:
+        file_writer: HuffmanIO = HuffmanIO(canonical=canonical, binary=True)
+        file_writer.compress_file(original, str(tmp_path / 'random.bin'))
+        file_writer.decompress_file(str(tmp_path / 'random.bin'), str(tmp_path / 'result.dat'))
+
+        with open(str(tmp_path / 'result.dat'), 'rb') as fp:
+            assert fp.read() == data
+
+
+def test_single_symbol_round_trip(tmp_path):
+    """
+    Test files of one repeated byte or character round trip, with both header layouts and a
+    code length limit.
+    """
+    for name, data in [('zeros.dat', bytes(1000)), ('letters.txt', b'aaaa')]:
+        original: str = str(tmp_path / name)
+        with open(original, 'wb') as fp:
+            fp.write(data)
+
+        for options in [{'canonical': False}, {'canonical': True}, {'max_code_length': 4}]:
+            file_writer: HuffmanIO = HuffmanIO(binary=name.endswith('.dat'), **options)
+            file_writer.compress_file(original, str(tmp_path / 'single.bin'))
+            file_writer.decompress_file(str(tmp_path / 'single.bin'), str(tmp_path / 'result'))
+
+            with open(str(tmp_path / 'result'), 'rb') as fp:
+                assert fp.read() == data
+            assert os.path.getsize(str(tmp_path / 'single.bin')) > len(data) // 8
+
+
+def test_text_round_trip_unicode(tmp_path):
+    """
+    Test compressing text with characters outside of ASCII.
+    """
+    text: str = 'naïve café, 日本語 ✓\nsecond line ü\n'
+    original: str = str(tmp_path / 'unicode.txt')
+    with open(original, 'w', encoding='utf-8') as fp:
+        fp.write(text)
+
+    file_writer: HuffmanIO = HuffmanIO()
+    file_writer.compress_file(original, str(tmp_path / 'unicode.bin'))
+    file_writer.decompress_file(str(tmp_path / 'unicode.bin'), str(tmp_path / 'result.txt'))
+
+    with open(str(tmp_path / 'result.txt'), encoding='utf-8') as fp:
+        assert fp.read() == text
+
+
+def test_binary_matches_text_archive(tmp_path):
+    """
+    Test byte mode writes the same archive as text mode for an ASCII file.
+    """
+    file_writer: HuffmanIO = HuffmanIO(binary=True)
+    file_writer.compress_file('test/data/simple.txt', str(tmp_path / 'simple.bin'))
+
+    result: BitArray = BitArray(filename=str(tmp_path / 'simple.bin'))
+    expected: BitArray = BitArray(filename='test/data/simple.bin')
+    assert result == expected
+
+
+def test_iter_decompress_chunks(tmp_path):
+    """
+    Test an archive decodes lazily into chunks of about the asked size, from a file or memory.
+    """
+    data: bytes = b''.join(b'line %d of the log\n' % i for i in range(2000))
+    for file_writer in [HuffmanIO(binary=True), HuffmanIO(binary=True, canonical=True),
+                        HuffmanIO(binary=True, checksum=True, block_size=5000)]:
+        archive: bytes = file_writer.compress(data)
+        with open(str(tmp_path / 'log.bin'), 'wb') as fp:
+            fp.write(archive)
+
+        for source in [str(tmp_path / 'log.bin'), tmp_path / 'log.bin', archive]:
+            chunks: List[bytes] = list(file_writer.iter_decompress(source, chunk_size=1000))
+            assert b''.join(chunks) == data
+            assert max(len(chunk) for chunk in chunks) < 1100
+            assert len(chunks) >= len(data) // 1100
+
+
+def test_iter_decompress_stops_early(tmp_path):
+    """
+    Test a consumer can read the first lines of a large archive and stop.
+    """
+    data: bytes = b''.join(b'%d\n' % i for i in range(200000))
+    file_writer: HuffmanIO = HuffmanIO(binary=True)
+    with open(str(tmp_path / 'numbers.bin'), 'wb') as fp:
+        fp.write(file_writer.compress(data))
+
+    chunks = file_writer.iter_decompress(str(tmp_path / 'numbers.bin'), chunk_size=64)
+    head: bytes = next(chunks)
+    chunks.close()
+
+    assert data.startswith(head)
+    assert head.split(b'\n')[:3] == [b'0', b'1', b'2']
+
+
+def test_iter_decompress_text():
+    """
+    Test text archives decode to strings, with characters split across chunks kept whole.
+    """
+    text: str = 'naïve café, 日本語 ✓\n' * 50
+    file_writer: HuffmanIO = HuffmanIO()
+    archive: bytes = file_writer.compress(text.encode('utf-8'))
+    chunks: List[str] = list(file_writer.iter_decompress(archive, chunk_size=7))
+
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert ''.join(chunks) == text
+
+
+def test_iter_decompress_empty(tmp_path):
+    """
+    Test empty archives yield no chunks.
+    """
+    open(str(tmp_path / 'empty.bin'), 'wb').close()
+
+    assert list(HuffmanIO().iter_decompress(str(tmp_path / 'empty.bin'))) == []
+    assert list(HuffmanIO().iter_decompress(b'')) == []
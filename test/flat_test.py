@@ -0,0 +1,95 @@
+import sys
+import os
+import random
+from typing import Dict
+sys.path.append(os.path.abspath('src'))
+from huffman.node import Node
+from huffman.flat import FlatTree, NONE
+from huffman.tree import HuffmanTree
+from huffman.canonical import CanonicalCode
+
+
+def deep_tree(depth: int) -> Node:
+    """
+    Builds a tree with one leaf per level, deeper than the recursion limit.
+    """
+    root: Node = Node(data=depth % 256)
+    for i in range(depth - 1, -1, -1):
+        root = Node(left=Node(data=i % 256), right=root)
+    return root
+
+
+def test_from_node():
+    """
+    Tests copying a tree of nodes into parallel arrays.
+    """
+    root: Node = Node(left=Node(data=1), right=Node(left=Node(data=2), right=Node(data=3)))
+    tree: FlatTree = FlatTree.from_node(root)
+    assert len(tree) == 5
+    assert not tree.is_leaf(0)
+    assert tree.value(tree.left[0]) == 1
+    assert tree.value(tree.left[tree.right[0]]) == 2
+    assert tree.value(tree.right[tree.right[0]]) == 3
+    assert tree.to_node() == root
+
+
+def test_code_table_matches_tree():
+    """
+    Tests the codes of a flat tree match those of the huffman tree it was built from.
+    """
+    counts: Dict[int, int] = {byte: random.randint(1, 1000) for byte in range(256)}
+    huffman: HuffmanTree = HuffmanTree(counts=counts)
+    tree: FlatTree = FlatTree.from_node(huffman.construct_tree())
+    assert tree.code_table() == huffman.get_code_table()
+
+
+def test_from_codes():
+    """
+    Tests building the tree of a canonical code.
+    """
+    code: CanonicalCode = CanonicalCode({0: 1, 1: 2, 2: 3, 3: 3})
+    tree: FlatTree = FlatTree.from_codes(code.codes)
+    assert tree.code_table() == code.codes
+    assert tree.to_node() == code.to_tree()
+
+
+def test_from_codes_missing_child():
+    """
+    Tests a lone code leaves its sibling missing.
+    """
+    tree: FlatTree = FlatTree.from_codes({7: (0, 1)})
+    assert tree.value(tree.left[0]) == 7
+    assert tree.right[0] == NONE
+
+
+def test_bits_round_trip():
+    """
+    Tests reading back the bits of a tree, from an unaligned offset.
+    """
+    root: Node = Node(left=Node(data=200), right=Node(left=Node(data=5), right=Node(data=0xff)))
+    tree: FlatTree = FlatTree.from_node(root)
+    bits = tree.to_bits()
+    assert bits == root.to_bits()
+
+    data: bytes = (bits.uint << 3).to_bytes((len(bits) + 3 + 7) // 8 + 1, 'big')
+    shift: int = len(data) * 8 - len(bits) - 3
+    result, end = FlatTree.from_bits(data, shift)
+    assert end == shift + len(bits)
+    assert result.to_node() == root
+
+
+def test_deep_tree():
+    """
+    Tests trees deeper than the recursion limit are handled without recursing.
+    """
+    depth: int = sys.getrecursionlimit() + 100
+    root: Node = deep_tree(depth)
+    tree: FlatTree = FlatTree.from_node(root)
+    assert tree.code_table()[depth % 256] == ((1 << depth) - 1, depth)
+
+    bits = tree.to_bits()
+    data: bytes = bits.tobytes()
+    result, end = FlatTree.from_bits(data, 0)
+    assert end == len(bits)
+    assert result.to_node() == root
+    assert root.to_bits() == bits
@@ -0,0 +1,130 @@
+import sys
+import os
+import random
+import struct
+sys.path.append(os.path.abspath('src'))
+from huffman.index import SeekIndex, index_name
+from huffman.file import HuffmanIO
+import pytest
+
+
+def _archive(tmp_path, file_writer: HuffmanIO, size: int = 50000) -> bytes:
+    """
+    Compresses skewed random bytes into tmp_path/data.bin, returning the original.
+    """
+    generator: random.Random = random.Random(size)
+    data: bytes = bytes(generator.choice(b'aaaaaaabbbbccdefghij\x00\xff') for _ in range(size))
+    with open(str(tmp_path / 'data.dat'), 'wb') as fp:
+        fp.write(data)
+    file_writer.compress_file(str(tmp_path / 'data.dat'), str(tmp_path / 'data.bin'))
+    return data
+
+
+def test_round_trip():
+    """
+    Test serializing an index and locating sync points in it.
+    """
+    index: SeekIndex = SeekIndex(1234)
+    index.add(0, 100)
+    index.add(1000, 4321)
+    index.add(2000, 9000)
+    result: SeekIndex = SeekIndex.from_bytes(index.to_bytes())
+    assert result.archive_size == 1234
+    assert list(result.positions) == [0, 1000, 2000]
+    assert list(result.offsets) == [100, 4321, 9000]
+    assert result.locate(0) == (0, 100)
+    assert result.locate(1999) == (1000, 4321)
+    assert result.locate(10 ** 9) == (2000, 9000)
+
+
+def test_not_an_index():
+    """
+    Test reading something other than an index.
+    """
+    with pytest.raises(ValueError):
+        SeekIndex.from_bytes(bytes(20))
+
+
+def test_read_range_with_index(tmp_path):
+    """
+    Test reading ranges through the index written while compressing, for both header layouts.
+    """
+    for canonical in [False, True]:
+        file_writer: HuffmanIO = HuffmanIO(canonical=canonical, binary=True, index_interval=4096)
+        data: bytes = _archive(tmp_path, file_writer)
+        index: SeekIndex = SeekIndex.load(index_name(str(tmp_path / 'data.bin')))
+        assert list(index.positions) == list(range(0, len(data), 4096))
+
+        archive: str = str(tmp_path / 'data.bin')
+        generator: random.Random = random.Random(1)
+        for _ in range(50):
+            start: int = generator.randrange(len(data))
+            length: int = generator.randrange(1, 10000)
+            assert file_writer.read_range(archive, start, length) == data[start:start + length]
+        assert file_writer.read_range(archive, 4096, 4096) == data[4096:8192]
+        assert file_writer.read_range(archive, len(data) - 5, 100) == data[-5:]
+        assert file_writer.read_range(archive, len(data), 100) == b''
+
+
+def test_read_range_without_index(tmp_path):
+    """
+    Test reading a range from an archive without an index, decoding from its start.
+    """
+    file_writer: HuffmanIO = HuffmanIO(binary=True)
+    data: bytes = _archive(tmp_path, file_writer)
+    assert not os.path.exists(index_name(str(tmp_path / 'data.bin')))
+    assert file_writer.read_range(str(tmp_path / 'data.bin'), 30000, 50) == data[30000:30050]
+
+
+def test_index_existing_archive(tmp_path):
+    """
+    Test indexing an archive written without an index.
+    """
+    file_writer: HuffmanIO = HuffmanIO(binary=True)
+    data: bytes = _archive(tmp_path, file_writer)
+    archive: str = str(tmp_path / 'data.bin')
+    index: SeekIndex = file_writer.index_file(archive, 1000)
+    assert len(index) > 10
+    assert index.positions[0] == 0
+    for start in [0, 999, 1000, 25001, len(data) - 1]:
+        assert file_writer.read_range(archive, start, 700) == data[start:start + 700]
+
+
+def test_stale_index(tmp_path):
+    """
+    Test an index left over from another archive is rebuilt.
+    """
+    _archive(tmp_path, HuffmanIO(binary=True, index_interval=4096), 50000)
+    data: bytes = _archive(tmp_path, HuffmanIO(binary=True), 40000)
+    archive: str = str(tmp_path / 'data.bin')
+    assert HuffmanIO(binary=True).read_range(archive, 30000, 10) == data[30000:30010]
+    assert SeekIndex.load(index_name(archive)).matches(archive)
+
+
+def test_stale_index_same_size(tmp_path):
+    """
+    Test an index of another archive of the same size, whose sync points are wrong for this one,
+    is told apart by its checksum and rebuilt.
+    """
+    file_writer: HuffmanIO = HuffmanIO(binary=True, index_interval=4096)
+    data: bytes = _archive(tmp_path, file_writer)
+    archive: str = str(tmp_path / 'data.bin')
+    index: SeekIndex = SeekIndex.load(index_name(archive))
+    other: SeekIndex = SeekIndex(index.archive_size, index.archive_checksum ^ 1)
+    for position, offset in zip(index.positions, index.offsets):
+        other.add(position, offset + 3)
+    other.save(index_name(archive))
+    assert file_writer.read_range(archive, 20000, 100) == data[20000:20100]
+    assert SeekIndex.load(index_name(archive)).matches(archive)
+
+
+def test_old_index_layout(tmp_path):
+    """
+    Test an index in the first layout, without a checksum, is rebuilt.
+    """
+    data: bytes = _archive(tmp_path, HuffmanIO(binary=True))
+    archive: str = str(tmp_path / 'data.bin')
+    with open(index_name(archive), 'wb') as fp:
+        fp.write(struct.pack('<4sQQ', b'HUFI', os.path.getsize(archive), 0))
+    assert HuffmanIO(binary=True).read_range(archive, 100, 10) == data[100:110]
+    assert SeekIndex.load(index_name(archive)).matches(archive)
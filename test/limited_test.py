@@ -0,0 +1,149 @@
+import sys
+import os
+import io
+import random
+from typing import Dict, List
+sys.path.append(os.path.abspath('src'))
+from huffman.limited import package_merge, huffman_lengths, encoded_size, limit_cost
+from huffman.canonical import CanonicalCode
+from huffman.stream import HuffmanStream
+from huffman.file import HuffmanIO
+import pytest
+
+
+def _fibonacci(size: int) -> Dict[int, int]:
+    """
+    Counts following the fibonacci sequence, which give the deepest possible huffman tree.
+    """
+    counts: Dict[int, int] = {}
+    previous, current = 1, 1
+    for symbol in range(size):
+        counts[symbol] = current
+        previous, current = current, previous + current
+    return counts
+
+
+def _kraft(lengths: Dict[int, int]) -> float:
+    return sum(2.0 ** -length for length in lengths.values())
+
+
+def test_huffman_tree_is_deep():
+    """
+    Test the fibonacci counts produce codes longer than the cap used below.
+    """
+    assert max(huffman_lengths(_fibonacci(30)).values()) == 29
+
+
+def test_package_merge_caps_lengths():
+    """
+    Test package merge keeps every code within the cap, and the code stays complete.
+    """
+    counts: Dict[int, int] = _fibonacci(30)
+    lengths: Dict[int, int] = package_merge(counts, 15)
+    assert max(lengths.values()) == 15
+    assert _kraft(lengths) == 1.0
+    assert set(lengths) == set(counts)
+
+
+def test_package_merge_without_binding_cap():
+    """
+    Test a cap above the huffman depth costs nothing.
+    """
+    generator: random.Random = random.Random(7)
+    counts: Dict[int, int] = {byte: generator.randint(1, 10000) for byte in range(256)}
+    unlimited, limited = limit_cost(counts, 31)
+    assert unlimited == limited
+
+
+def test_package_merge_is_optimal():
+    """
+    Test package merge against every complete code of at most 3 bits, for 5 symbols.
+    """
+    counts: Dict[int, int] = {0: 1, 1: 1, 2: 2, 3: 5, 4: 30}
+    lengths: Dict[int, int] = package_merge(counts, 3)
+    shapes = [[1, 3, 3, 3, 3], [2, 2, 2, 3, 3]]
+    ordered: List[int] = sorted(counts.values())
+    best: int = min(sum(count * length
+                        for count, length in zip(ordered, sorted(shape, reverse=True)))
+                    for shape in shapes)
+    assert encoded_size(counts, lengths) == best
+    assert max(lengths.values()) == 3
+
+
+def test_package_merge_small():
+    """
+    Test the degenerate alphabets.
+    """
+    assert package_merge({}, 15) == {}
+    assert package_merge({5: 10}, 15) == {5: 1}
+    assert package_merge({5: 10, 6: 1}, 1) == {5: 1, 6: 1}
+
+
+def test_package_merge_too_many_symbols():
+    """
+    Test a cap too small for the alphabet is refused.
+    """
+    with pytest.raises(ValueError):
+        package_merge({symbol: 1 for symbol in range(5)}, 2)
+
+
+def test_limit_cost():
+    """
+    Test the cost of a binding cap is reported.
+    """
+    unlimited, limited = limit_cost(_fibonacci(30), 15)
+    assert unlimited < limited
+
+
+def test_canonical_from_counts():
+    """
+    Test the canonical code only switches to package merge when the cap binds.
+    """
+    counts: Dict[int, int] = _fibonacci(30)
+    assert CanonicalCode.from_counts(counts).max_length() == 29
+    assert CanonicalCode.from_counts(counts, 15).max_length() == 15
+    assert CanonicalCode.from_counts(counts, 29).lengths == huffman_lengths(counts)
+
+
+def _skewed(size: int) -> bytes:
+    """
+    Generates bytes with fibonacci frequencies.
+    """
+    data: bytearray = bytearray()
+    for symbol, count in _fibonacci(size).items():
+        data.extend(bytes([symbol]) * count)
+    random.Random(size).shuffle(data)
+    return bytes(data)
+
+
+def test_stream_round_trip():
+    """
+    Test a stream compressed with capped codes decodes.
+    """
+    data: bytes = _skewed(22)
+    stream: HuffmanStream = HuffmanStream(block_size=len(data), max_code_length=12)
+    compressed: io.BytesIO = io.BytesIO()
+    stream.compress(io.BytesIO(data), compressed)
+    header: bytes = compressed.getvalue()[8:]
+    assert CanonicalCode.from_bytes(header)[0].max_length() == 12
+
+    result: io.BytesIO = io.BytesIO()
+    stream.decompress(io.BytesIO(compressed.getvalue()), result)
+    assert result.getvalue() == data
+
+
+def test_file_round_trip(tmp_path):
+    """
+    Test capped codes with both archive header layouts.
+    """
+    data: bytes = _skewed(22)
+    original: str = str(tmp_path / 'skewed.dat')
+    with open(original, 'wb') as fp:
+        fp.write(data)
+
+    for canonical in [False, True]:
+        file_writer: HuffmanIO = HuffmanIO(canonical=canonical, binary=True, max_code_length=12)
+        file_writer.compress_file(original, str(tmp_path / 'skewed.bin'))
+        file_writer.decompress_file(str(tmp_path / 'skewed.bin'), str(tmp_path / 'result.dat'))
+        with open(str(tmp_path / 'result.dat'), 'rb') as fp:
+            assert fp.read() == data
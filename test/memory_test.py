@@ -0,0 +1,153 @@
+import sys
+import os
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.memory import compress, decompress, compress_many, decompress_many
+from huffman.file import HuffmanIO
+from huffman.cache import DecoderCache
+from huffman.character_counter import CharacterCounter
+from huffman.stream import READ_SIZE
+import pytest
+
+TEXT: bytes = b'abracadabra, the quick brown fox jumps over the lazy dog\n' * 20
+
+
+@pytest.mark.parametrize('canonical', [True, False])
+@pytest.mark.parametrize('kind', [bytes, bytearray, memoryview])
+def test_round_trip(canonical: bool, kind):
+    """
+    Test bytes, bytearrays and memoryviews round trip through memory.
+    """
+    archive: bytes = compress(kind(TEXT), canonical=canonical)
+
+    assert len(archive) < len(TEXT)
+    assert decompress(archive) == TEXT
+    assert decompress(memoryview(archive)) == TEXT
+
+
+def test_round_trip_empty():
+    """
+    Test empty data compresses to an empty archive, as an empty file does.
+    """
+    assert compress(b'') == b''
+    assert decompress(b'') == b''
+
+
+@pytest.mark.parametrize('canonical', [True, False])
+def test_round_trip_single_symbol(canonical: bool):
+    """
+    Test data of one repeated byte round trips, with both header layouts.
+    """
+    assert decompress(compress(b'a' * 100, canonical=canonical)) == b'a' * 100
+    assert decompress(compress(bytes(1000), canonical=canonical)) == bytes(1000)
+    assert decompress(compress(b'a', canonical=canonical)) == b'a'
+
+
+def test_memoryview_slice():
+    """
+    Test a slice of a memoryview is compressed without the bytes around it.
+    """
+    view: memoryview = memoryview(TEXT)[100:300]
+
+    assert decompress(compress(view)) == TEXT[100:300]
+
+
+def test_matches_file(tmpdir):
+    """
+    Test archives written in memory are those written to files, and decode from files.
+    """
+    original: str = os.path.join(tmpdir, 'original')
+    with open(original, 'wb') as fp:
+        fp.write(TEXT)
+    HuffmanIO(canonical=True, binary=True).compress_file(original, original + '.bin')
+    with open(original + '.bin', 'rb') as fp:
+        expected: bytes = fp.read()
+
+    archive: bytes = compress(TEXT)
+    assert archive == expected
+
+    with open(original + '.mem', 'wb') as fp:
+        fp.write(archive)
+    HuffmanIO(binary=True).decompress_file(original + '.mem', original + '.out')
+    with open(original + '.out', 'rb') as fp:
+        assert fp.read() == TEXT
+
+
+def test_multiple_chunks(tmpdir, monkeypatch):
+    """
+    Test a buffer larger than a read is counted and encoded a chunk at a time, as a file is,
+    and gives the same archive.
+    """
+    data: bytes = TEXT * (3 * READ_SIZE // len(TEXT) + 1)
+    original: str = os.path.join(tmpdir, 'original')
+    with open(original, 'wb') as fp:
+        fp.write(data)
+    HuffmanIO(canonical=True, binary=True).compress_file(original, original + '.bin')
+    with open(original + '.bin', 'rb') as fp:
+        expected: bytes = fp.read()
+
+    sizes: List[int] = []
+    add_text = CharacterCounter.add_text
+    monkeypatch.setattr(CharacterCounter, 'add_text',
+                        lambda self, chunk: sizes.append(len(chunk)) or add_text(self, chunk))
+    archive: bytes = compress(memoryview(data))
+    assert archive == expected
+    assert len(sizes) == 4 and max(sizes) == READ_SIZE
+    assert decompress(archive) == data
+    assert decompress(compress(data, checksum=True)) == data
+
+
+def test_max_code_length():
+    """
+    Test the code length cap applies to in memory archives.
+    """
+    data: bytes = bytes(b for i in range(20) for b in [i] * (1 << i % 16))
+
+    assert decompress(compress(data, max_code_length=8)) == data
+
+
+def test_decompress_cache():
+    """
+    Test archives sharing a header build their decoder once.
+    """
+    cache: DecoderCache = DecoderCache()
+    for _ in range(3):
+        assert decompress(compress(TEXT), cache=cache) == TEXT
+
+    assert len(cache) == 1
+
+
+def test_compress_many():
+    """
+    Test a batch round trips with one table, each message smaller than alone.
+    """
+    buffers: List[bytes] = [TEXT[i:i + 40] for i in range(0, 400, 40)]
+    table, messages = compress_many(buffers, table_id=3)
+
+    assert len(messages) == len(buffers)
+    assert all(len(message) < len(buffer) for message, buffer in zip(messages, buffers))
+    assert all(message[:4] == bytes([3, 0, 0, 0]) for message in messages)
+    assert decompress_many(table, messages) == buffers
+
+
+def test_compress_many_memoryviews():
+    """
+    Test memoryviews over one buffer, of any format, are compressed in place.
+    """
+    data: bytearray = bytearray(TEXT[:256])
+    views: List[memoryview] = [memoryview(data)[i:i + 64] for i in range(0, 256, 64)]
+    views.append(memoryview(data).cast('H')[:8])
+    table, messages = compress_many(views)
+
+    assert decompress_many(table, messages) == [bytes(view) for view in views]
+
+
+def test_compress_many_empty():
+    """
+    Test empty buffers in a batch, and a batch of no bytes at all.
+    """
+    table, messages = compress_many([b'', b'ab', b''])
+    assert decompress_many(table, messages) == [b'', b'ab', b'']
+
+    table, messages = compress_many([b'', b''])
+    assert decompress_many(table, messages) == [b'', b'']
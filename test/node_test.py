@@ -104,3 +104,41 @@ def test_from_bits_parent():
 
     assert result == expected
     assert remaining == BitArray()
+
+
+def test_to_bits_byte_leaf():
+    """
+    Tests converting a leaf holding a byte value into a bitarray
+    """
+    test: Node = Node(5, 0xe9)
+    expected: BitArray = BitArray('0b011101001')
+    assert test.to_bits() == expected
+
+
+def test_from_bits_binary():
+    """
+    Test constructing a node with byte value leaves from bits
+    """
+    given = BitArray('0b1011101001001111000')
+    expected = Node(left=Node(data=0xe9), right=Node(data=0x78))
+
+    result = Node()
+    remaining = result.from_bits(given, binary=True)
+
+    assert result == expected
+    assert remaining == BitArray()
+
+
+def test_deep_tree():
+    """
+    Test equality, printing and conversion of a tree deeper than the recursion limit.
+    """
+    depth: int = sys.getrecursionlimit() + 100
+    root: Node = Node(data='x')
+    for _ in range(depth):
+        root = Node(left=Node(data='y'), right=root)
+    other: Node = Node()
+    remaining: BitArray = other.from_bits(root.to_bits() + BitArray('0b101'))
+    assert remaining == BitArray('0b101')
+    assert other == root
+    assert repr(other).count('[y:0]') == depth
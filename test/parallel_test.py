@@ -0,0 +1,45 @@
+import sys
+import os
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.stream import HuffmanStream
+from huffman.parallel import ParallelHuffmanStream, ordered_map
+
+
+def test_ordered_map():
+    """
+    Test results come back in order with a small window.
+    """
+    with ThreadPoolExecutor(4) as pool:
+        result: List[int] = list(ordered_map(pool, lambda x: x * x, range(20), 3))
+
+    assert result == [x * x for x in range(20)]
+
+
+def test_compress_matches_serial(skewed_text):
+    """
+    Test the parallel compressor writes the same stream as the serial one.
+    """
+    data: bytes = skewed_text(20000)
+    serial: io.BytesIO = io.BytesIO()
+    HuffmanStream(block_size=4096).compress(io.BytesIO(data), serial)
+    parallel: io.BytesIO = io.BytesIO()
+    ParallelHuffmanStream(block_size=4096, workers=2).compress(io.BytesIO(data), parallel)
+
+    assert parallel.getvalue() == serial.getvalue()
+
+
+def test_round_trip(skewed_text):
+    """
+    Test compressing and decompressing many blocks across workers.
+    """
+    data: bytes = skewed_text(20000) + os.urandom(5000)
+    stream: ParallelHuffmanStream = ParallelHuffmanStream(block_size=2048, workers=3)
+    compressed: io.BytesIO = io.BytesIO()
+    stream.compress(io.BytesIO(data), compressed)
+    result: io.BytesIO = io.BytesIO()
+    stream.decompress(io.BytesIO(compressed.getvalue()), result)
+
+    assert result.getvalue() == data
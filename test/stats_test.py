@@ -0,0 +1,89 @@
+import sys
+import os
+import io
+from typing import List, Tuple
+sys.path.append(os.path.abspath('src'))
+from huffman.stats import Stats, NULL_STATS
+from huffman.file import HuffmanIO
+from huffman.tree import HuffmanTree
+from huffman.stream import HuffmanStream
+
+
+def _original(tmp_path) -> str:
+    name: str = str(tmp_path / 'original.dat')
+    with open(name, 'wb') as fp:
+        fp.write(b'abracadabra, ' * 1000)
+    return name
+
+
+def test_phases_and_counters():
+    """
+    Test timers add up over phases of the same name, and the callback sees every phase.
+    """
+    phases: List[Tuple[str, float]] = []
+    stats: Stats = Stats(lambda name, seconds: phases.append((name, seconds)))
+    with stats.phase('encode'):
+        pass
+    with stats.phase('encode'):
+        stats.count('symbols', 5)
+    stats.count('symbols')
+    assert [name for name, _ in phases] == ['encode', 'encode']
+    assert stats.timers['encode'] == sum(seconds for _, seconds in phases)
+    assert stats.counters == {'symbols': 6}
+    assert set(stats.to_dict()) == {'timers', 'counters'}
+
+
+def test_disabled_by_default(tmp_path):
+    """
+    Test objects share the null stats unless given their own.
+    """
+    assert HuffmanIO().stats is NULL_STATS
+    assert HuffmanStream().stats is NULL_STATS
+    assert HuffmanTree(counts={1: 1}).stats is NULL_STATS
+    assert not NULL_STATS.enabled
+    chunks: List[bytes] = [b'a', b'b']
+    assert NULL_STATS.timed_chunks('read', chunks) is chunks
+
+
+def test_file_compression(tmp_path):
+    """
+    Test the phases and counters of compressing then decompressing a file.
+    """
+    original: str = _original(tmp_path)
+    stats: Stats = Stats()
+    file_writer: HuffmanIO = HuffmanIO(binary=True, stats=stats)
+    file_writer.compress_file(original, str(tmp_path / 'data.bin'))
+    assert set(stats.timers) == {'count', 'read', 'tree', 'header', 'encode', 'write'}
+    assert stats.counters['bytes_in'] == 13000
+    assert stats.counters['bytes_out'] == os.path.getsize(str(tmp_path / 'data.bin'))
+    assert stats.counters['symbols'] == 7
+    assert stats.counters['blocks'] == 1
+
+    stats = Stats()
+    file_reader: HuffmanIO = HuffmanIO(binary=True, stats=stats)
+    file_reader.decompress_file(str(tmp_path / 'data.bin'), str(tmp_path / 'result.dat'))
+    assert set(stats.timers) == {'header', 'decode', 'write'}
+    assert stats.counters['bytes_out'] == 13000
+
+
+def test_stream_blocks():
+    """
+    Test a stream counts its blocks.
+    """
+    stats: Stats = Stats()
+    compressed: io.BytesIO = io.BytesIO()
+    HuffmanStream(block_size=4096, stats=stats).compress(io.BytesIO(bytes(10000)), compressed)
+    assert stats.counters['blocks'] == 3
+    assert stats.counters['bytes_out'] == len(compressed.getvalue())
+
+
+def test_capture(tmp_path):
+    """
+    Test the opt in profile and peak memory capture.
+    """
+    stats: Stats = Stats(profile=True, trace_memory=True)
+    HuffmanIO(binary=True, stats=stats).compress_file(_original(tmp_path),
+                                                      str(tmp_path / 'data.bin'))
+    assert stats.counters['peak_memory'] > 0
+    assert '_compress' in stats.profile_report()
+    assert Stats().profile_report() == ''
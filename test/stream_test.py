@@ -0,0 +1,155 @@
+import sys
+import os
+import io
+import random
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.stream import HuffmanStream, iter_blocks, encode_block, decode_block, BLOCK
+from huffman.stream import BlockReader, STORED_BLOCK
+import pytest
+
+
+class WriteOnly:
+    """
+    A sink which can only be written to, like a pipe or a socket.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes):
+        self.chunks.append(bytes(data))
+
+
+def test_iter_blocks():
+    """
+    Test regrouping uneven chunks into fixed size blocks.
+    """
+    blocks: List[bytes] = list(iter_blocks([b'abc', b'de', b'', b'fghij'], 4))
+
+    assert blocks == [b'abcd', b'efgh', b'ij']
+
+
+def test_encode_block_frame():
+    """
+    Test the lengths at the start of an encoded block.
+    """
+    block: bytes = encode_block(b'aab')
+    length, size = BLOCK.unpack_from(block)
+
+    assert length == 3
+    assert size == len(block) - BLOCK.size
+    assert decode_block(block[BLOCK.size:]) == b'aab'
+
+
+def test_round_trip_empty(round_trip):
+    """
+    Test compressing an empty stream.
+    """
+    assert round_trip(HuffmanStream(), b'') == b''
+
+
+def test_round_trip_single_symbol(round_trip):
+    """
+    Test compressing a stream with only one distinct byte.
+    """
+    assert round_trip(HuffmanStream(), b'aaaaaaa') == b'aaaaaaa'
+
+
+def test_round_trip_blocks(skewed_text, round_trip):
+    """
+    Test compressing a stream spanning many blocks.
+    """
+    data: bytes = skewed_text(10000)
+    assert round_trip(HuffmanStream(block_size=1000), data) == data
+
+
+def test_round_trip_binary(round_trip):
+    """
+    Test compressing every byte value.
+    """
+    data: bytes = bytes(range(256)) * 4 + os.urandom(1000)
+    assert round_trip(HuffmanStream(block_size=512), data) == data
+
+
+def test_chunk_source_write_only_sink(skewed_text):
+    """
+    Test compressing from an iterator of chunks into a sink which cannot seek.
+    """
+    data: bytes = skewed_text(5000)
+    stream: HuffmanStream = HuffmanStream(block_size=1024)
+    sink: WriteOnly = WriteOnly()
+    stream.compress((data[i:i + 300] for i in range(0, len(data), 300)), sink)
+
+    result: WriteOnly = WriteOnly()
+    stream.decompress(iter(sink.chunks), result)
+    assert b''.join(result.chunks) == data
+
+
+def test_truncated():
+    """
+    Test decompressing a stream missing its final block.
+    """
+    compressed: io.BytesIO = io.BytesIO()
+    HuffmanStream().compress(io.BytesIO(b'hello world'), compressed)
+
+    with pytest.raises(ValueError):
+        HuffmanStream().decompress(io.BytesIO(compressed.getvalue()[:-BLOCK.size]), io.BytesIO())
+
+
+def test_corrupt_block_header(skewed_text):
+    """
+    Test a block body too short for its code header is refused.
+    """
+    for body in [b'', b'\x03', encode_block(skewed_text(2000))[BLOCK.size:][:4]]:
+        with pytest.raises(ValueError):
+            decode_block(body)
+
+
+def test_bit_flips(skewed_text):
+    """
+    Test a stream with any one bit flipped either decodes or is refused with a ValueError.
+    """
+    compressed: io.BytesIO = io.BytesIO()
+    HuffmanStream(64).compress(io.BytesIO(skewed_text(200)), compressed)
+    archive: bytes = compressed.getvalue()
+    for bit in range(len(archive) * 8):
+        corrupt: bytearray = bytearray(archive)
+        corrupt[bit // 8] ^= 1 << (bit % 8)
+        try:
+            HuffmanStream(64).decompress(io.BytesIO(bytes(corrupt)), io.BytesIO())
+        except ValueError:
+            pass
+
+
+def test_random_block_stored():
+    """
+    Test a block coding would not shrink is stored as is, behind a one byte marker.
+    """
+    data: bytes = random.Random(0).getrandbits(8 * 4096).to_bytes(4096, 'big')
+    block: bytes = encode_block(data)
+
+    assert BLOCK.unpack_from(block) == (len(data), len(data) + 1)
+    assert block[BLOCK.size] == STORED_BLOCK
+    assert decode_block(block[BLOCK.size:]) == data
+
+
+def test_mixed_stream_never_expands(skewed_text, round_trip):
+    """
+    Test random blocks of a mixed stream are stored and text blocks are coded.
+    """
+    noise: bytes = random.Random(1).getrandbits(8 * 3000).to_bytes(3000, 'big')
+    data: bytes = skewed_text(3000) + noise + skewed_text(3000)
+    compressed: io.BytesIO = io.BytesIO()
+    HuffmanStream(block_size=1000).compress(io.BytesIO(data), compressed)
+
+    reader: BlockReader = BlockReader(io.BytesIO(compressed.getvalue()))
+    stored: List[bool] = []
+    block = reader.read_block()
+    while block is not None:
+        length, body = block
+        assert len(body) <= length + 1
+        stored.append(body[0] == STORED_BLOCK)
+        block = reader.read_block()
+    assert stored == [False] * 3 + [True] * 3 + [False] * 3
+    assert round_trip(HuffmanStream(block_size=1000), data) == data
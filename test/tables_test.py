@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+from typing import List
+sys.path.append(os.path.abspath('src'))
+from huffman.tables import CodeTable, MESSAGE, TABLES
+from huffman.tables import load_table, register_table, compress_message, decompress_message
+import pytest
+
+SAMPLES: List[bytes] = [
+    json.dumps({'level': 'info', 'message': f'request {i} served', 'status': 200}).encode()
+    for i in range(50)
+]
+
+
+def test_train_covers_every_byte():
+    """
+    Test a trained table can encode bytes which never appear in the samples.
+    """
+    table: CodeTable = CodeTable.train(SAMPLES, 7)
+    message: bytes = bytes(range(256))
+
+    assert len(table.code.lengths) == 256
+    assert table.decompress(table.compress(message)) == message
+
+
+def test_compress_small_message():
+    """
+    Test a message similar to the samples only carries the table id as its header.
+    """
+    table: CodeTable = CodeTable.train(SAMPLES, 7)
+    message: bytes = json.dumps({'level': 'info', 'message': 'request 77 served'}).encode()
+    compressed: bytes = table.compress(message)
+
+    assert len(compressed) < len(message)
+    assert compressed[:4] == bytes([7, 0, 0, 0])
+    assert table.decompress(compressed) == message
+
+
+def test_compress_empty_message():
+    """
+    Test compressing an empty message.
+    """
+    table: CodeTable = CodeTable.train(SAMPLES, 7)
+    compressed: bytes = table.compress(b'')
+
+    assert len(compressed) == MESSAGE.size
+    assert table.decompress(compressed) == b''
+
+
+def test_decompress_wrong_table():
+    """
+    Test decompressing a message with a table other than the one it was compressed with.
+    """
+    first: CodeTable = CodeTable.train(SAMPLES, 1)
+    second: CodeTable = CodeTable.train(SAMPLES, 2)
+
+    with pytest.raises(ValueError):
+        second.decompress(first.compress(b'hello'))
+
+
+def test_save_and_load(tmp_path):
+    """
+    Test saving a table and loading it into the tables of the process.
+    """
+    table: CodeTable = CodeTable.train(SAMPLES, 42)
+    table.save(str(tmp_path / 'table.huft'))
+    TABLES.clear()
+
+    loaded: CodeTable = load_table(str(tmp_path / 'table.huft'))
+    assert loaded.table_id == 42
+    assert loaded.code == table.code
+    assert TABLES[42] is loaded
+    assert decompress_message(table.compress(SAMPLES[3])) == SAMPLES[3]
+
+
+def test_registered_messages():
+    """
+    Test compressing and decompressing through the registered tables.
+    """
+    register_table(CodeTable.train(SAMPLES, 5))
+
+    for sample in SAMPLES:
+        assert decompress_message(compress_message(sample, 5)) == sample
+    with pytest.raises(ValueError):
+        compress_message(b'hello', 6)
@@ -0,0 +1,143 @@
+import sys
+import os
+import io
+import random
+sys.path.append(os.path.abspath('src'))
+from huffman.character_counter import TokenCounter, TOKEN_PATTERN
+from huffman.canonical import CanonicalCode
+from huffman.tokens import TokenModel, TokenHuffmanStream, encode_token_block, decode_token_block
+from huffman.tokens import TOKEN_COUNT, STORED_TOKENS, TOKEN_MAX_LENGTH
+from huffman.stream import HuffmanStream, BLOCK
+import pytest
+
+
+def _log(lines: int) -> bytes:
+    """
+    Generates repetitive log lines, with a few numbers that vary.
+    """
+    generator: random.Random = random.Random(lines)
+    paths = [b'GET /api/users', b'POST /api/orders', b'GET /health']
+    return b''.join(b'2024-05-01 12:%02d:%02d INFO request %s served status=%d in %dms\n' % (
+        generator.randrange(60), generator.randrange(60), generator.choice(paths),
+        generator.choice([200, 200, 404]), generator.randrange(1000)) for _ in range(lines))
+
+
+def test_header_round_trip():
+    """
+    Test the header holds the tokens and the lengths of symbols above 255.
+    """
+    counter: TokenCounter = TokenCounter()
+    counter.add_text(_log(100))
+    tokens = counter.get_tokens(50)
+    model: TokenModel = TokenModel(tokens, CanonicalCode.from_counts(counter.get_symbols(tokens)))
+    header: bytes = model.to_bytes()
+    result, end = TokenModel.from_bytes(b'xx' + header + b'rest', 2)
+
+    assert result == model
+    assert end == 2 + len(header)
+    assert max(model.code.lengths) >= 256
+
+
+def test_tokens_decode_whole():
+    """
+    Test a token decodes to all of its bytes in one symbol.
+    """
+    model: TokenModel = TokenModel([b'served', b'status'],
+                                   CanonicalCode({256: 1, 257: 2, ord(' '): 2}))
+    bits: str = model.encode(TOKEN_PATTERN.findall(b'served status served'))
+    data: bytes = int(bits, 2).to_bytes(1, 'big')
+
+    assert bits == '0' + '10' + '11' + '10' + '0'
+    assert model.decode(data, 0, len(bits)) == b'served status served'
+
+
+@pytest.mark.parametrize('data', [b'a', b'aaaa', b'hello hello hello', bytes(range(256)) * 4])
+def test_block_round_trip(data: bytes):
+    """
+    Test blocks with and without tokens round trip.
+    """
+    block: bytes = encode_token_block(data)
+    length, size = BLOCK.unpack_from(block)
+
+    assert length == len(data)
+    assert size == len(block) - BLOCK.size
+    assert decode_token_block(block[BLOCK.size:], length) == data
+
+
+def test_random_block_stored():
+    """
+    Test a block coding would not shrink is stored as is.
+    """
+    data: bytes = random.Random(0).getrandbits(8 * 2000).to_bytes(2000, 'big')
+    block: bytes = encode_token_block(data)
+
+    assert TOKEN_COUNT.unpack_from(block, BLOCK.size)[0] == STORED_TOKENS
+    assert len(block) == BLOCK.size + TOKEN_COUNT.size + len(data)
+    assert decode_token_block(block[BLOCK.size:], len(data)) == data
+
+
+def test_wrong_length():
+    """
+    Test a block whose recorded length does not match is refused.
+    """
+    block: bytes = encode_token_block(_log(20))
+
+    with pytest.raises(ValueError):
+        decode_token_block(block[BLOCK.size:], 10)
+
+
+def test_truncated_header():
+    """
+    Test a block body too short for its token header is refused.
+    """
+    body: bytes = encode_token_block(_log(20))[BLOCK.size:]
+    for truncated in [b'', b'\x01', body[:40]]:
+        with pytest.raises(ValueError):
+            decode_token_block(truncated, 10)
+
+
+def test_code_length_too_long():
+    """
+    Test code lengths the 4-bit entries of the header cannot hold are refused.
+    """
+    with pytest.raises(ValueError):
+        TokenHuffmanStream(max_code_length=TOKEN_MAX_LENGTH + 1)
+    with pytest.raises(ValueError):
+        encode_token_block(_log(20), max_length=TOKEN_MAX_LENGTH + 1)
+    with pytest.raises(ValueError):
+        TokenHuffmanStream(max_code_length=None)
+
+
+def test_limit_too_large():
+    """
+    Test token limits which would reach the stored marker or overflow the count are refused.
+    """
+    with pytest.raises(ValueError):
+        TokenHuffmanStream(limit=STORED_TOKENS)
+    with pytest.raises(ValueError):
+        encode_token_block(_log(20), limit=STORED_TOKENS)
+    with pytest.raises(ValueError):
+        encode_token_block(_log(20), limit=1 << 16)
+
+
+def test_stream_round_trip(round_trip):
+    """
+    Test a stream spanning several blocks, each with its own tokens.
+    """
+    data: bytes = _log(500)
+    assert round_trip(TokenHuffmanStream(block_size=4096), data) == data
+    assert round_trip(TokenHuffmanStream(limit=0), data) == data
+    assert round_trip(TokenHuffmanStream(), b'') == b''
+
+
+def test_better_than_bytes():
+    """
+    Test tokens compress repetitive log text better than a code over bytes.
+    """
+    data: bytes = _log(2000)
+    tokens: io.BytesIO = io.BytesIO()
+    TokenHuffmanStream().compress(io.BytesIO(data), tokens)
+    order_zero: io.BytesIO = io.BytesIO()
+    HuffmanStream(block_size=1 << 20).compress(io.BytesIO(data), order_zero)
+
+    assert tokens.tell() < order_zero.tell() * 0.7
@@ -207,3 +207,45 @@ def test_process_stream_biased():
     result, leftover = data.process_stream(stream)
     assert result == expected
     assert leftover == BitArray('0b110001')
+
+
+def test_init_counts():
+    """
+    Test Initialization of the Huffman Tree from a dictionary of counts.
+    """
+    data: HuffmanTree = HuffmanTree(counts={'a': 3, 'b': 1, 'c': 1})
+
+    assert [node.data for node in data.nodes] == ['b', 'c', 'a']
+
+
+def test_construct_tree_matches_steps():
+    """
+    Test the queue based construction against merging one step at a time, with many ties.
+    """
+    counts: Dict[str, int] = {letter: 1 + i % 3 for i, letter in enumerate('abcdefghijklmnop')}
+    stepped: HuffmanTree = HuffmanTree(counts=counts)
+    while len(stepped.nodes) > 1:
+        stepped._process_nodes()
+
+    data: HuffmanTree = HuffmanTree(counts=counts)
+    assert data.construct_tree() == stepped.nodes[0]
+
+
+def test_get_code_table():
+    """
+    Test the integer codes match the bit arrays of the biased text file.
+    """
+    data: HuffmanTree = HuffmanTree('test/data/biased.txt')
+    data.construct_tree()
+
+    assert data.get_code_table() == {'a': (1, 1), 'b': (0, 2), 'c': (1, 2)}
+
+
+def test_tree_length():
+    """
+    Test measuring a serialized tree without parsing it.
+    """
+    given: BitArray = BitArray(filename="test/data/biased.bin")
+    data: HuffmanTree = HuffmanTree(bit_array=given)
+
+    assert HuffmanTree.tree_length(given.tobytes(), 8) == len(given) - 8 - len(data.data)